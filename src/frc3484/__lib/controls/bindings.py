@@ -0,0 +1,204 @@
+from enum import Enum, auto
+from math import inf
+from typing import Any, Callable, Iterable
+
+from commands2 import Command
+from commands2.button import Trigger
+from wpimath.units import seconds
+
+from .compiled_input import CompiledInput
+from .snapshot import ControllerSnapshot
+
+'''
+Event-driven bindings for controller inputs.
+
+Every binding is indexed by the raw buttons, axes and POVs it reads. Each cycle the registry only evaluates the
+bindings whose inputs changed since the last snapshot, so the cost depends on how many inputs changed rather than
+how many bindings exist. Holds are the only bindings checked every cycle, and only while they are being held.
+'''
+
+Action = Callable[[], Any] | Command
+
+class _BindingType(Enum):
+    RISING = auto() # Fires when the condition becomes true
+    FALLING = auto() # Fires when the condition becomes false
+    HOLD = auto() # Fires once the condition has been true for the duration
+    DOUBLE_TAP = auto() # Fires when the condition becomes true twice within the duration
+
+class Binding:
+    '''
+    A single controller event and the action it runs
+
+    Parameters:
+        - type (_BindingType): How the condition turns into an event
+        - condition (Callable[[ControllerSnapshot], bool]): The condition to watch
+        - inputs (tuple[CompiledInput, ...]): The inputs the condition reads
+        - action (Callable[[], Any] | Command | None): A function to call or a command to schedule when the event fires
+        - duration (seconds): The hold time or double tap window
+    '''
+    __slots__ = ("_type", "_condition", "_inputs", "_action", "_duration", "_active", "_start_time", "_fired")
+
+    def __init__(self, type: _BindingType, condition: Callable[[ControllerSnapshot], bool], inputs: tuple[CompiledInput, ...], action: Action | None, duration: seconds = 0.0) -> None:
+        self._type: _BindingType = type
+        self._condition: Callable[[ControllerSnapshot], bool] = condition
+        self._inputs: tuple[CompiledInput, ...] = inputs
+        self._action: Action | None = action
+        self._duration: seconds = duration
+        self._active: bool = False
+        self._start_time: seconds = -inf
+        self._fired: bool = False
+
+    def fired(self) -> bool:
+        '''
+        Returns whether the event fired this cycle
+
+        Returns:
+            - bool: True if the event fired during the last controller periodic
+        '''
+        return self._fired
+
+    def as_trigger(self) -> Trigger:
+        '''
+        Creates a commands2 Trigger that is true for the cycle the event fires
+
+        The controller runs its periodic before the scheduler polls triggers, so the trigger sees the event in the
+        same cycle it happened.
+
+        Returns:
+            - Trigger: A trigger that follows this binding
+        '''
+        return Trigger(self.fired)
+
+class BindingRegistry:
+    '''
+    Dispatches controller events to the bindings that watch them
+    '''
+    def __init__(self) -> None:
+        self._button_bindings: dict[int, list[Binding]] = {}
+        self._axis_bindings: dict[int, list[Binding]] = {}
+        self._pov_bindings: dict[int, list[Binding]] = {}
+        self._holding: dict[Binding, None] = {}
+        self._fired: list[Binding] = []
+
+    def add(self, binding: Binding, state: ControllerSnapshot) -> Binding:
+        '''
+        Registers a binding, starting from the current state so inputs that are already held don't fire
+
+        Parameters:
+            - binding (Binding): The binding to register
+            - state (ControllerSnapshot): The current controller state
+
+        Returns:
+            - Binding: The registered binding
+        '''
+        binding._active = binding._condition(state)
+        for key, bindings in self._sources(binding):
+            watchers = bindings.setdefault(key, [])
+            if binding not in watchers:
+                watchers.append(binding)
+        return binding
+
+    def remove(self, binding: Binding) -> None:
+        '''
+        Unregisters a binding
+
+        Parameters:
+            - binding (Binding): The binding to remove
+        '''
+        for key, bindings in self._sources(binding):
+            watchers = bindings.get(key)
+            if watchers is not None and binding in watchers:
+                watchers.remove(binding)
+                if not watchers:
+                    del bindings[key]
+        _ = self._holding.pop(binding, None)
+
+    def dispatch(self, current: ControllerSnapshot, previous: ControllerSnapshot, now: seconds) -> None:
+        '''
+        Fires every event caused by the change from the previous snapshot to the current one
+
+        Parameters:
+            - current (ControllerSnapshot): The state this cycle
+            - previous (ControllerSnapshot): The state last cycle
+            - now (seconds): The current time
+        '''
+        for binding in self._fired:
+            binding._fired = False
+        self._fired.clear()
+
+        # dict keeps the bindings in registration order while skipping chords that watch several changed inputs
+        changed_bindings: dict[Binding, None] = {}
+        changed = current.buttons ^ previous.buttons
+        while changed:
+            bit = changed & -changed
+            changed ^= bit
+            for binding in self._button_bindings.get(bit, ()):
+                changed_bindings[binding] = None
+        for i, bindings in self._axis_bindings.items():
+            if current.axes[i] != previous.axes[i]:
+                for binding in bindings:
+                    changed_bindings[binding] = None
+        for i, bindings in self._pov_bindings.items():
+            if current.povs[i] != previous.povs[i]:
+                for binding in bindings:
+                    changed_bindings[binding] = None
+
+        for binding in changed_bindings:
+            self._update(binding, current, now)
+
+        if self._holding:
+            for binding in list(self._holding):
+                if now - binding._start_time >= binding._duration:
+                    del self._holding[binding]
+                    self._fire(binding)
+
+    def _update(self, binding: Binding, state: ControllerSnapshot, now: seconds) -> None:
+        '''
+        Checks a binding whose inputs changed and fires it if its event happened
+        '''
+        active = binding._condition(state)
+        if active == binding._active:
+            return
+        binding._active = active
+
+        match binding._type:
+            case _BindingType.RISING:
+                if active:
+                    self._fire(binding)
+            case _BindingType.FALLING:
+                if not active:
+                    self._fire(binding)
+            case _BindingType.HOLD:
+                if active:
+                    binding._start_time = now
+                    self._holding[binding] = None
+                else:
+                    _ = self._holding.pop(binding, None)
+            case _BindingType.DOUBLE_TAP:
+                if active:
+                    if now - binding._start_time <= binding._duration:
+                        binding._start_time = -inf
+                        self._fire(binding)
+                    else:
+                        binding._start_time = now
+
+    def _fire(self, binding: Binding) -> None:
+        binding._fired = True
+        self._fired.append(binding)
+        if isinstance(binding._action, Command):
+            binding._action.schedule()
+        elif binding._action is not None:
+            _ = binding._action()
+
+    def _sources(self, binding: Binding) -> Iterable[tuple[int, dict[int, list[Binding]]]]:
+        '''
+        Lists the raw inputs a binding reads along with the index they are stored in
+        '''
+        for compiled in binding._inputs:
+            mask = compiled.mask
+            if mask:
+                yield mask, self._button_bindings
+            for i in compiled.axes:
+                yield i, self._axis_bindings
+            for i in compiled.povs:
+                yield i, self._pov_bindings
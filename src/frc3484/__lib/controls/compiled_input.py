@@ -0,0 +1,151 @@
+from math import atan2, degrees, hypot
+from typing import Callable
+
+from .controller_constants import _InputType, Input
+from .snapshot import ControllerSnapshot, MAX_BUTTONS, MAX_AXES, MAX_POVS
+
+'''
+Compiled inputs resolve an Input once into functions that read straight from a controller snapshot,
+so the input type is only matched when the input is compiled instead of on every query.
+'''
+
+_POV_RIGHT: tuple[int, ...] = (45, 90, 135)
+_POV_LEFT: tuple[int, ...] = (225, 270, 315)
+_POV_UP: tuple[int, ...] = (315, 0, 45)
+_POV_DOWN: tuple[int, ...] = (135, 180, 225)
+
+Accessor = Callable[[ControllerSnapshot], float]
+
+def apply_deadband(value: float, deadband: float) -> float:
+    '''
+    Applies a deadband to an axis value, scaling the output to account for the deadband
+
+    Parameters:
+        - value (float): The axis value
+        - deadband (float): The deadband to apply
+
+    Returns:
+        - float: The axis value with the deadband applied
+    '''
+    if abs(value) < deadband:
+        return 0.0
+    if value > 0:
+        return (value - deadband) / (1.0 - deadband)
+    return (value + deadband) / (1.0 - deadband)
+
+def _pov_component(positive: tuple[int, ...], negative: tuple[int, ...], positive_value: float, negative_value: float, neutral_value: float, i: int) -> Accessor:
+    def read(state: ControllerSnapshot) -> float:
+        pov = state.povs[i]
+        if pov in positive:
+            return positive_value
+        if pov in negative:
+            return negative_value
+        return neutral_value
+    return read
+
+class CompiledInput:
+    '''
+    An Input resolved once into accessors for its button, axis and angle values
+
+    Each accessor takes a controller snapshot, so reading a button, axis or trigger is a single indexed read.
+    Buttons also carry their bit in the snapshot's button mask for edge detection, and the axes and POVs that an input
+    reads are listed so callers can tell when it might have changed.
+
+    Axis values are returned raw. Magnitudes and angles of sticks apply deadband, which the controller sets to 0.0
+    while the input's axes have shaping, because the shaping applies its own deadband before they are read.
+
+    Parameters:
+        - input (Input): The input to compile
+        - axis_limit (float): How far an axis has to move to count as a button press
+        - trigger_limit (float): How far a trigger has to move to count as a button press
+        - axis_deadband (float): The deadband applied to stick magnitudes and angles
+    '''
+    __slots__ = ("input", "mask", "axes", "povs", "deadband", "button", "axis", "angle")
+
+    def __init__(self, input: Input, axis_limit: float, trigger_limit: float, axis_deadband: float) -> None:
+        self.input: Input = input
+        self.deadband: float = axis_deadband
+        self.mask: int = 0
+        self.axes: tuple[int, ...] = ()
+        self.povs: tuple[int, ...] = ()
+        self.button: Callable[[ControllerSnapshot], bool]
+        self.axis: Accessor
+        self.angle: Accessor
+
+        match input.type:
+            case _InputType.BUTTON:
+                mask = self.mask = 1 << (self._index(input.index[0], 1, MAX_BUTTONS) - 1)
+                self.button = lambda state: state.buttons & mask != 0
+                self.axis = lambda state: 1.0 if state.buttons & mask else 0.0
+                self.angle = lambda state: 0.0 if state.buttons & mask else -1.0
+
+            case _InputType.AXIS:
+                i = self._index(input.index[0], 0, MAX_AXES)
+                self.button = lambda state: abs(state.axes[i]) > axis_limit
+                self.axis = lambda state: state.axes[i]
+                self.angle = lambda state: -1.0 if abs(state.axes[i]) <= self.deadband else 180 + 180 * apply_deadband(state.axes[i], self.deadband)
+
+            case _InputType.AXIS_MAGNITUDE | _InputType.AXIS_ANGLE:
+                x = self._index(input.index[0], 0, MAX_AXES)
+                y = self._index(input.index[1], 0, MAX_AXES)
+                self.button = lambda state: hypot(state.axes[x], state.axes[y]) > axis_limit
+                if input.type is _InputType.AXIS_MAGNITUDE:
+                    self.axis = lambda state: apply_deadband(hypot(state.axes[x], state.axes[y]), self.deadband)
+                    def magnitude_angle(state: ControllerSnapshot) -> float:
+                        magnitude = hypot(state.axes[x], state.axes[y])
+                        if magnitude <= self.deadband:
+                            return -1.0
+                        return apply_deadband(magnitude, self.deadband) * 360.0
+                    self.angle = magnitude_angle
+                else:
+                    self.axis = lambda state: 0.0 if hypot(state.axes[x], state.axes[y]) <= self.deadband else degrees(atan2(state.axes[y], state.axes[x])) / 180.0
+                    self.angle = lambda state: 0.0 if hypot(state.axes[x], state.axes[y]) <= self.deadband else (degrees(atan2(state.axes[y], state.axes[x])) + 360.0) % 360.0
+
+            case _InputType.TRIGGER:
+                i = self._index(input.index[0], 0, MAX_AXES)
+                self.button = lambda state: state.axes[i] > trigger_limit
+                self.axis = lambda state: state.axes[i]
+                self.angle = lambda state: state.axes[i] * 360.0
+
+            case _InputType.POV:
+                i = self._index(input.index[0], 0, MAX_POVS)
+                direction = input.index[1]
+                self.button = lambda state: state.povs[i] == direction
+                self.axis = lambda state: 1.0 if state.povs[i] == direction else 0.0
+                self.angle = lambda state: direction if state.povs[i] == direction else -1.0
+
+            case _InputType.POV_ANGLE:
+                i = self._index(input.index[0], 0, MAX_POVS)
+                self.button = lambda state: state.povs[i] > -1
+                self.axis = lambda state: 0.0 if state.povs[i] == -1 else state.povs[i] / 360.0
+                self.angle = lambda state: float(state.povs[i])
+
+            case _InputType.POV_X:
+                i = self._index(input.index[0], 0, MAX_POVS)
+                self.button = lambda state: state.povs[i] in _POV_RIGHT or state.povs[i] in _POV_LEFT
+                self.axis = _pov_component(_POV_RIGHT, _POV_LEFT, 1.0, -1.0, 0.0, i)
+                self.angle = _pov_component(_POV_RIGHT, _POV_LEFT, 0.0, 180.0, -1.0, i)
+
+            case _InputType.POV_Y:
+                i = self._index(input.index[0], 0, MAX_POVS)
+                self.button = lambda state: state.povs[i] in _POV_UP or state.povs[i] in _POV_DOWN
+                self.axis = _pov_component(_POV_DOWN, _POV_UP, 1.0, -1.0, 0.0, i)
+                self.angle = _pov_component(_POV_DOWN, _POV_UP, 90.0, 270.0, -1.0, i)
+
+        if input.type in (_InputType.AXIS, _InputType.TRIGGER):
+            self.axes = (input.index[0],)
+        elif input.type in (_InputType.AXIS_MAGNITUDE, _InputType.AXIS_ANGLE):
+            self.axes = input.index
+        elif input.type is not _InputType.BUTTON:
+            self.povs = (input.index[0],)
+
+    def _index(self, index: int, first: int, count: int) -> int:
+        '''
+        Checks that an index is within the range a snapshot can hold
+        '''
+        if not first <= index < first + count:
+            raise ValueError(f"Invalid index {index} for input {self.input}")
+        return index
+
+    def __repr__(self) -> str:
+        return f"CompiledInput({self.input})"
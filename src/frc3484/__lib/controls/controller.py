@@ -1,13 +1,20 @@
-import sys
+from array import array
+from typing import Callable, Iterable
 
-from wpimath.geometry import Translation2d
 from wpilib.interfaces import GenericHID
 from commands2 import Subsystem
-from wpilib import DriverStation
+from wpilib import Timer
+from wpimath.units import milliseconds, seconds
 
-from .controller_constants import _InputType, Input
-
-from typing import Any
+from .controller_constants import Input
+from .compiled_input import CompiledInput, apply_deadband
+from .snapshot import ControllerSnapshot, MAX_BUTTONS, MAX_AXES, MAX_POVS
+from .bindings import Action, Binding, BindingRegistry, _BindingType
+from .recording import ControllerRecording, ReplayHID
+from .shaping import AxisShaper
+from .faults import CONTROLS_FAULTS, FaultLog, FaultSource
+from .haptics import HapticsScheduler, RumbleCue, RumblePattern, RumbleSide
+from ..datatypes.controls_datatypes import SC_AxisShaping
 
 '''
 This module aims to solve the following problem:
@@ -29,285 +36,406 @@ class SC_Controller(Subsystem):
     Controller class that wraps a GenericHID and provides the following features:
     - Implicit conversion from any input type to any other input type (such as using a trigger as a button)
     - Deadband application for axes
+    - Per-axis shaping with radial or square deadbands, response curves, smoothing and slew limits
     - Edge detection for all input types
-    - Error handling that doesn't halt execution or spam warnings during competition
+    - Event bindings for presses, releases, thresholds, holds, double taps and chords
+    - Rumble patterns with priorities, written to the controller only when the level changes
+    - Recording of every snapshot, and replay of recordings in place of the GenericHID
+    - Fault counting that doesn't halt execution or spam warnings during competition
+
+    Parameters:
+        - port (int): The driver station port of the controller
+        - axis_limit (float): How far an axis has to move to count as a button press
+        - trigger_limit (float): How far a trigger has to move to count as a button press
+        - axis_deadband (float): The deadband applied to stick magnitudes and angles whose axes have no shaping
+        - hid (GenericHID | ReplayHID | None): The device to read instead of the controller on the port, such as a ReplayHID
+        - time_source (Callable[[], seconds]): The clock used for timestamps, holds and double taps
+        - faults (FaultLog): Where to report inputs that fail to read
     '''
-    ERROR_TIMEOUT: int = 100 # Number of periodic cycles to wait between error messages during competition
-    def __init__(self, port: int, axis_limit: float = 0.5, trigger_limit: float = 0.5, axis_deadband: float = 0.02) -> None:
+    def __init__(
+        self,
+        port: int,
+        axis_limit: float = 0.5,
+        trigger_limit: float = 0.5,
+        axis_deadband: float = 0.02,
+        hid: GenericHID | ReplayHID | None = None,
+        time_source: Callable[[], seconds] = Timer.getFPGATimestamp,
+        faults: FaultLog = CONTROLS_FAULTS
+    ) -> None:
         super().__init__()
-        self._controller: GenericHID = GenericHID(port)
-        self._current_inputs: dict[Any, Any] = self._get_all()
-        self._previous_inputs: dict[Any, Any] = self._get_all()
+        self._controller: GenericHID | ReplayHID = GenericHID(port) if hid is None else hid
+        self._time_source: Callable[[], seconds] = time_source
+        self._recording: ControllerRecording | None = None
+        self._probe_counts: bool = True
+        self._counts: tuple[int, int, int] = (0, 0, 0)
         self._axis_limit: float = axis_limit
         self._trigger_limit: float = trigger_limit
         self._axis_deadband: float = axis_deadband
-        self._last_error: int = 0
+        self._port: int = port
+        self._faults: FaultLog = faults
+        self._timestamp: seconds = 0.0
+
+        # The current and previous snapshots are swapped each cycle instead of reallocated
+        self._current_state: ControllerSnapshot = ControllerSnapshot()
+        self._previous_state: ControllerSnapshot = ControllerSnapshot()
+        self._pressed_mask: int = 0
+        self._released_mask: int = 0
+        self._compiled_inputs: dict[Input, CompiledInput] = {}
+        self._bindings: BindingRegistry = BindingRegistry()
+        self._shaper: AxisShaper = AxisShaper()
+        # The raw axes of the current snapshot, so shaping set in the middle of a cycle can be applied right away
+        self._raw_axes: array[float] = array('d', bytes(8 * MAX_AXES))
+        self._haptics: HapticsScheduler = HapticsScheduler()
+        self._left_rumble: float = 0.0
+        self._right_rumble: float = 0.0
+        self._get_all(self._current_state)
+        self._raw_axes[:] = self._current_state.axes
+        self._previous_state.copy_from(self._current_state)
 
     def periodic(self):
-        self._previous_inputs = self._current_inputs
-        self._current_inputs = self._get_all()
-        if self._last_error > 0:
-            self._last_error -= 1
+        self.update(self._time_source())
+
+    def update(self, now: seconds) -> None:
+        '''
+        Take a new snapshot of the controller and dispatch its events.
+        Called by periodic, or by SC_ControllerHub so every controller shares one timestamp.
+        '''
+        self._timestamp = now
+        self._previous_state, self._current_state = self._current_state, self._previous_state
+        self._get_all(self._current_state)
+        # Record the raw inputs so a replay runs them through the same shaping
+        if self._recording is not None:
+            self._recording.append(now, self._current_state)
+        self._raw_axes[:] = self._current_state.axes
+        self._shaper.apply(self._current_state, self._previous_state, now)
+        changed = self._current_state.buttons ^ self._previous_state.buttons
+        self._pressed_mask = changed & self._current_state.buttons
+        self._released_mask = changed & self._previous_state.buttons
+        self._bindings.dispatch(self._current_state, self._previous_state, now)
+        self._update_rumble(now)
+        self._faults.publish(now)
+
+    def get_snapshot(self) -> ControllerSnapshot:
+        '''
+        Get the snapshot taken this cycle.
+        The snapshot is reused on the cycle after next, so copy it to keep it.
+        '''
+        return self._current_state
+
+    def set_axis_shaping(self, input: Input | CompiledInput, shaping: SC_AxisShaping | None) -> None:
+        '''
+        Shape the axes of an input before they are read.
+        Axis pairs such as AXIS_MAGNITUDE inputs shape both axes of the stick together, so a radial deadband can be used.
+        Axes are read raw until shaping is set.
+        Shaping applies its own deadband, so axis_deadband no longer applies to inputs that read shaped axes.
+        Shaping replaces any shaping already set on the same axes, and None removes it.
+        The current snapshot is reshaped straight away, so the next read already returns shaped values.
+        '''
+        compiled = self.compile_input(input)
+        if not compiled.axes:
+            raise ValueError(f"Invalid input for axis shaping: {compiled.input}")
+        self._shaper.set_shaping(compiled.axes, shaping)
+        for other in self._compiled_inputs.values():
+            self._update_deadband(other)
+        self._current_state.axes[:] = self._raw_axes
+        self._shaper.reapply(self._current_state, self._previous_state)
+
+    def on_press(self, input: Input | CompiledInput, action: Action | None = None) -> Binding:
+        '''
+        Run an action when an input is pressed.
+        The action can be a function to call or a command to schedule.
+        '''
+        compiled = self.compile_input(input)
+        return self._bindings.add(Binding(_BindingType.RISING, compiled.button, (compiled,), action), self._current_state)
+    def on_release(self, input: Input | CompiledInput, action: Action | None = None) -> Binding:
+        '''
+        Run an action when an input is released.
+        '''
+        compiled = self.compile_input(input)
+        return self._bindings.add(Binding(_BindingType.FALLING, compiled.button, (compiled,), action), self._current_state)
+    def on_threshold(self, input: Input | CompiledInput, threshold: float, action: Action | None = None) -> Binding:
+        '''
+        Run an action when the axis value of an input crosses a threshold.
+        Positive thresholds fire when the value rises past them, negative thresholds when it falls past them.
+        '''
+        compiled = self.compile_input(input)
+        axis = compiled.axis
+        if threshold >= 0:
+            condition = lambda state: axis(state) >= threshold
+        else:
+            condition = lambda state: axis(state) <= threshold
+        return self._bindings.add(Binding(_BindingType.RISING, condition, (compiled,), action), self._current_state)
+    def on_hold(self, input: Input | CompiledInput, duration: milliseconds, action: Action | None = None) -> Binding:
+        '''
+        Run an action once an input has been held for a duration.
+        '''
+        if duration < 0:
+            raise ValueError(f"Invalid hold duration: {duration}")
+        compiled = self.compile_input(input)
+        return self._bindings.add(Binding(_BindingType.HOLD, compiled.button, (compiled,), action, duration / 1000.0), self._current_state)
+    def on_double_tap(self, input: Input | CompiledInput, action: Action | None = None, window: milliseconds = 300) -> Binding:
+        '''
+        Run an action when an input is pressed twice within a window.
+        '''
+        if window < 0:
+            raise ValueError(f"Invalid double tap window: {window}")
+        compiled = self.compile_input(input)
+        return self._bindings.add(Binding(_BindingType.DOUBLE_TAP, compiled.button, (compiled,), action, window / 1000.0), self._current_state)
+    def on_chord(self, inputs: Iterable[Input | CompiledInput], action: Action | None = None) -> Binding:
+        '''
+        Run an action when every input in a chord is pressed at the same time.
+        '''
+        compiled = tuple(self.compile_input(input) for input in inputs)
+        if not compiled:
+            raise ValueError("Invalid chord: no inputs")
+        buttons = tuple(input.button for input in compiled)
+        condition = lambda state: all(button(state) for button in buttons)
+        return self._bindings.add(Binding(_BindingType.RISING, condition, compiled, action), self._current_state)
+    def remove_binding(self, binding: Binding) -> None:
+        '''
+        Stop running the action of a binding.
+        '''
+        self._bindings.remove(binding)
+
+    def start_recording(self, recording: ControllerRecording | None = None) -> ControllerRecording:
+        '''
+        Start appending every snapshot to a recording, creating a new recording if none is given.
+        '''
+        self._recording = ControllerRecording() if recording is None else recording
+        return self._recording
+    def stop_recording(self) -> ControllerRecording | None:
+        '''
+        Stop recording and return the recording.
+        '''
+        recording = self._recording
+        self._recording = None
+        return recording
 
     def set_left_rumble(self, rumble: float) -> None:
         '''
         Set the left rumble intensity of the controller.
+        Rumble cues with a priority above 0 play over this level.
         '''
-        self._controller.setRumble(GenericHID.RumbleType.kLeftRumble, rumble)
+        self._haptics.set_manual(left=rumble)
     def set_right_rumble(self, rumble: float) -> None:
         '''
         Set the right rumble intensity of the controller.
+        Rumble cues with a priority above 0 play over this level.
         '''
-        self._controller.setRumble(GenericHID.RumbleType.kRightRumble, rumble)
+        self._haptics.set_manual(right=rumble)
     def set_rumble(self, rumble: float) -> None:
         '''
         Set the rumble intensity of the controller.
         '''
-        self.set_left_rumble(rumble)
-        self.set_right_rumble(rumble)
-
-    def _throw_error(self, message:str, error:Exception) -> None:
-        '''
-        Throw an error if an issue occurs while getting an input.
-        Only halt execution if not in competition.
-        '''
-        # print(f'Pytest loaded: {'pytest' in sys.modules}')
-        if DriverStation.isFMSAttached() or 'pytest' in sys.modules:
-            # Don't spam errors
-            if self._last_error == 0:
-                print(message)
-                print(error)
-                self._last_error = self.ERROR_TIMEOUT
+        self._haptics.set_manual(rumble, rumble)
+    def play_rumble(self, pattern: RumblePattern, priority: int = 1, side: RumbleSide = "both") -> RumbleCue:
+        '''
+        Play a timed rumble pattern, starting on the next cycle.
+        On each motor, the highest priority cue playing wins, and cues with the same priority use the strongest level.
+        '''
+        return self._haptics.play(RumbleCue(pattern, priority, side))
+    def cancel_rumble(self, cue: RumbleCue | None = None) -> None:
+        '''
+        Stop a rumble cue, or every cue and the set rumble levels if no cue is given.
+        '''
+        if cue is None:
+            self._haptics.clear()
         else:
-            print(message)
-            raise error
+            self._haptics.cancel(cue)
+    def _update_rumble(self, now: seconds) -> None:
+        '''
+        Mix the rumble cues and write to the controller only if a level changed.
+        '''
+        left, right = self._haptics.update(now)
+        if left != self._left_rumble:
+            self._left_rumble = left
+            self._controller.setRumble(GenericHID.RumbleType.kLeftRumble, left)
+        if right != self._right_rumble:
+            self._right_rumble = right
+            self._controller.setRumble(GenericHID.RumbleType.kRightRumble, right)
+
+    def report_fault(self, source: FaultSource | CompiledInput, error: Exception) -> None:
+        '''
+        Report an issue that occurred while getting an input.
+        Only halts execution if not in competition or a test.
+        Also used by SC_ControllerHub to report inputs it reads on behalf of the controller.
+        '''
+        if isinstance(source, CompiledInput):
+            source = source.input
+        self._faults.report(self._port, source, error, self._timestamp)
 
     def _apply_deadband(self, value: float) -> float:
         '''
         Apply deadband to an axis value.
         '''
-        if abs(value) < self._axis_deadband:
-            return 0.0
-        else:
-            # Scale the output to account for deadband
-            if value > 0:
-                return (value - self._axis_deadband) / (1.0 - self._axis_deadband)
-            else:
-                return (value + self._axis_deadband) / (1.0 - self._axis_deadband)
+        return apply_deadband(value, self._axis_deadband)
 
-    def _get_all(self) -> dict[str, dict[int, bool|int|float]]:
+    def refresh_counts(self) -> bool:
+        '''
+        Read how many buttons, axes and POVs the controller has.
+        Returns True if any of the counts changed.
+        '''
+        controller = self._controller
+        counts = (
+            min(controller.getButtonCount(), MAX_BUTTONS),
+            min(controller.getAxisCount(), MAX_AXES),
+            min(controller.getPOVCount(), MAX_POVS)
+        )
+        changed = counts != self._counts
+        self._counts = counts
+        return changed
+    def set_count_probing(self, enabled: bool) -> None:
+        '''
+        Set whether the button, axis and POV counts are read every cycle.
+        When disabled, the counts only change when refresh_counts is called, such as when a hub sees a controller plugged in.
         '''
-        Get all raw inputs from a controller as a dictionary.
+        self._probe_counts = enabled
+
+    def _get_all(self, state: ControllerSnapshot) -> None:
+        '''
+        Read all raw inputs from a controller into a snapshot.
         Used for tracking when an input changes state.
         '''
-        inputs: dict[str, dict[int, bool|int|float]] = {
-            "buttons": {},
-            "axes": {},
-            "povs": {}
-        }
+        controller = self._controller
+        if self._probe_counts:
+            _ = self.refresh_counts()
+        button_count, axis_count, pov_count = self._counts
+        if (button_count, axis_count, pov_count) != (state.button_count, state.axis_count, state.pov_count):
+            # Inputs beyond the counts are never written, so reset them when the controller changes
+            state.clear()
+            state.button_count = button_count
+            state.axis_count = axis_count
+            state.pov_count = pov_count
+        try:
+            buttons = 0
+            for i in range(state.button_count):
+                if controller.getRawButton(i + 1):
+                    buttons |= 1 << i
+            state.buttons = buttons
+            axes = state.axes
+            for i in range(state.axis_count):
+                axes[i] = controller.getRawAxis(i)
+            povs = state.povs
+            for i in range(state.pov_count):
+                povs[i] = controller.getPOV(i)
+        except Exception:
+            # Only fall back to reading each input on its own when something fails, so the failure can be reported
+            self._get_all_checked(state)
 
-        for i in range(1, self._controller.getButtonCount() + 1):
+    def _get_all_checked(self, state: ControllerSnapshot) -> None:
+        '''
+        Read all raw inputs from a controller into a snapshot, reporting each input that fails.
+        '''
+        state.clear()
+        for i in range(state.button_count):
             try:
-                inputs["buttons"][i] = self._controller.getRawButton(i)
+                if self._controller.getRawButton(i + 1):
+                    state.buttons |= 1 << i
             except Exception as e:
-                inputs["buttons"][i] = False
-                self._throw_error(f"Failed to get button {i} state for controller {self._controller.getPort()}", e)
+                self.report_fault(("button", i + 1), e)
 
-        for i in range(self._controller.getAxisCount()):
+        for i in range(state.axis_count):
             try:
-                inputs["axes"][i] = self._controller.getRawAxis(i)
+                state.axes[i] = self._controller.getRawAxis(i)
             except Exception as e:
-                inputs["axes"][i] = 0.0
-                self._throw_error(f"Failed to get axis {i} state for controller {self._controller.getPort()}", e)
-        
-        for i in range(self._controller.getPOVCount()):
+                state.axes[i] = 0.0
+                self.report_fault(("axis", i), e)
+
+        for i in range(state.pov_count):
             try:
-                inputs["povs"][i] = self._controller.getPOV(i)
+                state.povs[i] = self._controller.getPOV(i)
             except Exception as e:
-                inputs["povs"][i] = -1
-                self._throw_error(f"Failed to get POV {i} state for controller {self._controller.getPort()}", e)
+                state.povs[i] = -1
+                self.report_fault(("pov", i), e)
 
-        return inputs
-    
-    def _get_polar_axis(self, axis_x_index: int, axis_y_index: int, inputs: dict[Any, Any]|None = None) -> Translation2d:
+    def compile_input(self, input: Input | CompiledInput) -> CompiledInput:
         '''
-        Get the Translation2d of a pair of axes.
+        Compile an input into accessors that read straight from the controller state.
+        Holding on to the compiled input skips the lookup when it is passed to the get methods.
+        Inputs are compiled on first use, so the get methods call this too.
         '''
-        if inputs is None:
-            inputs = self._current_inputs
-        return Translation2d(
-            self._current_inputs["axes"][axis_x_index],
-            self._current_inputs["axes"][axis_y_index]
-        )
-    
-    def get_button(self, input: Input, input_states: dict[Any, Any]|None = None) -> bool:
+        if isinstance(input, CompiledInput):
+            return input
+        compiled = self._compiled_inputs.get(input)
+        if compiled is None:
+            compiled = CompiledInput(input, self._axis_limit, self._trigger_limit, self._axis_deadband)
+            self._compiled_inputs[input] = compiled
+            self._update_deadband(compiled)
+        return compiled
+
+    def _update_deadband(self, compiled: CompiledInput) -> None:
+        '''
+        Turn off the controller's deadband for an input whose axes are shaped, so only the shaping's deadband applies.
+        '''
+        compiled.deadband = 0.0 if self._shaper.has_shaping(compiled.axes) else self._axis_deadband
+
+    def get_button(self, input: Input | CompiledInput, input_states: ControllerSnapshot|None = None) -> bool:
         '''
         Get the value of an input as True/False.
         '''
         if input_states is None:
-            input_states = self._current_inputs
+            input_states = self._current_state
         try:
-            match input.type:
-                case _InputType.BUTTON:
-                    # True if button is pressed
-                    return bool(input_states["buttons"][input.index[0]])
-                case _InputType.AXIS:
-                    # True if axis value is beyond limit
-                    return abs(input_states["axes"][input.index[0]]) > self._axis_limit
-                case _InputType.AXIS_MAGNITUDE | _InputType.AXIS_ANGLE:
-                    # True if magnitude of axis pair is beyond limit
-                    return self._get_polar_axis(input.index[0], input.index[1], input_states).norm() > self._axis_limit
-                case _InputType.TRIGGER:
-                    # True if trigger value is beyond limit
-                    return input_states["axes"][input.index[0]] > self._trigger_limit
-                case _InputType.POV:
-                    # True if POV is at specified angle
-                    return input_states["povs"][input.index[0]] == input.index[1]
-                case _InputType.POV_ANGLE:
-                    # True if POV is not neutral
-                    return input_states["povs"][input.index[0]] > -1
-                case _InputType.POV_X:
-                    # True if POV is in any left/right position
-                    return input_states["povs"][input.index[0]] in (45, 90, 135, 215, 270, 315)
-                case _InputType.POV_Y:
-                    # True if POV is in any up/down position
-                    return input_states["povs"][input.index[0]] in (315, 0, 45, 135, 180, 225)
+            return self.compile_input(input).button(input_states)
         except Exception as e:
-            self._throw_error(f"Failed to get button for input {input} of controller {self._controller.getPort()}", e)
+            self.report_fault(input, e)
         return False
-    def get_button_pressed(self, input: Input) -> bool:
+    def get_button_pressed(self, input: Input | CompiledInput) -> bool:
         '''
         Get whether an input was pressed this cycle.
         '''
-        return self.get_button(input, self._current_inputs) and not self.get_button(input, self._previous_inputs)
-    def get_button_released(self, input: Input) -> bool:
+        try:
+            compiled = self.compile_input(input)
+        except Exception as e:
+            self.report_fault(input, e)
+            return False
+        if compiled.mask:
+            return self._pressed_mask & compiled.mask != 0
+        return self.get_button(compiled, self._current_state) and not self.get_button(compiled, self._previous_state)
+    def get_button_released(self, input: Input | CompiledInput) -> bool:
         '''
         Get whether an input was released this cycle.
         '''
-        return not self.get_button(input, self._current_inputs) and self.get_button(input, self._previous_inputs)
+        try:
+            compiled = self.compile_input(input)
+        except Exception as e:
+            self.report_fault(input, e)
+            return False
+        if compiled.mask:
+            return self._released_mask & compiled.mask != 0
+        return not self.get_button(compiled, self._current_state) and self.get_button(compiled, self._previous_state)
 
-    def get_axis(self, input: Input, input_states: dict[Any, Any]|None = None) -> float:
+    def get_axis(self, input: Input | CompiledInput, input_states: ControllerSnapshot|None = None) -> float:
         '''
         Get the value of an input on a scale of -1.0 to 1.0 (or 0.0 to 1.0 for some inputs).
         '''
         if input_states is None:
-            input_states = self._current_inputs
+            input_states = self._current_state
         try:
-            match input.type:
-                case _InputType.BUTTON:
-                    # 1.0 if button is pressed, 0.0 if not
-                    return 1.0 if input_states["buttons"][input.index[0]] else 0.0
-                case _InputType.AXIS:
-                    # Direct axis value
-                    return float(input_states["axes"][input.index[0]])
-                case _InputType.AXIS_MAGNITUDE:
-                    # Magnitude of axis pair
-                    return self._apply_deadband(self._get_polar_axis(input.index[0], input.index[1], input_states).norm())
-                case _InputType.AXIS_ANGLE:
-                    # Direction of axis pair in rotations
-                    axis2d = self._get_polar_axis(input.index[0], input.index[1], input_states)
-                    if axis2d.norm() < self._axis_deadband:
-                        return 0.0
-                    return axis2d.angle().degrees() / 180.0
-                case _InputType.TRIGGER:
-                    # Direct trigger value
-                    return float(input_states["axes"][input.index[0]])
-                case _InputType.POV:
-                    # 1.0 if POV is at specified angle, 0.0 otherwise
-                    return 1.0 if input.index[1] == input_states["povs"][input.index[0]] else 0.0
-                case _InputType.POV_ANGLE:
-                    # Direction of POV in rotations
-                    pov = int(input_states["povs"][input.index[0]])
-                    if pov == -1:
-                        return 0.0
-                    return pov / 360.0
-                case _InputType.POV_X:
-                    # X component of POV as -1.0, 0.0, or 1.0 (positive right)
-                    pov = int(input_states["povs"][input.index[0]])
-                    if pov in (45, 90, 135):
-                        return 1.0
-                    elif pov in (215, 270, 315):
-                        return -1.0
-                    else:
-                        return 0.0
-                case _InputType.POV_Y:
-                    # Y component of POV as -1.0, 0.0, or 1.0 (positive down)
-                    pov = int(input_states["povs"][input.index[0]])
-                    if pov in (315, 0, 45):
-                        return -1.0
-                    elif pov in (135, 180, 225):
-                        return 1.0
+            return self.compile_input(input).axis(input_states)
         except Exception as e:
-            self._throw_error(f"Failed to get axis for input {input} of controller {self._controller.getPort()}", e)
+            self.report_fault(input, e)
         return 0.0
-    def get_axis_change(self, input: Input) -> float:
+    def get_axis_change(self, input: Input | CompiledInput) -> float:
         '''
         Get the change in value of an input since last cycle.
         '''
-        return self.get_axis(input, self._current_inputs) - self.get_axis(input, self._previous_inputs)
+        return self.get_axis(input, self._current_state) - self.get_axis(input, self._previous_state)
 
-    def get_angle(self, input: Input, input_states: dict[Any, Any]|None = None) -> float:
+    def get_angle(self, input: Input | CompiledInput, input_states: ControllerSnapshot|None = None) -> float:
         '''
         Get the angle of an input in degrees from 0 to 360 or -1 for neutral.
         While this supports any input type, it is primarily intended for use with AXIS_ANGLE and POV_ANGLE types.
         '''
         if input_states is None:
-            input_states = self._current_inputs
+            input_states = self._current_state
         try:
-            match input.type:
-                case _InputType.BUTTON:
-                    # 0.0 if button is pressed, -1.0 if not
-                    return 0.0 if input_states["buttons"][input.index[0]] else -1.0
-                case _InputType.AXIS:
-                    # 0.0 to 360.0 based on axis value or -1.0 if within deadband
-                    axis_value = input_states["axes"][input.index[0]]
-                    if abs(axis_value) < self._axis_deadband:
-                        return -1.0
-                    return 180 + 180 * self._apply_deadband(axis_value)
-                case _InputType.AXIS_MAGNITUDE:
-                    # Magnitude of axis pair scaled from 0.0 to 360.0 or -1.0 if within deadband
-                    magnitude = self._get_polar_axis(input.index[0], input.index[1], input_states).norm()
-                    if magnitude < self._axis_deadband:
-                        return -1.0
-                    return self._apply_deadband(magnitude) * 360.0
-                case _InputType.AXIS_ANGLE:
-                    # Direction of axis pair in degrees or -1.0 if within deadband
-                    axis2d = self._get_polar_axis(input.index[0], input.index[1], input_states)
-                    if axis2d.norm() < self._axis_deadband:
-                        return 0.0
-                    return (axis2d.angle().degrees() + 360.0) % 360.0
-                case _InputType.TRIGGER:
-                    # 0.0 to 360.0 based on trigger value
-                    return float(input_states["axes"][input.index[0]]) * 360.0
-                case _InputType.POV:
-                    # Direction of POV in degrees if that direction is pressed, -1.0 otherwise
-                    return input.index[1] if input_states["povs"][input.index[0]] else -1.0
-                case _InputType.POV_ANGLE:
-                    # Direction of POV in degrees
-                    return float(input_states["povs"][input.index[0]])
-                case _InputType.POV_X:
-                    # X component of POV as angle: 0 (right), 180 (left), -1 (neutral)
-                    pov = int(input_states["povs"][input.index[0]])
-                    if pov in (45, 90, 135):
-                        return 0.0
-                    elif pov in (215, 270, 315):
-                        return 180.0
-                    else:
-                        return -1.0
-                case _InputType.POV_Y:
-                    # Y component of POV as angle: 90 (down), 270 (up), -1 (neutral)
-                    pov = int(input_states["povs"][input.index[0]])
-                    if pov in (315, 0, 45):
-                        return 270.0
-                    elif pov in (135, 180, 225):
-                        return 90.0
-                    else:
-                        return -1.0
+            return self.compile_input(input).angle(input_states)
         except Exception as e:
-            self._throw_error(f"Failed to get angle for input {input} of controller {self._controller.getPort()}", e)
+            self.report_fault(input, e)
         return -1.0
-    def get_angle_change(self, input: Input) -> float:
+    def get_angle_change(self, input: Input | CompiledInput) -> float:
         '''
         Get the change in angle of an input since last cycle.
         '''
-        return self.get_angle(input, self._current_inputs) - self.get_angle(input, self._previous_inputs)
+        return self.get_angle(input, self._current_state) - self.get_angle(input, self._previous_state)
@@ -0,0 +1,162 @@
+import sys
+from collections import deque
+from dataclasses import dataclass
+from math import inf
+
+from ntcore import IntegerPublisher, NetworkTableInstance, StringPublisher
+from wpilib import DriverStation
+from wpimath.units import seconds
+
+from .controller_constants import Input
+
+'''
+Structured fault reporting for the controls path.
+
+Faults are counted per source and per controller and kept in a ring buffer, without formatting any strings when they
+happen. The counters are published to NetworkTables at PUBLISH_PERIOD, and each source is printed the first time it
+fails, so a fault that repeats every cycle never floods the console or hides faults from other inputs.
+'''
+
+FaultSource = Input | tuple[str, int] | str
+
+@dataclass(frozen=True)
+class ControlsFault:
+    '''
+    A single failure to read a controller input
+
+    Parameters:
+        - timestamp (seconds): When the failure happened
+        - port (int): The port of the controller
+        - source (FaultSource): The input, raw input such as ("axis", 2), or input name that failed
+        - error (Exception): The error that was raised
+    '''
+    timestamp: seconds
+    port: int
+    source: FaultSource
+    error: Exception
+
+    def __str__(self) -> str:
+        return f"{self.timestamp:.3f}s controller {self.port} {self.source}: {type(self.error).__name__}: {self.error}"
+
+class FaultLog:
+    '''
+    Counts controls faults and publishes the counters to NetworkTables at a low rate
+
+    Outside of competition and tests, faults are raised instead so they get fixed during development.
+
+    Parameters:
+        - table (str): The NetworkTables table to publish to
+        - history (int): How many recent faults to keep
+    '''
+    PUBLISH_PERIOD: seconds = 1.0 # Time between NetworkTables updates
+
+    def __init__(self, table: str = "Controls Faults", history: int = 64) -> None:
+        self._table_name: str = table
+        self._recent: deque[ControlsFault] = deque(maxlen=history)
+        self._source_counts: dict[tuple[int, FaultSource], int] = {}
+        self._port_counts: dict[int, int] = {}
+        self._total: int = 0
+        self._published_total: int = -1
+        self._next_publish: seconds = -inf
+        self._testing: bool = 'pytest' in sys.modules
+
+        self._total_publisher: IntegerPublisher | None = None
+        self._last_fault_publisher: StringPublisher | None = None
+        self._port_publishers: dict[int, IntegerPublisher] = {}
+
+    def report(self, port: int, source: FaultSource, error: Exception, now: seconds) -> None:
+        '''
+        Records a fault, raising it instead when not in competition or a test
+
+        Parameters:
+            - port (int): The port of the controller
+            - source (FaultSource): The input that failed
+            - error (Exception): The error that was raised
+            - now (seconds): The current time
+        '''
+        if not self._testing and not DriverStation.isFMSAttached():
+            print(f"Failed to read {source} of controller {port}")
+            raise error
+
+        key = (port, source)
+        count = self._source_counts.get(key, 0)
+        if count == 0:
+            print(f"Failed to read {source} of controller {port}: {error}")
+        self._source_counts[key] = count + 1
+        self._port_counts[port] = self._port_counts.get(port, 0) + 1
+        self._total += 1
+        self._recent.append(ControlsFault(now, port, source, error))
+
+    def publish(self, now: seconds) -> None:
+        '''
+        Publishes the counters if PUBLISH_PERIOD has passed and anything changed
+
+        Parameters:
+            - now (seconds): The current time
+        '''
+        if now < self._next_publish:
+            return
+        self._next_publish = now + self.PUBLISH_PERIOD
+        if self._total == self._published_total:
+            return
+        self._published_total = self._total
+
+        if self._total_publisher is None or self._last_fault_publisher is None:
+            table = NetworkTableInstance.getDefault().getTable(self._table_name)
+            self._total_publisher = table.getIntegerTopic("Total").publish()
+            self._last_fault_publisher = table.getStringTopic("Last Fault").publish()
+        self._total_publisher.set(self._total)
+        if self._recent:
+            self._last_fault_publisher.set(str(self._recent[-1]))
+
+        for port in self._port_counts:
+            if port not in self._port_publishers:
+                table = NetworkTableInstance.getDefault().getTable(self._table_name)
+                self._port_publishers[port] = table.getIntegerTopic(f"Controller {port}").publish()
+        for port, publisher in self._port_publishers.items():
+            publisher.set(self._port_counts.get(port, 0))
+
+    def get_total(self) -> int:
+        '''
+        Returns the number of faults reported
+
+        Returns:
+            - int: The total number of faults
+        '''
+        return self._total
+
+    def get_count(self, port: int, source: FaultSource | None = None) -> int:
+        '''
+        Returns the number of faults for a controller, or for one of its inputs
+
+        Parameters:
+            - port (int): The port of the controller
+            - source (FaultSource | None): The input to count, or None for every input
+
+        Returns:
+            - int: The number of faults
+        '''
+        if source is None:
+            return self._port_counts.get(port, 0)
+        return self._source_counts.get((port, source), 0)
+
+    def get_recent(self) -> list[ControlsFault]:
+        '''
+        Returns the most recent faults, oldest first
+
+        Returns:
+            - list[ControlsFault]: Up to history faults
+        '''
+        return list(self._recent)
+
+    def clear(self) -> None:
+        '''
+        Clears every counter and the recent faults
+        '''
+        self._recent.clear()
+        self._source_counts.clear()
+        self._port_counts.clear()
+        self._total = 0
+        self._published_total = -1
+
+CONTROLS_FAULTS: FaultLog = FaultLog()
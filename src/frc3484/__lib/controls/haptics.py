@@ -0,0 +1,221 @@
+from abc import ABC, abstractmethod
+from typing import Literal
+
+from wpimath.units import seconds
+
+'''
+Timed rumble patterns and the scheduler that mixes them.
+
+Every cue has a priority. For each rumble motor the highest priority cue that is playing on it wins, and cues with
+the same priority are mixed by taking the strongest level. The levels set directly on the controller act as a cue
+with priority 0 that never ends.
+'''
+
+RumbleSide = Literal["left", "right", "both"]
+
+class RumblePattern(ABC):
+    '''
+    A rumble level that changes over a fixed duration
+
+    Parameters:
+        - duration (seconds): How long the pattern plays for
+    '''
+    def __init__(self, duration: seconds) -> None:
+        if duration < 0:
+            raise ValueError(f"Invalid rumble duration: {duration}")
+        self.duration: seconds = duration
+
+    @abstractmethod
+    def get_level(self, elapsed: seconds) -> float:
+        '''
+        Returns the rumble level at a point in the pattern
+
+        Parameters:
+            - elapsed (seconds): The time since the pattern started, from 0 to duration
+
+        Returns:
+            - float: The rumble level from 0.0 to 1.0
+        '''
+
+class RumblePulse(RumblePattern):
+    '''
+    A constant rumble
+
+    Parameters:
+        - intensity (float): The rumble level from 0.0 to 1.0
+        - duration (seconds): How long to rumble for
+    '''
+    def __init__(self, intensity: float, duration: seconds) -> None:
+        super().__init__(duration)
+        self._intensity: float = intensity
+
+    def get_level(self, elapsed: seconds) -> float:
+        return self._intensity
+
+class RumbleRamp(RumblePattern):
+    '''
+    A rumble that changes linearly from one level to another
+
+    Parameters:
+        - start (float): The rumble level at the start
+        - end (float): The rumble level at the end
+        - duration (seconds): How long the ramp takes
+    '''
+    def __init__(self, start: float, end: float, duration: seconds) -> None:
+        super().__init__(duration)
+        self._start: float = start
+        self._end: float = end
+
+    def get_level(self, elapsed: seconds) -> float:
+        if self.duration == 0:
+            return self._end
+        return self._start + (self._end - self._start) * min(elapsed / self.duration, 1.0)
+
+class RumbleHeartbeat(RumblePattern):
+    '''
+    Repeated double pulses, like a heartbeat
+
+    Parameters:
+        - intensity (float): The rumble level of each pulse
+        - beats (int): How many heartbeats to play
+        - period (seconds): The time from the start of one heartbeat to the next
+        - pulse_length (seconds): How long each of the two pulses in a heartbeat lasts
+    '''
+    def __init__(self, intensity: float, beats: int = 3, period: seconds = 0.8, pulse_length: seconds = 0.1) -> None:
+        if beats < 1 or period <= 0 or not 0 < 3 * pulse_length <= period:
+            raise ValueError(f"Invalid heartbeat: {beats} beats, {period} period, {pulse_length} pulse length")
+        super().__init__(beats * period)
+        self._intensity: float = intensity
+        self._period: seconds = period
+        self._pulse_length: seconds = pulse_length
+
+    def get_level(self, elapsed: seconds) -> float:
+        phase = elapsed % self._period
+        if phase < self._pulse_length or 2 * self._pulse_length <= phase < 3 * self._pulse_length:
+            return self._intensity
+        return 0.0
+
+class RumbleCue:
+    '''
+    A pattern playing on a controller
+
+    Parameters:
+        - pattern (RumblePattern): The pattern to play
+        - priority (int): Higher priority cues override lower ones on the same motor
+        - side (RumbleSide): Which rumble motors to play on
+    '''
+    __slots__ = ("pattern", "priority", "left", "right", "start_time")
+
+    def __init__(self, pattern: RumblePattern, priority: int, side: RumbleSide) -> None:
+        if side not in ("left", "right", "both"):
+            raise ValueError(f"Invalid rumble side: {side}")
+        self.pattern: RumblePattern = pattern
+        self.priority: int = priority
+        self.left: bool = side != "right"
+        self.right: bool = side != "left"
+        self.start_time: seconds | None = None
+
+class HapticsScheduler:
+    '''
+    Mixes the rumble cues playing on a controller into one level per motor
+    '''
+    def __init__(self) -> None:
+        self._cues: list[RumbleCue] = []
+        self._manual_left: float = 0.0
+        self._manual_right: float = 0.0
+
+    def set_manual(self, left: float | None = None, right: float | None = None) -> None:
+        '''
+        Sets the levels that play when no higher priority cue is playing
+
+        Parameters:
+            - left (float | None): The left level, or None to keep it
+            - right (float | None): The right level, or None to keep it
+        '''
+        if left is not None:
+            self._manual_left = left
+        if right is not None:
+            self._manual_right = right
+
+    def play(self, cue: RumbleCue) -> RumbleCue:
+        '''
+        Starts playing a cue on the next update
+
+        Parameters:
+            - cue (RumbleCue): The cue to play
+
+        Returns:
+            - RumbleCue: The cue, which can be passed to cancel
+        '''
+        self._cues.append(cue)
+        return cue
+
+    def cancel(self, cue: RumbleCue) -> None:
+        '''
+        Stops a cue if it is still playing
+
+        Parameters:
+            - cue (RumbleCue): The cue to stop
+        '''
+        if cue in self._cues:
+            self._cues.remove(cue)
+
+    def clear(self) -> None:
+        '''
+        Stops every cue and the manual levels
+        '''
+        self._cues.clear()
+        self._manual_left = 0.0
+        self._manual_right = 0.0
+
+    def update(self, now: seconds) -> tuple[float, float]:
+        '''
+        Drops finished cues and mixes the rest
+
+        Parameters:
+            - now (seconds): The current time
+
+        Returns:
+            - tuple[float, float]: The left and right rumble levels
+        '''
+        left_priority = right_priority = 0
+        left = self._manual_left
+        right = self._manual_right
+        if not self._cues:
+            return left, right
+
+        playing: list[RumbleCue] = []
+        for cue in self._cues:
+            if cue.start_time is None:
+                cue.start_time = now
+            elapsed = now - cue.start_time
+            if elapsed > cue.pattern.duration:
+                continue
+            playing.append(cue)
+
+            level = cue.pattern.get_level(elapsed)
+            priority = cue.priority
+            if cue.left:
+                if priority > left_priority:
+                    left_priority, left = priority, level
+                elif priority == left_priority and level > left:
+                    left = level
+            if cue.right:
+                if priority > right_priority:
+                    right_priority, right = priority, level
+                elif priority == right_priority and level > right:
+                    right = level
+        self._cues = playing
+        return left, right
+
+    def is_playing(self, cue: RumbleCue) -> bool:
+        '''
+        Returns whether a cue is waiting to play or still playing
+
+        Parameters:
+            - cue (RumbleCue): The cue to check
+
+        Returns:
+            - bool: True if the cue hasn't finished or been cancelled
+        '''
+        return cue in self._cues
@@ -0,0 +1,265 @@
+from dataclasses import fields
+from typing import Callable, override
+
+from commands2 import CommandScheduler, Subsystem
+from wpilib import Timer
+from wpilib.interfaces import GenericHID
+from wpimath.units import seconds
+
+from .compiled_input import CompiledInput
+from .controller import SC_Controller
+from .controller_constants import Input, XboxControllerMap, DualShock4Map, LogitechExtreme3DMap
+from .snapshot import ControllerSnapshot
+
+ControllerMap = type[XboxControllerMap] | type[DualShock4Map] | type[LogitechExtreme3DMap]
+
+def detect_controller_map(hid: GenericHID) -> ControllerMap | None:
+    '''
+    Works out which controller map matches the device plugged into a port
+
+    Parameters:
+        - hid (GenericHID): The device to check
+
+    Returns:
+        - ControllerMap | None: The matching map, or None if the device isn't recognized
+    '''
+    name = hid.getName().lower()
+    if "wireless controller" in name or "dualshock" in name:
+        return DualShock4Map
+    if "extreme 3d" in name:
+        return LogitechExtreme3DMap
+    if hid.getType() == GenericHID.HIDType.kXInputGamepad or "xbox" in name:
+        return XboxControllerMap
+    return None
+
+class SC_ControllerHub(Subsystem):
+    '''
+    Owns a controller for every role and polls them all once per cycle with a shared timestamp
+
+    Inputs from every controller are available in one namespace as "role.INPUT", such as "driver.A_BUTTON", using
+    the controller map that matches the device plugged into each port. Connections are checked every PROBE_PERIOD
+    seconds instead of every cycle, and a controller's button, axis and POV counts are only read again when it is
+    plugged in or swapped.
+
+    Parameters:
+        - ports (dict[str, int]): The driver station port for each role, such as {"driver": 0, "operator": 1}
+        - maps (dict[str, ControllerMap] | None): Maps to use for some roles instead of detecting them
+        - axis_limit (float): How far an axis has to move to count as a button press
+        - trigger_limit (float): How far a trigger has to move to count as a button press
+        - axis_deadband (float): The deadband applied to stick axes that have no shaping of their own
+        - time_source (Callable[[], seconds]): The clock used for the shared timestamp
+    '''
+    PROBE_PERIOD: seconds = 1.0 # Time between checks for controllers being plugged in or unplugged
+
+    def __init__(
+        self,
+        ports: dict[str, int],
+        maps: dict[str, ControllerMap] | None = None,
+        axis_limit: float = 0.5,
+        trigger_limit: float = 0.5,
+        axis_deadband: float = 0.02,
+        time_source: Callable[[], seconds] = Timer.getFPGATimestamp
+    ) -> None:
+        super().__init__()
+        if len(set(ports.values())) != len(ports):
+            raise ValueError(f"Invalid controller ports: {ports}")
+
+        self._time_source: Callable[[], seconds] = time_source
+        self._timestamp: seconds = time_source()
+        self._next_probe: seconds = self._timestamp
+        self._forced_maps: dict[str, ControllerMap] = dict(maps or {})
+
+        self._hids: dict[str, GenericHID] = {}
+        self._controllers: dict[str, SC_Controller] = {}
+        self._connected: dict[str, bool] = {}
+        self._maps: dict[str, ControllerMap | None] = {}
+        self._names: dict[str, tuple[SC_Controller, CompiledInput]] = {}
+
+        for role, port in ports.items():
+            hid = GenericHID(port)
+            controller = SC_Controller(port, axis_limit, trigger_limit, axis_deadband, hid=hid, time_source=time_source)
+            # The hub updates its controllers, so they shouldn't also poll themselves as subsystems
+            CommandScheduler.getInstance().unregisterSubsystem(controller)
+            controller.set_count_probing(False)
+            self._hids[role] = hid
+            self._controllers[role] = controller
+            self._connected[role] = False
+            self._maps[role] = self._forced_maps.get(role)
+        self._probe()
+
+    @override
+    def periodic(self) -> None:
+        '''
+        Takes a snapshot of every controller with one shared timestamp
+        '''
+        now = self._time_source()
+        self._timestamp = now
+        if now >= self._next_probe:
+            self._next_probe = now + self.PROBE_PERIOD
+            self._probe()
+        for controller in self._controllers.values():
+            controller.update(now)
+
+    def _probe(self) -> None:
+        '''
+        Checks for controllers being plugged in, unplugged or swapped
+        '''
+        for role, hid in self._hids.items():
+            connected = hid.isConnected()
+            if not connected and not self._connected[role]:
+                continue
+
+            counts_changed = self._controllers[role].refresh_counts()
+            if connected == self._connected[role] and not counts_changed:
+                continue
+
+            self._connected[role] = connected
+            detected = detect_controller_map(hid) if connected else None
+            self._maps[role] = self._forced_maps.get(role, detected)
+            # Names resolve against the map of the device, so drop the ones for this role
+            prefix = f"{role}."
+            self._names = {name: value for name, value in self._names.items() if not name.startswith(prefix)}
+
+    def get_timestamp(self) -> seconds:
+        '''
+        Returns the time the current snapshots were taken
+
+        Returns:
+            - seconds: The shared timestamp of this cycle
+        '''
+        return self._timestamp
+
+    def get_controller(self, role: str) -> SC_Controller:
+        '''
+        Returns the controller for a role
+
+        Parameters:
+            - role (str): The role of the controller
+
+        Returns:
+            - SC_Controller: The controller
+        '''
+        return self._controllers[role]
+
+    def get_snapshot(self, role: str) -> ControllerSnapshot:
+        '''
+        Returns the snapshot of a controller taken this cycle
+
+        Parameters:
+            - role (str): The role of the controller
+
+        Returns:
+            - ControllerSnapshot: The snapshot
+        '''
+        return self._controllers[role].get_snapshot()
+
+    def get_controller_map(self, role: str) -> ControllerMap | None:
+        '''
+        Returns the controller map used for a role
+
+        Parameters:
+            - role (str): The role of the controller
+
+        Returns:
+            - ControllerMap | None: The map, or None if the device isn't plugged in or recognized
+        '''
+        return self._maps[role]
+
+    def is_connected(self, role: str) -> bool:
+        '''
+        Returns whether the controller for a role was plugged in at the last check
+
+        Parameters:
+            - role (str): The role of the controller
+
+        Returns:
+            - bool: True if the controller is plugged in
+        '''
+        return self._connected[role]
+
+    def resolve(self, name: str) -> tuple[SC_Controller, CompiledInput]:
+        '''
+        Looks up an input by name, such as "driver.A_BUTTON"
+
+        Parameters:
+            - name (str): The role and input name separated by a dot
+
+        Returns:
+            - tuple[SC_Controller, CompiledInput]: The controller and the compiled input
+        '''
+        resolved = self._names.get(name)
+        if resolved is None:
+            role, _, input_name = name.partition(".")
+            controller = self._controllers.get(role)
+            controller_map = self._maps.get(role)
+            if controller is None or controller_map is None:
+                raise ValueError(f"Invalid input name {name}: no controller map for role {role}")
+            input = next((field.default for field in fields(controller_map) if field.name == input_name), None)
+            if not isinstance(input, Input):
+                raise ValueError(f"Invalid input name {name}: {controller_map.__name__} has no input {input_name}")
+            resolved = (controller, controller.compile_input(input))
+            self._names[name] = resolved
+        return resolved
+
+    def get_button(self, name: str) -> bool:
+        '''
+        Get the value of a named input as True/False.
+        '''
+        try:
+            controller, input = self.resolve(name)
+        except ValueError as e:
+            self._report(name, e)
+            return False
+        return controller.get_button(input)
+
+    def get_button_pressed(self, name: str) -> bool:
+        '''
+        Get whether a named input was pressed this cycle.
+        '''
+        try:
+            controller, input = self.resolve(name)
+        except ValueError as e:
+            self._report(name, e)
+            return False
+        return controller.get_button_pressed(input)
+
+    def get_button_released(self, name: str) -> bool:
+        '''
+        Get whether a named input was released this cycle.
+        '''
+        try:
+            controller, input = self.resolve(name)
+        except ValueError as e:
+            self._report(name, e)
+            return False
+        return controller.get_button_released(input)
+
+    def get_axis(self, name: str) -> float:
+        '''
+        Get the value of a named input on a scale of -1.0 to 1.0 (or 0.0 to 1.0 for some inputs).
+        '''
+        try:
+            controller, input = self.resolve(name)
+        except ValueError as e:
+            self._report(name, e)
+            return 0.0
+        return controller.get_axis(input)
+
+    def get_angle(self, name: str) -> float:
+        '''
+        Get the angle of a named input in degrees from 0 to 360 or -1 for neutral.
+        '''
+        try:
+            controller, input = self.resolve(name)
+        except ValueError as e:
+            self._report(name, e)
+            return -1.0
+        return controller.get_angle(input)
+
+    def _report(self, name: str, error: Exception) -> None:
+        '''
+        Reports a name that couldn't be resolved as a fault of the controller for its role, or the first controller
+        '''
+        role = name.partition(".")[0]
+        controller = self._controllers.get(role) or next(iter(self._controllers.values()))
+        controller.report_fault(name, error)
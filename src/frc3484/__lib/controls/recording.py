@@ -0,0 +1,211 @@
+import struct
+from functools import cache
+from math import nan
+
+from wpilib.interfaces import GenericHID
+from wpimath.units import seconds
+
+from .snapshot import ControllerSnapshot
+
+'''
+Recording and replay of controller inputs.
+
+A recording stores one frame per controller periodic: the timestamp, the button bitmask, the axis values and the
+POV angles. Replaying it through ReplayHID feeds the exact same values back into SC_Controller, so driver issues can
+be reproduced and the input path can be timed without a driver station.
+'''
+
+_FRAME_HEADER: struct.Struct = struct.Struct("<dIBBB")
+
+@cache
+def _frame_struct(axis_count: int, pov_count: int) -> struct.Struct:
+    '''
+    Gets the layout of a frame with the given number of axes and POVs
+    '''
+    return struct.Struct(f"{_FRAME_HEADER.format}{axis_count}d{pov_count}h")
+
+class ControllerRecording:
+    '''
+    A sequence of controller snapshots that can be saved to and loaded from a compact binary file
+
+    The file is a small header followed by each frame packed back to back. Frames only store the axes and POVs the
+    controller actually has, so an Xbox controller frame is 65 bytes.
+    '''
+    _MAGIC: bytes = b"CTLR"
+    _VERSION: int = 1
+    _HEADER: struct.Struct = struct.Struct("<4sHI")
+
+    def __init__(self) -> None:
+        self._data: bytearray = bytearray()
+        self._offsets: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def append(self, timestamp: seconds, snapshot: ControllerSnapshot) -> None:
+        '''
+        Adds a snapshot to the end of the recording
+
+        Parameters:
+            - timestamp (seconds): When the snapshot was taken
+            - snapshot (ControllerSnapshot): The snapshot to record
+        '''
+        axis_count = snapshot.axis_count
+        pov_count = snapshot.pov_count
+        self._offsets.append(len(self._data))
+        self._data += _frame_struct(axis_count, pov_count).pack(
+            timestamp, snapshot.buttons, snapshot.button_count, axis_count, pov_count,
+            *snapshot.axes[:axis_count], *snapshot.povs[:pov_count]
+        )
+
+    def read(self, index: int, snapshot: ControllerSnapshot) -> seconds:
+        '''
+        Copies a recorded frame into a snapshot
+
+        Parameters:
+            - index (int): The frame to read
+            - snapshot (ControllerSnapshot): The snapshot to fill
+
+        Returns:
+            - seconds: When the frame was recorded
+        '''
+        offset = self._offsets[index]
+        timestamp, buttons, button_count, axis_count, pov_count = _FRAME_HEADER.unpack_from(self._data, offset)
+        values = _frame_struct(axis_count, pov_count).unpack_from(self._data, offset)
+        if (button_count, axis_count, pov_count) != (snapshot.button_count, snapshot.axis_count, snapshot.pov_count):
+            snapshot.clear()
+            snapshot.button_count = button_count
+            snapshot.axis_count = axis_count
+            snapshot.pov_count = pov_count
+        snapshot.buttons = buttons
+        axes = snapshot.axes
+        for i in range(axis_count):
+            axes[i] = values[5 + i]
+        povs = snapshot.povs
+        for i in range(pov_count):
+            povs[i] = values[5 + axis_count + i]
+        return timestamp
+
+    def _frame_bytes(self, index: int) -> bytes:
+        end = self._offsets[index + 1] if index + 1 < len(self._offsets) else len(self._data)
+        return bytes(self._data[self._offsets[index]:end])
+
+    def find_mismatch(self, other: "ControllerRecording") -> int | None:
+        '''
+        Finds the first frame that isn't bit-for-bit identical to another recording
+
+        Parameters:
+            - other (ControllerRecording): The recording to compare against, such as a golden recording
+
+        Returns:
+            - int | None: The index of the first mismatching frame, or None if the recordings match
+        '''
+        for index in range(min(len(self), len(other))):
+            if self._frame_bytes(index) != other._frame_bytes(index):
+                return index
+        if len(self) != len(other):
+            return min(len(self), len(other))
+        return None
+
+    def save(self, path: str) -> None:
+        '''
+        Saves the recording to a file
+
+        Parameters:
+            - path (str): The file to write
+        '''
+        with open(path, "wb") as file:
+            _ = file.write(self._HEADER.pack(self._MAGIC, self._VERSION, len(self._offsets)))
+            _ = file.write(self._data)
+
+    @classmethod
+    def load(cls, path: str) -> "ControllerRecording":
+        '''
+        Loads a recording from a file
+
+        Parameters:
+            - path (str): The file to read
+
+        Returns:
+            - ControllerRecording: The loaded recording
+        '''
+        with open(path, "rb") as file:
+            magic, version, frames = cls._HEADER.unpack(file.read(cls._HEADER.size))
+            if magic != cls._MAGIC or version != cls._VERSION:
+                raise ValueError(f"{path} is not a version {cls._VERSION} controller recording")
+            data = bytearray(file.read())
+
+        recording = cls()
+        offset = 0
+        try:
+            for _ in range(frames):
+                recording._offsets.append(offset)
+                _, _, _, axis_count, pov_count = _FRAME_HEADER.unpack_from(data, offset)
+                offset += _frame_struct(axis_count, pov_count).size
+        except struct.error:
+            raise ValueError(f"{path} is truncated")
+        if offset > len(data):
+            raise ValueError(f"{path} is truncated")
+        recording._data = data
+        return recording
+
+class ReplayHID:
+    '''
+    Stand-in for GenericHID that plays back a ControllerRecording
+
+    Pass it to SC_Controller in place of a GenericHID, along with get_timestamp as the time source, then call advance
+    before each controller periodic to step through the recording one frame at a time.
+
+    Parameters:
+        - recording (ControllerRecording): The recording to play back
+        - port (int): The port reported to the controller
+    '''
+    def __init__(self, recording: ControllerRecording, port: int = 0) -> None:
+        self._recording: ControllerRecording = recording
+        self._port: int = port
+        self._index: int = -1
+        self._snapshot: ControllerSnapshot = ControllerSnapshot()
+        self._timestamp: seconds = nan
+
+    def advance(self) -> bool:
+        '''
+        Moves to the next recorded frame
+
+        Returns:
+            - bool: False once every frame has been played
+        '''
+        if self._index + 1 >= len(self._recording):
+            return False
+        self._index += 1
+        self._timestamp = self._recording.read(self._index, self._snapshot)
+        return True
+
+    def get_timestamp(self) -> seconds:
+        '''
+        Returns when the current frame was recorded, for use as the controller's time source
+        '''
+        return self._timestamp
+
+    def getPort(self) -> int:
+        return self._port
+
+    def getButtonCount(self) -> int:
+        return self._snapshot.button_count
+
+    def getAxisCount(self) -> int:
+        return self._snapshot.axis_count
+
+    def getPOVCount(self) -> int:
+        return self._snapshot.pov_count
+
+    def getRawButton(self, button: int) -> bool:
+        return self._snapshot.buttons >> (button - 1) & 1 == 1
+
+    def getRawAxis(self, axis: int) -> float:
+        return self._snapshot.axes[axis]
+
+    def getPOV(self, pov: int = 0) -> int:
+        return self._snapshot.povs[pov]
+
+    def setRumble(self, type: GenericHID.RumbleType, value: float) -> None:
+        pass
@@ -0,0 +1,147 @@
+from math import copysign, exp, hypot
+from typing import Callable
+
+from wpimath.units import seconds
+
+from ..datatypes.controls_datatypes import SC_AxisShaping
+from .compiled_input import apply_deadband
+from .snapshot import ControllerSnapshot
+
+'''
+Joystick shaping applied to a whole snapshot once per cycle.
+
+Each shaped axis or axis pair runs through a deadband, a response curve, smoothing and a slew-rate limit. The shaped
+values are written back into the snapshot, so every query for the rest of the cycle reads the cached result.
+'''
+
+def _get_curve(shaping: SC_AxisShaping) -> Callable[[float], float]:
+    '''
+    Builds the response curve for a magnitude from 0.0 to 1.0
+    '''
+    strength = shaping.curve_strength
+    match shaping.curve:
+        case "linear":
+            return lambda magnitude: magnitude
+        case "expo":
+            if strength <= 0:
+                raise ValueError(f"Invalid expo curve strength: {strength}")
+            scale = 1.0 / (exp(strength) - 1.0)
+            return lambda magnitude: (exp(strength * magnitude) - 1.0) * scale
+        case "cubic":
+            if not 0.0 <= strength <= 1.0:
+                raise ValueError(f"Invalid cubic curve strength: {strength}")
+            return lambda magnitude: (1.0 - strength) * magnitude + strength * magnitude ** 3
+    raise ValueError(f"Invalid curve: {shaping.curve}")
+
+class _ShapingStage:
+    '''
+    The shaping for one axis or one pair of axes
+    '''
+    __slots__ = ("axes", "shaping", "radial", "curve")
+
+    def __init__(self, axes: tuple[int, ...], shaping: SC_AxisShaping) -> None:
+        if not 0.0 <= shaping.deadband < 1.0:
+            raise ValueError(f"Invalid deadband: {shaping.deadband}")
+        if shaping.slew_rate is not None and shaping.slew_rate <= 0:
+            raise ValueError(f"Invalid slew rate: {shaping.slew_rate}")
+        if shaping.smoothing < 0:
+            raise ValueError(f"Invalid smoothing: {shaping.smoothing}")
+
+        self.axes: tuple[int, ...] = axes
+        self.shaping: SC_AxisShaping = shaping
+        self.radial: bool = len(axes) == 2 and shaping.radial_deadband
+        self.curve: Callable[[float], float] = _get_curve(shaping)
+
+class AxisShaper:
+    '''
+    Applies the configured shaping to every shaped axis of a snapshot in one pass
+    '''
+    def __init__(self) -> None:
+        self._stages: list[_ShapingStage] = []
+        self._last_time: seconds | None = None
+        self._dt: seconds | None = None
+
+    def set_shaping(self, axes: tuple[int, ...], shaping: SC_AxisShaping | None) -> None:
+        '''
+        Sets the shaping of an axis or axis pair, replacing any shaping that already covers those axes
+
+        Parameters:
+            - axes (tuple[int, ...]): The axis, or the x and y axes of a pair
+            - shaping (SC_AxisShaping | None): The shaping to apply, or None to leave the axes raw
+        '''
+        stage = None if shaping is None else _ShapingStage(axes, shaping)
+        self._stages = [existing for existing in self._stages if not set(existing.axes) & set(axes)]
+        if stage is not None:
+            self._stages.append(stage)
+
+    def has_shaping(self, axes: tuple[int, ...]) -> bool:
+        '''
+        Returns whether any of the axes are already shaped
+
+        Parameters:
+            - axes (tuple[int, ...]): The axes to check
+
+        Returns:
+            - bool: True if shaping covers at least one of the axes
+        '''
+        return any(set(stage.axes) & set(axes) for stage in self._stages)
+
+    def apply(self, current: ControllerSnapshot, previous: ControllerSnapshot, now: seconds) -> None:
+        '''
+        Shapes the axes of the current snapshot in place
+
+        Parameters:
+            - current (ControllerSnapshot): The raw state this cycle, which is overwritten with the shaped state
+            - previous (ControllerSnapshot): The shaped state last cycle, used for smoothing and slew limiting
+            - now (seconds): The current time
+        '''
+        last_time = self._last_time
+        self._last_time = now
+        # Smoothing and slew limits need a time step, so they are skipped on the first cycle
+        self._dt = now - last_time if last_time is not None and now > last_time else None
+        self._shape(current, previous, self._dt)
+
+    def reapply(self, current: ControllerSnapshot, previous: ControllerSnapshot) -> None:
+        '''
+        Shapes the axes of the current snapshot again with the time step of the last apply, such as after the shaping
+        changed in the middle of a cycle
+
+        Parameters:
+            - current (ControllerSnapshot): The raw state this cycle, which is overwritten with the shaped state
+            - previous (ControllerSnapshot): The shaped state last cycle, used for smoothing and slew limiting
+        '''
+        self._shape(current, previous, self._dt)
+
+    def _shape(self, current: ControllerSnapshot, previous: ControllerSnapshot, dt: seconds | None) -> None:
+        '''
+        Runs every stage over a snapshot
+        '''
+        axes = current.axes
+        previous_axes = previous.axes
+        for stage in self._stages:
+            shaping = stage.shaping
+            if stage.radial:
+                x, y = stage.axes
+                magnitude = hypot(axes[x], axes[y])
+                if magnitude <= shaping.deadband:
+                    axes[x] = 0.0
+                    axes[y] = 0.0
+                else:
+                    scale = stage.curve(apply_deadband(min(magnitude, 1.0), shaping.deadband)) / magnitude
+                    axes[x] *= scale
+                    axes[y] *= scale
+            else:
+                for i in stage.axes:
+                    value = apply_deadband(axes[i], shaping.deadband)
+                    axes[i] = copysign(stage.curve(abs(value)), value)
+
+            if dt is None:
+                continue
+            if shaping.smoothing > 0:
+                alpha = dt / (shaping.smoothing + dt)
+                for i in stage.axes:
+                    axes[i] = previous_axes[i] + alpha * (axes[i] - previous_axes[i])
+            if shaping.slew_rate is not None:
+                step = shaping.slew_rate * dt
+                for i in stage.axes:
+                    axes[i] = min(max(axes[i], previous_axes[i] - step), previous_axes[i] + step)
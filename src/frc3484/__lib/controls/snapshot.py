@@ -0,0 +1,66 @@
+from array import array
+
+'''
+Compact snapshots of a controller's raw inputs.
+
+Buttons are stored as a bitmask with bit 0 holding button 1, axes in a preallocated float array and POVs in a
+small int array, so taking a snapshot never allocates and edge detection is a bitwise XOR of two masks.
+'''
+
+MAX_BUTTONS: int = 32
+MAX_AXES: int = 12
+MAX_POVS: int = 12
+
+class ControllerSnapshot:
+    '''
+    The raw state of every button, axis and POV on a controller at one point in time
+
+    Parameters:
+        - buttons (int): Bitmask of pressed buttons, with bit 0 holding button 1
+        - axes (array): The value of every axis from -1.0 to 1.0
+        - povs (array): The angle of every POV in degrees or -1 for neutral
+        - button_count (int): The number of buttons on the controller
+        - axis_count (int): The number of axes on the controller
+        - pov_count (int): The number of POVs on the controller
+    '''
+    __slots__ = ("buttons", "axes", "povs", "button_count", "axis_count", "pov_count")
+
+    def __init__(self) -> None:
+        self.buttons: int = 0
+        self.axes: array[float] = array('d', bytes(8 * MAX_AXES))
+        self.povs: array[int] = array('h', [-1] * MAX_POVS)
+        self.button_count: int = 0
+        self.axis_count: int = 0
+        self.pov_count: int = 0
+
+    def clear(self) -> None:
+        '''
+        Releases every button, centers every axis and sets every POV to neutral
+        '''
+        self.buttons = 0
+        for i in range(MAX_AXES):
+            self.axes[i] = 0.0
+        for i in range(MAX_POVS):
+            self.povs[i] = -1
+
+    def copy_from(self, other: 'ControllerSnapshot') -> None:
+        '''
+        Copies another snapshot into this one without allocating
+
+        Parameters:
+            - other (ControllerSnapshot): The snapshot to copy
+        '''
+        self.buttons = other.buttons
+        self.axes[:] = other.axes
+        self.povs[:] = other.povs
+        self.button_count = other.button_count
+        self.axis_count = other.axis_count
+        self.pov_count = other.pov_count
+
+    def __eq__(self, value: object) -> bool:
+        if type(value) is ControllerSnapshot:
+            return self.buttons == value.buttons and self.axes == value.axes and self.povs == value.povs
+        return False
+
+    def __repr__(self) -> str:
+        return f"ControllerSnapshot(buttons={self.buttons:#x}, axes={list(self.axes[:self.axis_count])}, povs={list(self.povs[:self.pov_count])})"
@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from typing import Literal
+
+from wpimath.units import seconds
+
+'''
+Controls Datatypes
+'''
+
+@dataclass(frozen=True)
+class SC_AxisShaping:
+    deadband: float = 0.0
+    radial_deadband: bool = True # Only used for axis pairs, single axes always use a square deadband
+
+    curve: Literal["linear", "expo", "cubic"] = "linear"
+    curve_strength: float = 1.0 # Expo: exponent scale, cubic: blend from linear (0.0) to fully cubic (1.0)
+
+    slew_rate: float | None = None # Largest change per second, None for no limit
+    smoothing: seconds = 0.0 # Time constant of the low-pass filter, 0.0 for no smoothing
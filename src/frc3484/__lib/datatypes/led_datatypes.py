@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+
+'''
+LED Datatypes
+'''
+
+@dataclass(frozen=True)
+class SC_LEDSegment:
+    offset: int
+    length: int
+    reversed: bool = False
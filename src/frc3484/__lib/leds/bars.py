@@ -0,0 +1,95 @@
+import numpy as np
+from numpy.typing import NDArray
+
+class BarMap:
+    '''
+    Precomputed colors of every LED for patterns made of repeating bars of color
+
+    The color index of every LED, and the palette color it maps to, are built once per strip length
+    and rebuilt only when the length, bar size or palette changes. The map covers one extra period of bars,
+    so a run of LEDs with its bars shifted by any offset is a slice of the map instead of a new lookup
+
+    Parameters:
+        - palette (NDArray): One row per color, already gamma-corrected
+        - bar_size (int): The number of LEDs in each bar
+    '''
+    def __init__(self, palette: NDArray, bar_size: int) -> None:
+        if bar_size < 1:
+            raise ValueError(f"Invalid bar size: {bar_size}")
+        self._palette: NDArray = palette
+        self._bar_size: int = bar_size
+        self._length: int | None = None
+        self._indices: NDArray[np.intp] = np.empty(0, dtype=np.intp)
+        self._colors: NDArray = palette[:0]
+
+    @property
+    def palette(self) -> NDArray:
+        '''
+        Returns the palette the bars are colored from
+        '''
+        return self._palette
+
+    @property
+    def period(self) -> int:
+        '''
+        Returns the number of LEDs before the bar colors repeat
+        '''
+        return self._bar_size * len(self._palette)
+
+    def set_palette(self, palette: NDArray) -> None:
+        '''
+        Sets the palette and clears the cached map
+
+        Parameters:
+            - palette (NDArray): One row per color, already gamma-corrected
+        '''
+        self._palette = palette
+        self._length = None
+
+    def set_bar_size(self, bar_size: int) -> None:
+        '''
+        Sets the bar size and clears the cached map
+
+        Parameters:
+            - bar_size (int): The number of LEDs in each bar
+        '''
+        if bar_size < 1:
+            raise ValueError(f"Invalid bar size: {bar_size}")
+        self._bar_size = bar_size
+        self._length = None
+
+    def prepare(self, length: int) -> None:
+        '''
+        Builds the map for a strip length if it isn't already cached
+
+        Parameters:
+            - length (int): The number of LEDs on the strip
+        '''
+        if length == self._length:
+            return
+        self._indices = (np.arange(length + self.period) // self._bar_size) % len(self._palette)
+        self._colors = self._palette[self._indices]
+        self._length = length
+
+    def get_indices(self) -> NDArray[np.intp]:
+        '''
+        Returns the color index of every LED on the prepared strip
+        '''
+        return self._indices[:self._length]
+
+    def get_colors(self, start: int, stop: int, offset: int = 0) -> NDArray:
+        '''
+        Returns the colors of a run of LEDs, as if every bar was moved back by offset LEDs
+
+        Parameters:
+            - start (int): The first LED, from 0 to the prepared length
+            - stop (int): One past the last LED, from start to the prepared length
+            - offset (int): How far along the bars to read from
+
+        Returns:
+            - NDArray: A read-only view with one row per LED
+        '''
+        begin = start + offset % self.period
+        colors = self._colors[begin:begin + stop - start]
+        colors.flags.writeable = False
+        return colors
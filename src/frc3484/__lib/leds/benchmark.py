@@ -0,0 +1,222 @@
+'''
+Measures the per-frame cost of LED patterns without robot hardware.
+
+Run with: python -m frc3484.__lib.leds.benchmark [--lengths 60 300 1000] [--frames 500] [--record DIR]
+
+Golden recordings of a few seeded patterns are kept next to this module. Check the patterns against them with
+--check-golden, and rewrite them with --update-golden after an intended change to a pattern's output.
+'''
+
+import argparse
+import os
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+import numpy as np
+
+from wpilib import Color
+from wpimath.units import seconds
+
+from .clock import LEDClock
+from .colorstack import ColorStack
+from .colorwave import ColorWave
+from .fallingsand import FallingSand
+from .fire import Fire
+from .frame import LEDFrame
+from .pattern import Pattern
+from .recording import HeadlessLED, LEDRecording, record_pattern
+from .static import Static
+
+DEFAULT_LENGTHS: tuple[int, ...] = (60, 300, 1000)
+
+GOLDEN_DIRECTORY: str = os.path.join(os.path.dirname(__file__), "golden")
+GOLDEN_LENGTH: int = 60
+GOLDEN_FRAMES: int = 50
+GOLDEN_TOLERANCE: int = 1 # Per-channel difference allowed for floating point differences between platforms
+
+@dataclass(frozen=True)
+class LEDBenchmarkResult:
+    pattern: str
+    length: int
+    frames: int
+    p50: seconds
+    p90: seconds
+    p99: seconds
+    max: seconds
+    mean_allocated_bytes: float
+    max_allocated_bytes: int
+
+    def __str__(self) -> str:
+        return f"{self.pattern:<12} {self.length:>5} LEDs  " \
+            f"p50 {self.p50 * 1e6:8.1f} us  p90 {self.p90 * 1e6:8.1f} us  p99 {self.p99 * 1e6:8.1f} us  max {self.max * 1e6:8.1f} us  " \
+            f"alloc {self.mean_allocated_bytes / 1024:7.1f} KiB/frame (max {self.max_allocated_bytes / 1024:.1f} KiB)"
+
+def get_default_patterns() -> dict[str, Callable[[int], Pattern]]:
+    '''
+    Returns a factory for every built-in pattern, taking the strip length
+
+    Returns:
+        - dict[str, Callable[[int], Pattern]]: The factories by pattern name
+    '''
+    colors = [Color.kRed, Color.kGreen, Color.kBlue]
+    led_spacing = 1 / 60
+    return {
+        "ColorWave": lambda length: ColorWave(colors, led_spacing, 0.5, 2.2, 0.5, 4),
+        "ColorStack": lambda length: ColorStack(colors, 4, 1.0, 5, 5, 2.2, led_spacing),
+        "FallingSand": lambda length: FallingSand(colors, 4, led_spacing, 1.0, 2.0, 5, 2.2),
+        "Fire": lambda length: Fire(5, 120, 1, length, seed=0),
+        "Static": lambda length: Static(colors, length, led_spacing, 5, 2.2),
+    }
+
+def benchmark_pattern(name: str, factory: Callable[[int], Pattern], length: int, frames: int = 500, period: seconds = 0.02) -> LEDBenchmarkResult:
+    '''
+    Measures how long a pattern takes to render a frame and convert it for AddressableLED.setData
+
+    Every frame is rendered, ignoring the pattern's FRAME_RATE, so the result is the cost of one new frame.
+    Allocations are measured in a second pass, because tracing slows the timed pass down
+
+    Parameters:
+        - name (str): The name to report
+        - factory (Callable[[int], Pattern]): Creates the pattern for a strip length
+        - length (int): The number of LEDs
+        - frames (int): The number of frames to measure
+        - period (seconds): The simulated time between frames
+
+    Returns:
+        - LEDBenchmarkResult: Per-frame time percentiles and allocations
+    '''
+    led = HeadlessLED()
+    durations = np.empty(frames)
+    allocations = np.empty(frames, dtype=np.int64)
+
+    for timed in (True, False):
+        sim_time: list[seconds] = [0.0]
+        pattern = factory(length)
+        pattern.set_clock(LEDClock(lambda: sim_time[0]))
+        frame = LEDFrame(length)
+
+        if not timed:
+            tracemalloc.start()
+        try:
+            for i in range(frames):
+                sim_time[0] = i * period
+                if timed:
+                    start = time.perf_counter()
+                    pattern.render(frame)
+                    led.setData(frame.to_led_data())
+                    durations[i] = time.perf_counter() - start
+                else:
+                    tracemalloc.reset_peak()
+                    baseline = tracemalloc.get_traced_memory()[0]
+                    pattern.render(frame)
+                    led.setData(frame.to_led_data())
+                    allocations[i] = tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            if not timed:
+                tracemalloc.stop()
+
+    p50, p90, p99 = np.percentile(durations, (50, 90, 99))
+    return LEDBenchmarkResult(
+        name,
+        length,
+        frames,
+        float(p50),
+        float(p90),
+        float(p99),
+        float(durations.max()),
+        float(allocations.mean()),
+        int(allocations.max())
+    )
+
+def run_benchmarks(lengths: Iterable[int] = DEFAULT_LENGTHS, frames: int = 500, record_directory: str | None = None) -> list[LEDBenchmarkResult]:
+    '''
+    Benchmarks every built-in pattern at every strip length
+
+    Parameters:
+        - lengths (Iterable[int]): The strip lengths to test
+        - frames (int): The number of frames to measure for each pattern and length
+        - record_directory (str | None): If set, a recording of each pattern is saved here as <pattern>_<length>.ledr
+
+    Returns:
+        - list[LEDBenchmarkResult]: One result per pattern and length
+    '''
+    results: list[LEDBenchmarkResult] = []
+    for length in lengths:
+        for name, factory in get_default_patterns().items():
+            result = benchmark_pattern(name, factory, length, frames)
+            results.append(result)
+
+            if record_directory is not None:
+                os.makedirs(record_directory, exist_ok=True)
+                record_pattern(factory(length), length, frames).save(os.path.join(record_directory, f"{name}_{length}.ledr"))
+    return results
+
+def get_golden_patterns() -> dict[str, Callable[[int], Pattern]]:
+    '''
+    Returns a factory for every pattern with a golden recording, taking the strip length
+
+    The colors are given as exact values instead of the Color constants, so the recordings don't depend on them
+
+    Returns:
+        - dict[str, Callable[[int], Pattern]]: The factories by pattern name
+    '''
+    colors = [Color(1.0, 0.0, 0.0), Color(0.0, 1.0, 0.0), Color(0.0, 0.0, 1.0)]
+    led_spacing = 1 / 60
+    return {
+        "ColorWave": lambda length: ColorWave(colors, led_spacing, 0.5, 2.2, 0.5, 4),
+        "Fire": lambda length: Fire(5, 120, 1, length, seed=0),
+    }
+
+def _get_golden_path(directory: str, name: str) -> str:
+    return os.path.join(directory, f"{name}_{GOLDEN_LENGTH}.ledr")
+
+def record_golden_recordings(directory: str = GOLDEN_DIRECTORY) -> None:
+    '''
+    Records every golden pattern and saves it as the new golden recording
+
+    Parameters:
+        - directory (str): Where to save the recordings
+    '''
+    os.makedirs(directory, exist_ok=True)
+    for name, factory in get_golden_patterns().items():
+        record_pattern(factory(GOLDEN_LENGTH), GOLDEN_LENGTH, GOLDEN_FRAMES).save(_get_golden_path(directory, name))
+
+def check_golden_recordings(directory: str = GOLDEN_DIRECTORY) -> dict[str, int | None]:
+    '''
+    Records every golden pattern again and compares it with its golden recording
+
+    Parameters:
+        - directory (str): Where the golden recordings are saved
+
+    Returns:
+        - dict[str, int | None]: The first frame that differs for each pattern, or None if it matches
+    '''
+    mismatches: dict[str, int | None] = {}
+    for name, factory in get_golden_patterns().items():
+        golden = LEDRecording.load(_get_golden_path(directory, name))
+        recording = record_pattern(factory(GOLDEN_LENGTH), GOLDEN_LENGTH, GOLDEN_FRAMES)
+        mismatches[name] = recording.find_mismatch(golden, GOLDEN_TOLERANCE)
+    return mismatches
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the frc3484 LED patterns")
+    _ = parser.add_argument("--lengths", type=int, nargs="+", default=list(DEFAULT_LENGTHS), help="strip lengths to test")
+    _ = parser.add_argument("--frames", type=int, default=500, help="frames to measure per pattern")
+    _ = parser.add_argument("--record", metavar="DIR", default=None, help="save a recording of each pattern to DIR")
+    _ = parser.add_argument("--check-golden", action="store_true", help="compare the patterns with their golden recordings")
+    _ = parser.add_argument("--update-golden", action="store_true", help="rewrite the golden recordings")
+    args = parser.parse_args()
+
+    if args.update_golden:
+        record_golden_recordings()
+        print(f"Golden recordings saved to {GOLDEN_DIRECTORY}")
+    elif args.check_golden:
+        mismatches = check_golden_recordings()
+        for name, mismatch in mismatches.items():
+            print(f"{name:<12} " + ("matches" if mismatch is None else f"differs from frame {mismatch}"))
+        raise SystemExit(any(mismatch is not None for mismatch in mismatches.values()))
+    else:
+        for result in run_benchmarks(args.lengths, args.frames, args.record):
+            print(result)
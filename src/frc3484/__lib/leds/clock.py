@@ -0,0 +1,37 @@
+from typing import Callable
+
+from wpilib import Timer
+from wpimath.units import seconds
+
+class LEDClock:
+    '''
+    The time source LED patterns animate from
+
+    Patterns move by the time elapsed since their last frame rather than a fixed step per call,
+    so an overrunning loop skips ahead instead of slowing the animation down
+
+    Parameters:
+        - time_source (Callable[[], seconds]): Returns the current time. Replace it to drive patterns from simulated time
+    '''
+    def __init__(self, time_source: Callable[[], seconds] = Timer.getFPGATimestamp) -> None:
+        self._time_source: Callable[[], seconds] = time_source
+
+    def now(self) -> seconds:
+        '''
+        Returns the current time
+
+        Returns:
+            - seconds: The current time
+        '''
+        return self._time_source()
+
+    def set_time_source(self, time_source: Callable[[], seconds]) -> None:
+        '''
+        Sets the time source of the clock
+
+        Parameters:
+            - time_source (Callable[[], seconds]): Returns the current time
+        '''
+        self._time_source = time_source
+
+DEFAULT_CLOCK: LEDClock = LEDClock()
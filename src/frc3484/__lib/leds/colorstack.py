@@ -1,69 +1,103 @@
-from wpilib import AddressableLED, Color
-from wpimath.units import meters_per_second
-from typing import Iterable
+from wpilib import Color
+from wpimath.units import meters, meters_per_second
+from typing import Iterable, override
 
 from enum import Enum
 
+from .bars import BarMap
+from .frame import LEDFrame
+from .pattern import Pattern
+from .gamma import apply_gamma
+from .utils import colors_to_array
+
 class PatternState(Enum):
     fill = 0,
     empty = 1
 
-class ColorStack :
-    def __init__(self, colors: Iterable[Color], bar_size: int, velocity: meters_per_second, fill_size: int, empty_size: int, gamma: float) -> None:
-        self._colors: list[Color] = []
-        for color in colors:
-            self._colors.append(self._correct_gamma(color))
-        self._bar_size = bar_size
-        self._velocity = velocity
+class ColorStack(Pattern):
+    '''
+    Bars of color that fall one LED at a time and stack up at the end of the strip, then empty out and start over
+
+    Parameters:
+        - colors (Iterable[Color]): The colors to cycle through
+        - bar_size (int): The number of LEDs in each bar
+        - velocity (meters_per_second): How fast the falling LED moves. This used to be LEDs per call, so older values
+          have to be multiplied by the LED spacing and the loop rate, e.g. 1 LED per call is 50 / 60 m/s at 50 Hz
+          on a 60 LED/m strip
+        - fill_size (int): The number of LEDs that fall together and are added to the stack at a time
+        - empty_size (int): The number of LEDs that move together while the stack empties
+        - gamma (float): The gamma exponent used to correct the colors
+        - led_spacing (meters): The distance between neighbouring LEDs
+    '''
+    def __init__(self, colors: Iterable[Color], bar_size: int, velocity: meters_per_second, fill_size: int, empty_size: int, gamma: float, led_spacing: meters = 1 / 60) -> None:
+        super().__init__()
+        self._gamma = gamma
+        self._bars: BarMap = BarMap(apply_gamma(colors_to_array(colors), gamma), bar_size)
+        self._led_spacing: meters = led_spacing
+        self._velocity = velocity / led_spacing
         self._fill_size = fill_size
         self._empty_size = empty_size
-        self._gamma = gamma
         self._state: PatternState = PatternState.fill
         self._leds_placed: int = 0
         self._falling_led_position: float = 0.0
         self.reset()
+    @override
     def reset(self):
         self._leds_placed = 0
         self._falling_led_position = 0
         self._state = PatternState.fill
-    def _apply_to(self, data: list[AddressableLED.LEDData]):
+    @override
+    def render(self, frame: LEDFrame) -> None:
+        pixels = frame.pixels
+        length = len(frame)
+        position = int(self._falling_led_position)
+        step = self._get_time_step()
+        self._bars.prepare(length)
+        pixels.fill(0)
         match self._state:
             case PatternState.fill:
-                for i in range(len(data)):
-                    if(i >= (len(data)) - self._leds_placed):
-                        data[i].setLED(self._correct_gamma(self._colors[self._get_color_index(i)]))
-                    elif(i >= int(self._falling_led_position) and i < int(self._falling_led_position) + self._fill_size):
-                        data[i].setLED(self._correct_gamma(self._colors[self._get_color_index(len(data)) - self._leds_placed - self._fill_size + i - int(self._falling_led_position)]))
-                    else:
-                        data[i].setLED(Color.kBlack)
-                self._falling_led_position += self._velocity
-                if(int(self._falling_led_position) >= (len(data)) - self._leds_placed - self._fill_size):
+                stack_start = max(length - self._leds_placed, 0)
+                pixels[stack_start:] = self._bars.get_colors(stack_start, length)
+                falling_start = max(position, 0)
+                falling_end = min(position + self._fill_size, stack_start)
+                if falling_start < falling_end:
+                    pixels[falling_start:falling_end] = self._bars.get_colors(falling_start, falling_end, stack_start - self._fill_size - position)
+                self._falling_led_position += self._velocity * step
+                if(int(self._falling_led_position) >= (length) - self._leds_placed - self._fill_size):
                     self._falling_led_position = 0
                     self._leds_placed += self._fill_size
-                    if(self._leds_placed >= (len(data))):
-                        self._falling_led_position = (len(data))
-                        self._leds_placed = (len(data))
+                    if(self._leds_placed >= (length)):
+                        self._falling_led_position = (length)
+                        self._leds_placed = (length)
                         self._state = PatternState.empty
-                return data
             case PatternState.empty:
-                for i in range(len(data)):
-                    if(i < self._leds_placed):
-                        data[i].setLED(self._correct_gamma(self._colors[self._get_color_index(i)]))
-                    elif(i >= int(self._falling_led_position) and i < int(self._falling_led_position) + self._empty_size):
-                        data[i].setLED(self._correct_gamma(self._colors[self._get_color_index(self._leds_placed + i - int(self._falling_led_position))]))
-                    else:
-                        data[i].setLED(Color.kBlack)
-                self._falling_led_position += self._velocity
-                if(int(self._falling_led_position) >= (len(data))):
+                stack_end = min(max(self._leds_placed, 0), length)
+                pixels[:stack_end] = self._bars.get_colors(0, stack_end)
+                falling_start = max(position, stack_end)
+                falling_end = min(position + self._empty_size, length)
+                if falling_start < falling_end:
+                    pixels[falling_start:falling_end] = self._bars.get_colors(falling_start, falling_end, self._leds_placed - position)
+                self._falling_led_position += self._velocity * step
+                if(int(self._falling_led_position) >= (length)):
                     self._leds_placed -= self._fill_size
                     self._falling_led_position = self._leds_placed
-                    if(self._leds_placed > (len(data))):
+                    if(self._leds_placed > (length)):
                         self.reset()
-                return data
 
-    def _get_color_index(self, offset: int) -> int:
-        return (offset // self._bar_size) % len(self._colors)
-    def  _positive_fmod(self, numerator: float, denominator: float)-> float:
-        return ((numerator % denominator) + denominator % denominator)
-    def _correct_gamma(self, color: Color) -> Color:
-        return Color(color.red** self._gamma, color.green**self._gamma, color.blue**self._gamma)
\ No newline at end of file
+    def set_colors(self, colors: Iterable[Color]) -> None:
+        '''
+        Sets the colors of the bars
+
+        Parameters:
+            - colors (Iterable[Color]): The colors to cycle through
+        '''
+        self._bars.set_palette(apply_gamma(colors_to_array(colors), self._gamma))
+
+    def set_bar_size(self, bar_size: int) -> None:
+        '''
+        Sets the number of LEDs in each bar
+
+        Parameters:
+            - bar_size (int): The number of LEDs in each bar
+        '''
+        self._bars.set_bar_size(bar_size)
@@ -1,29 +1,125 @@
-from wpilib import AddressableLED, Color, Timer
+from wpilib import Color
 from wpimath.units import meters, meters_per_second
 import math
-from typing import Iterable
+from typing import Iterable, override
 
-class ColorWave :
+import numpy as np
+from numpy.typing import NDArray
+
+from .bars import BarMap
+from .frame import LEDFrame
+from .pattern import Pattern
+from .gamma import apply_gamma
+from .utils import colors_to_array
+
+class ColorWave(Pattern):
+    '''
+    Bars of color with one or more brightness waves travelling along them
+
+    Each wave has brightness (1 - cos(2 * pi * (offset - position) / wavelength)) / 2, and superposed waves
+    are averaged by weight so the brightness stays between 0 and 1
+
+    The brightness is evaluated for every LED at once with a matrix product. Whenever that product is rebuilt, it is
+    checked against a per-LED evaluation of the formula above, and must match it within REFERENCE_TOLERANCE
+    '''
+    REFERENCE_TOLERANCE: float = 1e-9
     def __init__(self, colors: Iterable[Color], led_spacing: meters, wavelength: meters, gamma: float, velocity: meters_per_second, bar_size: int) -> None:
-        self._colors: list[Color] = [color for color in colors]
-        self._bar_size: int = bar_size
-        self._wavelength = wavelength
+        super().__init__()
         self._gamma = gamma
-        self._velocity = velocity / led_spacing
-        self._timer = Timer()
-    def _apply_to(self, data: list[AddressableLED.LEDData]):
-        for i in range(len(data)):
-            data[i].setLED(self._apply_brightness(self._colors[self._get_color_index(i)], self._get_brightness(i)))
-        return data
-    def _get_brightness(self, offset: int):
-        return (1 - math.cos(2 * math.pi / self._wavelength) * (offset - self._wave_position())) / 2
-    def _apply_brightness(self, color: Color, brightness: float) -> Color:
-        return Color(self._gamma_correction(color.red * brightness), self._gamma_correction(color.green * brightness), self._gamma_correction(color.blue * brightness) )
-    def _get_color_index(self, offset: int) -> int:
-        return (offset // self._bar_size) % len(self._colors) 
-    def  _positive_fmod(self, numerator: float, denominator: float)-> float:
-        return ((numerator % denominator) + denominator % denominator)
-    def _gamma_correction(self, brightness: float) -> float:
-        return brightness ** self._gamma
-    def _wave_position(self):
-        return self._timer.get() * self._velocity
\ No newline at end of file
+        # (color * brightness) ** gamma == color ** gamma * brightness ** gamma, so the palette can be corrected up front
+        self._bars: BarMap = BarMap(apply_gamma(colors_to_array(colors), gamma), bar_size)
+        self._led_spacing: meters = led_spacing
+
+        # Wavelengths, velocities and positions are kept in LEDs
+        self._wavelengths: NDArray[np.float64] = np.empty(0)
+        self._velocities: NDArray[np.float64] = np.empty(0)
+        self._weights: NDArray[np.float64] = np.empty(0)
+        self._wave_positions: NDArray[np.float64] = np.empty(0)
+
+        # cos and sin of every wave's phase at every LED, stacked as (2 * waves, length)
+        self._basis: NDArray[np.float64] = np.empty((0, 0))
+        self._basis_length: int | None = None
+
+        self.add_wave(wavelength, velocity)
+    def add_wave(self, wavelength: meters, velocity: meters_per_second, weight: float = 1.0) -> None:
+        '''
+        Adds another brightness wave on top of the existing ones
+
+        Parameters:
+            - wavelength (meters): The distance between the dark points of the wave
+            - velocity (meters_per_second): How fast the wave moves along the strip
+            - weight (float): How much the wave counts towards the brightness relative to the other waves
+        '''
+        if wavelength <= 0 or weight <= 0:
+            raise ValueError(f"Invalid wave: wavelength {wavelength}, weight {weight}")
+        self._wavelengths = np.append(self._wavelengths, wavelength / self._led_spacing)
+        self._velocities = np.append(self._velocities, velocity / self._led_spacing)
+        self._weights = np.append(self._weights, weight)
+        self._wave_positions = np.append(self._wave_positions, 0.0)
+        # Rebuilding the basis also checks the new set of waves against the reference
+        self._basis_length = None
+    @override
+    def reset(self):
+        self._wave_positions.fill(0.0)
+    @override
+    def render(self, frame: LEDFrame) -> None:
+        length = len(frame)
+        self._wave_positions += self._velocities * self._get_time_step()
+        # Keep the positions within one wavelength so the phase stays precise
+        self._wave_positions %= self._wavelengths
+        self._bars.prepare(length)
+        frame.pixels[:] = self._apply_brightness(self._bars.get_colors(0, length), self._get_brightness(length))
+    def _get_brightness(self, length: int) -> NDArray[np.float64]:
+        rebuilt = self._basis_length != length
+        if rebuilt:
+            phases = (2 * math.pi / self._wavelengths)[:, np.newaxis] * np.arange(length)
+            self._basis = np.vstack((np.cos(phases), np.sin(phases)))
+            self._basis_length = length
+
+        # cos(k * (i - p)) == cos(k * i) * cos(k * p) + sin(k * i) * sin(k * p), so every wave is
+        # evaluated at every LED with one matrix product instead of a cosine per LED
+        wave_phases = 2 * math.pi / self._wavelengths * self._wave_position()
+        weights = self._weights / self._weights.sum()
+        coefficients = np.concatenate((weights * np.cos(wave_phases), weights * np.sin(wave_phases)))
+        brightness = 0.5 - 0.5 * (coefficients @ self._basis)
+        if rebuilt:
+            error = np.abs(brightness - self._get_reference_brightness(length)).max(initial=0.0)
+            assert error <= self.REFERENCE_TOLERANCE, f"ColorWave brightness is {error} away from the reference"
+        return brightness
+    def _get_reference_brightness(self, length: int) -> list[float]:
+        '''
+        Evaluates the brightness of every LED one at a time, as the reference the matrix product is checked against
+
+        Parameters:
+            - length (int): The number of LEDs
+
+        Returns:
+            - list[float]: The weighted mean of (1 - cos(2 * pi * (i - position) / wavelength)) / 2 over every wave
+        '''
+        total_weight = float(self._weights.sum())
+        waves = list(zip(self._wavelengths.tolist(), self._wave_positions.tolist(), self._weights.tolist()))
+        return [
+            sum(weight * (1 - math.cos(2 * math.pi * (i - position) / wavelength)) / 2 for wavelength, position, weight in waves) / total_weight
+            for i in range(length)
+        ]
+    def _apply_brightness(self, colors: NDArray[np.uint8], brightness: NDArray[np.float64]) -> NDArray[np.uint8]:
+        scale = apply_gamma(brightness, self._gamma).astype(np.uint16)
+        return (colors * scale[:, np.newaxis] // 255).astype(np.uint8)
+    def set_colors(self, colors: Iterable[Color]) -> None:
+        '''
+        Sets the colors of the bars
+
+        Parameters:
+            - colors (Iterable[Color]): The colors to cycle through
+        '''
+        self._bars.set_palette(apply_gamma(colors_to_array(colors), self._gamma))
+    def set_bar_size(self, bar_size: int) -> None:
+        '''
+        Sets the number of LEDs in each bar
+
+        Parameters:
+            - bar_size (int): The number of LEDs in each bar
+        '''
+        self._bars.set_bar_size(bar_size)
+    def _wave_position(self) -> NDArray[np.float64]:
+        return self._wave_positions
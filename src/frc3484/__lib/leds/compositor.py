@@ -0,0 +1,170 @@
+from dataclasses import dataclass
+from enum import Enum, auto
+from typing import override
+
+from wpimath.units import seconds
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .clock import LEDClock
+from .frame import LEDFrame
+from .pattern import Pattern
+from ..datatypes.led_datatypes import SC_LEDSegment
+
+class BlendMode(Enum):
+    OVER = auto() # Lit pixels replace the layers below, black pixels are transparent
+    ADD = auto() # Channels are added and saturate at 255
+    MAX = auto() # Brightest channel wins
+    MULTIPLY = auto() # Layers below are scaled by the layer, black pixels turn the layers below off
+
+@dataclass
+class _Layer:
+    segment: SC_LEDSegment
+    pattern: Pattern | None
+    blend: BlendMode
+    frame: LEDFrame
+    dirty: bool = True
+
+class LEDCompositor(Pattern):
+    '''
+    Runs several patterns on named segments of one strip
+
+    Segments are drawn in the order they are added, and each one is blended into the output with its blend mode,
+    so later segments are layered on top of earlier ones where they overlap.
+    A segment is only re-rendered when its pattern was changed, or when its pattern is animated and a frame is due
+    at the pattern's FRAME_RATE. The output is only re-blended when a segment was re-rendered
+    '''
+    def __init__(self) -> None:
+        super().__init__()
+        self._layers: dict[str, _Layer] = {}
+        self._dirty: bool = True
+
+    def add_segment(self, name: str, segment: SC_LEDSegment, pattern: Pattern | None = None, blend: BlendMode = BlendMode.OVER) -> None:
+        '''
+        Adds a segment on top of the existing segments
+
+        Parameters:
+            - name (str): The name used to refer to the segment
+            - segment (SC_LEDSegment): Where the segment is on the strip
+            - pattern (Pattern | None): The pattern to show on the segment
+            - blend (BlendMode): How the segment is combined with the segments below it
+        '''
+        if name in self._layers:
+            raise ValueError(f"Segment {name} already exists")
+        if segment.offset < 0 or segment.length < 0:
+            raise ValueError(f"Invalid segment {name}: {segment}")
+        if pattern is not None:
+            pattern.set_clock(self._clock)
+        self._layers[name] = _Layer(segment, pattern, blend, LEDFrame(segment.length))
+        self._dirty = True
+
+    def remove_segment(self, name: str) -> None:
+        '''
+        Removes a segment
+
+        Parameters:
+            - name (str): The name of the segment
+        '''
+        del self._layers[name]
+        self._dirty = True
+
+    def set_pattern(self, name: str, pattern: Pattern | None) -> None:
+        '''
+        Sets the pattern shown on a segment. Switching to a new pattern resets it
+
+        Parameters:
+            - name (str): The name of the segment
+            - pattern (Pattern | None): The pattern to show, or None to leave the segment transparent
+        '''
+        layer = self._layers[name]
+        if pattern is not layer.pattern:
+            if pattern is not None:
+                pattern.reset()
+                pattern.set_clock(self._clock)
+            layer.pattern = pattern
+            layer.dirty = True
+            self._dirty = True
+
+    def set_blend_mode(self, name: str, blend: BlendMode) -> None:
+        '''
+        Sets how a segment is combined with the segments below it
+
+        Parameters:
+            - name (str): The name of the segment
+            - blend (BlendMode): The blend mode
+        '''
+        self._layers[name].blend = blend
+        self._dirty = True
+
+    @override
+    def reset(self) -> None:
+        for layer in self._layers.values():
+            if layer.pattern is not None:
+                layer.pattern.reset()
+            layer.dirty = True
+        self._dirty = True
+
+    @override
+    def set_clock(self, clock: LEDClock) -> None:
+        super().set_clock(clock)
+        for layer in self._layers.values():
+            if layer.pattern is not None:
+                layer.pattern.set_clock(clock)
+
+    @override
+    def invalidate(self) -> None:
+        super().invalidate()
+        self._dirty = True
+
+    @override
+    def render(self, frame: LEDFrame) -> None:
+        for layer in self._layers.values():
+            if layer.pattern is not None:
+                layer.pattern.render(layer.frame)
+                layer.dirty = False
+        self._composite(frame)
+
+    @override
+    def update(self, frame: LEDFrame, now: seconds) -> bool:
+        changed = self._dirty
+        for layer in self._layers.values():
+            if layer.pattern is None:
+                continue
+
+            if layer.dirty:
+                layer.pattern.invalidate()
+            if (layer.dirty or layer.pattern.ANIMATED) and layer.pattern.update(layer.frame, now):
+                layer.dirty = False
+                changed = True
+
+        if changed:
+            self._composite(frame)
+        return changed
+
+    def _composite(self, frame: LEDFrame) -> None:
+        pixels = frame.pixels
+        pixels.fill(0)
+        for layer in self._layers.values():
+            if layer.pattern is None:
+                continue
+
+            segment = layer.segment
+            target = pixels[segment.offset:segment.offset + segment.length]
+            # Clip before reversing, so a segment that runs past the end of the strip still starts its pattern at the
+            # visible end
+            source = layer.frame.pixels[:len(target)]
+            self._blend(target, source[::-1] if segment.reversed else source, layer.blend)
+        self._dirty = False
+
+    def _blend(self, target: NDArray[np.uint8], source: NDArray[np.uint8], blend: BlendMode) -> None:
+        match blend:
+            case BlendMode.OVER:
+                lit = source.any(axis=1)
+                target[lit] = source[lit]
+            case BlendMode.ADD:
+                target[:] = np.minimum(target.astype(np.uint16) + source, 255)
+            case BlendMode.MAX:
+                np.maximum(target, source, out=target)
+            case BlendMode.MULTIPLY:
+                target[:] = target.astype(np.uint16) * source // 255
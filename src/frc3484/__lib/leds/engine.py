@@ -0,0 +1,106 @@
+from typing import Protocol, override
+
+from commands2 import Subsystem
+from wpilib import AddressableLED
+
+from .clock import DEFAULT_CLOCK, LEDClock
+from .frame import LEDFrame
+from .pattern import Pattern
+from .worker import LEDRenderWorker
+
+class LEDStrip(Protocol):
+    '''
+    The parts of AddressableLED that LEDEngine uses, so a stand-in such as HeadlessLED can be driven instead
+    '''
+    def setLength(self, length: int, /) -> None: ...
+    def setData(self, data: list[AddressableLED.LEDData], /) -> None: ...
+    def start(self) -> None: ...
+
+class LEDEngine(Subsystem):
+    '''
+    Drives an AddressableLED, or any other LEDStrip, from a single frame buffer
+
+    Each cycle the active pattern renders into the frame, and the frame is pushed to the strip with one setData call.
+    Patterns only render when a frame is due at their FRAME_RATE, and the push is skipped when the frame hasn't changed.
+    Rendering can be moved off the robot loop with start_worker()
+
+    Parameters:
+        - led (LEDStrip): The LED strip to drive
+        - length (int): The number of LEDs on the strip
+        - clock (LEDClock): The clock used to schedule frames
+    '''
+    def __init__(self, led: LEDStrip, length: int, clock: LEDClock = DEFAULT_CLOCK) -> None:
+        super().__init__()
+        self._led: LEDStrip = led
+        self._clock: LEDClock = clock
+        self._frame: LEDFrame = LEDFrame(length)
+        self._pattern: Pattern | None = None
+        self._worker: LEDRenderWorker | None = None
+
+        self._led.setLength(length)
+        self._led.setData(self._frame.to_led_data())
+        _ = self._frame.commit()
+        self._led.start()
+
+    @property
+    def frame(self) -> LEDFrame:
+        '''
+        Returns the frame that is pushed to the strip
+        '''
+        return self._frame
+
+    def set_pattern(self, pattern: Pattern | None) -> None:
+        '''
+        Sets the pattern shown on the strip and drives it from the engine's clock. Switching to a new pattern resets it
+
+        Parameters:
+            - pattern (Pattern | None): The pattern to show, or None to turn the strip off
+        '''
+        if pattern is not None:
+            pattern.set_clock(self._clock)
+        if self._worker is not None:
+            self._worker.set_pattern(pattern)
+        elif pattern is not self._pattern and pattern is not None:
+            pattern.reset()
+            pattern.invalidate()
+        self._pattern = pattern
+
+    def start_worker(self) -> None:
+        '''
+        Moves rendering to a background thread
+
+        Each cycle then only picks up the newest finished frame and pushes it, so frames are shown one cycle
+        after they are rendered. A pattern that can't keep up drops frames instead of slowing the robot loop
+        '''
+        if self._worker is not None:
+            return
+        self._worker = LEDRenderWorker(len(self._frame), self._clock)
+        self._worker.set_pattern(self._pattern)
+        self._worker.start()
+
+    def stop_worker(self) -> None:
+        '''
+        Moves rendering back to the robot loop
+        '''
+        if self._worker is None:
+            return
+        self._worker.stop()
+        self._worker = None
+
+    @override
+    def periodic(self) -> None:
+        '''
+        Renders the active pattern and pushes the frame to the strip
+        '''
+        if self._worker is not None:
+            rendered = self._worker.take(self._frame)
+            self._worker.request()
+            if not rendered:
+                return
+        elif self._pattern is None:
+            self._frame.clear()
+        elif not self._pattern.update(self._frame, self._clock.now()):
+            return
+
+        if self._frame.commit():
+            self._led.setData(self._frame.to_led_data())
@@ -1,69 +1,90 @@
-from wpilib import AddressableLED, Color
+from wpilib import Color
 from wpimath.units import meters, meters_per_second, meters_per_second_squared
-from typing import Iterable
+from typing import Iterable, override
 
 from enum import Enum
 
+from .bars import BarMap
+from .frame import LEDFrame
+from .pattern import Pattern
+from .gamma import apply_gamma
+from .utils import colors_to_array
+
 class PatternState(Enum):
     fill = 0,
     empty = 1
 
-class FallingSand:
+class FallingSand(Pattern):
     def __init__(self, colors: Iterable[Color], bar_size: int, led_spacing: meters, intake_velocity: meters_per_second, exit_acceleration: meters_per_second_squared, fill_size: int, gamma: float) -> None:
-        self._colors: list[Color] = []
-        for color in colors:
-            self._colors.append(self._correct_gamma(color))
-        self._bar_size: int = bar_size
+        super().__init__()
+        self._gamma: float = gamma
+        self._bars: BarMap = BarMap(apply_gamma(colors_to_array(colors), gamma), bar_size)
         self._led_spacing: meters = led_spacing
-        self._intake_velocity: meters_per_second = intake_velocity
-        self._exit_acceleration: meters_per_second_squared = exit_acceleration
-        self._exit_velocity = intake_velocity + exit_acceleration * 0.5
+        # Convert to LEDs per second so positions can be advanced in LEDs
+        self._intake_velocity: float = intake_velocity / led_spacing
+        self._exit_acceleration: float = exit_acceleration / led_spacing
+        self._exit_velocity: float = self._intake_velocity
         self._fill_size: int = fill_size
-        self._gamma: float = gamma
         self._state: PatternState = PatternState.fill
         self._leds_placed: int = 0
         self._falling_led_position: float = 0.0
         self.reset()
 
+    @override
     def reset(self):
         self._leds_placed = 0
         self._falling_led_position = 0.0
+        self._exit_velocity = self._intake_velocity
         self._state = PatternState.fill
 
-    def _apply_to(self, data: list[AddressableLED.LEDData]):
+    @override
+    def render(self, frame: LEDFrame) -> None:
+        pixels = frame.pixels
+        length = len(frame)
+        step = self._get_time_step()
+        self._bars.prepare(length)
         match self._state: 
             case PatternState.fill:
-                for i in range(len(data)):
-                    if (i >= (len(data)) - self._leds_placed) :
-                        data[i].setLED(self._correct_gamma(self._colors[self._get_color_index(i)]))
-                    elif(i >= int(self._falling_led_position) and i < int(self._falling_led_position) + self._fill_size) :
-                        data[i].setLED(self._correct_gamma(self._colors[self._get_color_index(len(data) - self._leds_placed - self._fill_size + i)]))
-                    else:
-                        data[i].setLED(Color.kBlack)
-                self._falling_led_position += self._intake_velocity
-                if (int(self._falling_led_position) >= (len(data) - self._leds_placed - self._fill_size)) :
+                position = int(self._falling_led_position)
+                pixels.fill(0)
+                stack_start = max(length - self._leds_placed, 0)
+                pixels[stack_start:] = self._bars.get_colors(stack_start, length)
+                falling_start = max(position, 0)
+                falling_end = min(position + self._fill_size, stack_start)
+                if falling_start < falling_end:
+                    pixels[falling_start:falling_end] = self._bars.get_colors(falling_start, falling_end, length - self._leds_placed - self._fill_size)
+                self._falling_led_position += self._intake_velocity * step
+                if (int(self._falling_led_position) >= (length - self._leds_placed - self._fill_size)) :
                     self._falling_led_position = 0
                     self._leds_placed += self._fill_size
-                    if (self._leds_placed > (len(data))) :
-                        self._falling_led_position = (len(data))
-                        self._leds_placed = (len(data))
+                    if (self._leds_placed > (length)) :
+                        self._falling_led_position = (length)
+                        self._leds_placed = (length)
                         self._state = PatternState.empty
-                return data
             case PatternState.empty:
-                self._falling_led_position += self._exit_velocity
-                self._exit_velocity += self._exit_acceleration
-                for i in range(len(data)):
-                    if (i<int(self._falling_led_position)):
-                        data[i].setLED(Color.kBlack)
-                    else:
-                        data[i].setLED(self._colors[self._get_color_index(i - int(self._falling_led_position))])
-                if(self._falling_led_position >= (len(data))):
+                self._falling_led_position += self._exit_velocity * step + 0.5 * self._exit_acceleration * step ** 2
+                self._exit_velocity += self._exit_acceleration * step
+                position = int(self._falling_led_position)
+                sand_start = min(max(position, 0), length)
+                pixels[:sand_start] = 0
+                pixels[sand_start:] = self._bars.get_colors(sand_start, length, -position)
+                if(self._falling_led_position >= (length)):
                     self.reset()
-                return data
 
-    def _get_color_index(self, offset: int) -> int:
-        return (offset // self._bar_size) % len(self._colors) 
-    def  _positive_fmod(self, numerator: float, denominator: float)-> float:
-        return ((numerator % denominator) + denominator % denominator)
-    def _correct_gamma(self, color: Color) -> Color:
-        return Color(color.red** self._gamma, color.green**self._gamma, color.blue**self._gamma)
\ No newline at end of file
+    def set_colors(self, colors: Iterable[Color]) -> None:
+        '''
+        Sets the colors of the bars
+
+        Parameters:
+            - colors (Iterable[Color]): The colors to cycle through
+        '''
+        self._bars.set_palette(apply_gamma(colors_to_array(colors), self._gamma))
+
+    def set_bar_size(self, bar_size: int) -> None:
+        '''
+        Sets the number of LEDs in each bar
+
+        Parameters:
+            - bar_size (int): The number of LEDs in each bar
+        '''
+        self._bars.set_bar_size(bar_size)
@@ -1,69 +1,94 @@
-import random
+from typing import override
 
-class Fire:
-    def __init__(self, height, sparks, delay, n_leds):
+import numpy as np
+from numpy.typing import NDArray
+
+from wpimath.units import hertz
+
+from .frame import LEDFrame
+from .pattern import Pattern
+
+def _build_heat_palette() -> NDArray[np.uint8]:
+    temperature = np.arange(256)
+
+    # Scale 0–255 → 0–191
+    t192 = (temperature * 192) // 255
+
+    # Ramp from 0..63 → 0..252
+    heatramp = (t192 & 0x3F) << 2
+
+    hottest = t192 > 0x80
+    middle = t192 > 0x40
+
+    # Hottest third: (255, 255, heatramp)
+    # Middle third: (255, heatramp, 0)
+    # Coolest third: (heatramp, 0, 0)
+    palette = np.stack((
+        np.where(middle, 255, heatramp),
+        np.where(hottest, 255, np.where(middle, heatramp, 0)),
+        np.where(hottest, heatramp, 0)
+    ), axis=-1).astype(np.uint8)
+    palette.flags.writeable = False
+    return palette
+
+_HEAT_PALETTE: NDArray[np.uint8] = _build_heat_palette()
+
+class Fire(Pattern):
+    FRAME_RATE: hertz | None = 25.0
+
+    def __init__(self, height, sparks, delay, n_leds, columns: int = 1, mirrored: bool = False, seed: int | None = None):
         """
         :param height: The height of the fire. Smaller values = taller flames.
         :param sparks: Number of sparks to ignite. Higher = more frequent sparks.
         :param delay: Delay between sparks. Smaller = shorter delays.
         :param n_leds: Number of LEDs.
+        :param columns: Number of independent fires the LEDs are split into. Must divide n_leds evenly.
+        :param mirrored: Flip every other column, so neighbouring fires burn in opposite directions.
+        :param seed: Seed for the random number generator, for reproducible flames.
         """
+        super().__init__()
+        if columns < 1 or n_leds < columns:
+            raise ValueError(f"Invalid number of fire columns: {columns}")
+        if n_leds % columns != 0:
+            raise ValueError(f"Invalid number of fire columns: {n_leds} LEDs can't be split into {columns} equal columns")
         self._height = height
         self._sparks = sparks
         self._delay = delay
         self._size = n_leds
-        self._heat = [0] * n_leds
+        self._columns = columns
+        self._column_size = n_leds // columns
+        self._mirrored = mirrored
+        self._rng: np.random.Generator = np.random.default_rng(seed)
+        self._heat: NDArray[np.int16] = np.zeros((columns, self._column_size), dtype=np.int16)
 
-    def apply_to(self, data):
-        # Cool down every cell a little
-        for i in range(self._size):
-            cooldown = self._random(0, (self._height * 10) // self._size + 2)
+    @override
+    def render(self, frame: LEDFrame) -> None:
+        heat = self._heat
 
-            if cooldown > self._heat[i]:
-                self._heat[i] = 0
-            else:
-                self._heat[i] -= cooldown
+        # Cool down every cell a little
+        heat -= self._rng.integers(0, (self._height * 10) // self._column_size + 2, size=heat.shape, dtype=np.int16)
+        np.maximum(heat, 0, out=heat)
 
         # Heat from below drifts up and diffuses a little
-        for k in range(self._size - 1, 1, -1):
-            self._heat[k] = (self._heat[k - 1] +
-                            self._heat[k - 2] +
-                            self._heat[k - 2]) // 3
+        heat[:, 2:] = (heat[:, 1:-1] + heat[:, :-2] + heat[:, :-2]) // 3
 
-        # Randomly ignite new sparks near the bottom
-        if self._random(0, 255) < self._sparks:
-            y = self._random(0, 7)
-            if y < self._size:
-                self._heat[y] = self._random(160, 255)
+        # Randomly ignite new sparks near the bottom of each column
+        ignite = self._rng.integers(0, 255, size=self._columns) < self._sparks
+        y = self._rng.integers(0, 7, size=self._columns)
+        ignite &= y < self._column_size
+        heat[ignite, y[ignite]] = self._rng.integers(160, 255, size=self._columns, dtype=np.int16)[ignite]
 
         # Map heat to LED colors
-        for j in range(self._size):
-            r, g, b = self._heat_color(self._heat[j])
-            data[j].set_rgb(r, g, b)
-        return data
-
-    def reset(self):
-        for i in range(self._size):
-            self._heat[i] = 0
-
-    def _heat_color(self, temperature):
-        # Scale 0–255 → 0–191
-        t192 = (temperature * 192) // 255
+        colors = _HEAT_PALETTE[heat]
+        if self._mirrored:
+            colors[1::2] = colors[1::2, ::-1]
+        colors = colors.reshape(-1, 3)
+        size = min(len(colors), len(frame))
+        frame.pixels[:size] = colors[:size]
 
-        # Ramp from 0..63 → 0..252
-        heatramp = (t192 & 0x3F) << 2
-
-        # Hottest third
-        if t192 > 0x80:
-            return (255, 255, heatramp)
-
-        # Middle third
-        elif t192 > 0x40:
-            return (255, heatramp, 0)
-
-        # Coolest third
-        else:
-            return (heatramp, 0, 0)
+    def apply_to(self, data):
+        return self._apply_to(data)
 
-    def _random(self, low, high):
-        return random.randint(low, high - 1)
\ No newline at end of file
+    @override
+    def reset(self):
+        self._heat.fill(0)
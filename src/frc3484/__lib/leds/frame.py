@@ -0,0 +1,94 @@
+from itertools import starmap
+
+import numpy as np
+from numpy.typing import NDArray
+
+from wpilib import AddressableLED, Color
+
+from .gamma import get_gamma_table
+
+class LEDFrame:
+    '''
+    A contiguous RGB frame buffer for an LED strip
+
+    Pixels are stored as a (length, 3) uint8 array so patterns can render with whole-array operations
+    instead of calling setLED on every LED
+
+    Parameters:
+        - length (int): The number of LEDs in the frame
+    '''
+    def __init__(self, length: int) -> None:
+        self._pixels: NDArray[np.uint8] = np.zeros((length, 3), dtype=np.uint8)
+        self._committed: NDArray[np.uint8] | None = None
+
+    def __len__(self) -> int:
+        return self._pixels.shape[0]
+
+    @property
+    def pixels(self) -> NDArray[np.uint8]:
+        '''
+        Returns the (length, 3) RGB array backing the frame. Writing to it changes the frame in place
+
+        Returns:
+            - NDArray[np.uint8]: The RGB values of every LED
+        '''
+        return self._pixels
+
+    def clear(self) -> None:
+        '''
+        Sets every LED in the frame to black
+        '''
+        self._pixels.fill(0)
+
+    def fill(self, color: Color) -> None:
+        '''
+        Sets every LED in the frame to one color
+
+        Parameters:
+            - color (Color): The color to set
+        '''
+        self._pixels[:] = (int(color.red * 255), int(color.green * 255), int(color.blue * 255))
+
+    def apply_gamma(self, gamma: float) -> None:
+        '''
+        Gamma-corrects every LED in the frame in place with a cached lookup table
+
+        Parameters:
+            - gamma (float): The gamma exponent
+        '''
+        np.take(get_gamma_table(gamma), self._pixels, out=self._pixels)
+
+    def commit(self) -> bool:
+        '''
+        Records the current pixels as the last frame sent to the strip
+
+        Returns:
+            - bool: True if the pixels changed since the last commit, False if the strip is already showing them
+        '''
+        if self._committed is not None and np.array_equal(self._pixels, self._committed):
+            return False
+        self._committed = self._pixels.copy()
+        return True
+
+    def to_led_data(self) -> list[AddressableLED.LEDData]:
+        '''
+        Converts the frame into the list passed to AddressableLED.setData
+
+        Returns:
+            - list[AddressableLED.LEDData]: One LEDData per LED
+        '''
+        return list(starmap(AddressableLED.LEDData, self._pixels.tolist()))
+
+    def write_to(self, data: list[AddressableLED.LEDData]) -> list[AddressableLED.LEDData]:
+        '''
+        Copies the frame into an existing list of LEDData
+
+        Parameters:
+            - data (list[AddressableLED.LEDData]): The LEDs to write to
+
+        Returns:
+            - list[AddressableLED.LEDData]: The same list, for chaining into setData
+        '''
+        for led, (r, g, b) in zip(data, self._pixels.tolist()):
+            led.setRGB(r, g, b)
+        return data
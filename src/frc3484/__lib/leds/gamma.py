@@ -0,0 +1,51 @@
+from functools import cache
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .utils import to_rgb8
+
+DEFAULT_RESOLUTION: int = 256
+
+@cache
+def get_gamma_table(gamma: float, resolution: int = DEFAULT_RESOLUTION) -> NDArray[np.uint8]:
+    '''
+    Returns a lookup table of gamma-corrected 8-bit values for evenly spaced brightness levels from 0.0 to 1.0
+
+    Tables are built once per gamma and resolution and shared by every pattern, so no pattern
+    has to raise individual pixels to a power each frame
+
+    Parameters:
+        - gamma (float): The gamma exponent
+        - resolution (int): The number of entries in the table
+
+    Returns:
+        - NDArray[np.uint8]: A read-only table with one entry per brightness level
+    '''
+    if resolution < 2:
+        raise ValueError(f"Invalid gamma table resolution: {resolution}")
+    table = to_rgb8(np.linspace(0.0, 1.0, resolution) ** gamma)
+    table.flags.writeable = False
+    return table
+
+def apply_gamma(values: NDArray[np.floating] | NDArray[np.uint8], gamma: float, resolution: int = DEFAULT_RESOLUTION) -> NDArray[np.uint8]:
+    '''
+    Gamma-corrects a whole array of RGB values with a single table lookup
+
+    Parameters:
+        - values (NDArray): RGB values, either floats from 0.0 to 1.0 or uint8 from 0 to 255
+        - gamma (float): The gamma exponent
+        - resolution (int): The number of entries in the lookup table
+
+    Returns:
+        - NDArray[np.uint8]: The corrected RGB values from 0 to 255
+    '''
+    table: NDArray[np.uint8] = get_gamma_table(gamma, resolution)
+    indices: NDArray[np.intp]
+    if values.dtype == np.uint8:
+        indices = values.astype(np.intp)
+        if resolution != 256:
+            indices = indices * (resolution - 1) // 255
+    else:
+        indices = np.rint(np.clip(values, 0.0, 1.0) * (resolution - 1)).astype(np.intp)
+    return table[indices]
@@ -0,0 +1,101 @@
+import math
+from abc import ABC, abstractmethod
+
+from wpilib import AddressableLED
+from wpimath.units import hertz, seconds
+
+from .clock import DEFAULT_CLOCK, LEDClock
+from .frame import LEDFrame
+
+class Pattern(ABC):
+    '''
+    Base class for LED patterns
+
+    Subclasses override render() to draw into an LEDFrame with whole-array operations,
+    and take the time to animate by from _get_time_step()
+    '''
+    ANIMATED: bool = True # Patterns whose output only changes when they are reconfigured can set this to False
+    FRAME_RATE: hertz | None = None # Patterns that don't need a new frame every cycle can set a lower rate
+
+    def __init__(self) -> None:
+        self._frame: LEDFrame | None = None
+        self._next_frame_time: seconds = -math.inf
+        self._clock: LEDClock = DEFAULT_CLOCK
+        self._last_step_time: seconds | None = None
+
+    def reset(self) -> None:
+        '''
+        Resets the pattern to its starting state
+        '''
+        pass
+
+    @abstractmethod
+    def render(self, frame: LEDFrame) -> None:
+        '''
+        Draws the next frame of the pattern
+
+        Parameters:
+            - frame (LEDFrame): The frame to draw into
+        '''
+
+    def update(self, frame: LEDFrame, now: seconds) -> bool:
+        '''
+        Draws the next frame of the pattern if it is due at the pattern's frame rate
+
+        Parameters:
+            - frame (LEDFrame): The frame to draw into
+            - now (seconds): The current time
+
+        Returns:
+            - bool: True if a frame was drawn, False if the frame was left as it was
+        '''
+        if self.FRAME_RATE is not None:
+            if now < self._next_frame_time:
+                return False
+            # Schedule from the last deadline so the rate holds on average, without bursting after a long pause
+            self._next_frame_time = max(self._next_frame_time + 1.0 / self.FRAME_RATE, now)
+        self.render(frame)
+        return True
+
+    def invalidate(self) -> None:
+        '''
+        Makes the next call to update() draw a frame regardless of the frame rate, and restarts the animation timing
+        '''
+        self._next_frame_time = -math.inf
+        self._last_step_time = None
+
+    def set_clock(self, clock: LEDClock) -> None:
+        '''
+        Sets the clock the pattern animates from
+
+        Parameters:
+            - clock (LEDClock): The clock to use
+        '''
+        self._clock = clock
+        self._last_step_time = None
+
+    def _get_time_step(self) -> seconds:
+        '''
+        Returns the time elapsed since the last call, or 0 on the first frame after the pattern is invalidated
+
+        Returns:
+            - seconds: The time to advance the animation by
+        '''
+        now = self._clock.now()
+        step = 0.0 if self._last_step_time is None else max(now - self._last_step_time, 0.0)
+        self._last_step_time = now
+        return step
+
+    def _apply_to(self, data: list[AddressableLED.LEDData]) -> list[AddressableLED.LEDData]:
+        '''
+        Draws the next frame of the pattern into a list of LEDData
+
+        Kept for code that manages its own AddressableLED buffer. LEDEngine avoids the per-LED copy
+
+        Parameters:
+            - data (list[AddressableLED.LEDData]): The LEDs to write to
+        '''
+        if self._frame is None or len(self._frame) != len(data):
+            self._frame = LEDFrame(len(data))
+        self.render(self._frame)
+        return self._frame.write_to(data)
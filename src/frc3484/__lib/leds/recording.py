@@ -0,0 +1,185 @@
+import struct
+from typing import Iterator
+
+import numpy as np
+from numpy.typing import NDArray
+
+from commands2 import CommandScheduler
+from wpilib import AddressableLED
+from wpimath.units import seconds
+
+from .clock import LEDClock
+from .engine import LEDEngine
+from .pattern import Pattern
+
+class HeadlessLED:
+    '''
+    An LEDStrip that keeps the last data it was sent instead of driving a strip
+
+    Lets LEDEngine run on a machine without robot hardware or the HAL simulator
+    '''
+    def __init__(self) -> None:
+        self._length: int = 0
+        self._data: list[AddressableLED.LEDData] = []
+        self._running: bool = False
+        self.frames_sent: int = 0
+
+    def setLength(self, length: int) -> None:
+        self._length = length
+
+    def setData(self, data: list[AddressableLED.LEDData]) -> None:
+        self._data = data
+        self.frames_sent += 1
+
+    def start(self) -> None:
+        self._running = True
+
+    def stop(self) -> None:
+        self._running = False
+
+    def get_pixels(self) -> NDArray[np.uint8]:
+        '''
+        Returns the last data sent to the strip
+
+        Returns:
+            - NDArray[np.uint8]: A (length, 3) array of RGB values
+        '''
+        return np.array([(led.r, led.g, led.b) for led in self._data], dtype=np.uint8).reshape(-1, 3)
+
+class LEDRecording:
+    '''
+    A sequence of LED frames that can be saved to and loaded from a compact binary file
+
+    The file is a small header followed by the raw frames x LEDs x RGB bytes
+
+    Parameters:
+        - length (int): The number of LEDs in every frame
+    '''
+    _MAGIC: bytes = b"LEDR"
+    _VERSION: int = 1
+    _HEADER: struct.Struct = struct.Struct("<4sHII")
+
+    def __init__(self, length: int) -> None:
+        self._length: int = length
+        self._frames: list[NDArray[np.uint8]] = []
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __getitem__(self, index: int) -> NDArray[np.uint8]:
+        return self._frames[index]
+
+    def __iter__(self) -> Iterator[NDArray[np.uint8]]:
+        return iter(self._frames)
+
+    @property
+    def length(self) -> int:
+        '''
+        Returns the number of LEDs in every frame
+        '''
+        return self._length
+
+    def append(self, pixels: NDArray[np.uint8]) -> None:
+        '''
+        Adds a copy of a frame to the end of the recording
+
+        Parameters:
+            - pixels (NDArray[np.uint8]): A (length, 3) array of RGB values
+        '''
+        if pixels.shape != (self._length, 3):
+            raise ValueError(f"Invalid frame shape {pixels.shape} for a recording of {self._length} LEDs")
+        self._frames.append(pixels.astype(np.uint8, copy=True))
+
+    def to_array(self) -> NDArray[np.uint8]:
+        '''
+        Returns the whole recording as a (frames, length, 3) array
+        '''
+        if not self._frames:
+            return np.zeros((0, self._length, 3), dtype=np.uint8)
+        return np.stack(self._frames)
+
+    def find_mismatch(self, other: "LEDRecording", tolerance: int = 0) -> int | None:
+        '''
+        Finds the first frame that differs from another recording
+
+        Parameters:
+            - other (LEDRecording): The recording to compare against, such as a golden recording
+            - tolerance (int): The largest per-channel difference that still counts as a match
+
+        Returns:
+            - int | None: The index of the first mismatching frame, or None if the recordings match
+        '''
+        if self._length != other._length:
+            return 0
+        for index, (frame, other_frame) in enumerate(zip(self._frames, other._frames)):
+            if np.abs(frame.astype(np.int16) - other_frame).max(initial=0) > tolerance:
+                return index
+        if len(self._frames) != len(other._frames):
+            return min(len(self._frames), len(other._frames))
+        return None
+
+    def save(self, path: str) -> None:
+        '''
+        Saves the recording to a file
+
+        Parameters:
+            - path (str): The file to write
+        '''
+        with open(path, "wb") as file:
+            _ = file.write(self._HEADER.pack(self._MAGIC, self._VERSION, len(self._frames), self._length))
+            _ = file.write(self.to_array().tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> "LEDRecording":
+        '''
+        Loads a recording from a file
+
+        Parameters:
+            - path (str): The file to read
+
+        Returns:
+            - LEDRecording: The loaded recording
+        '''
+        with open(path, "rb") as file:
+            magic, version, frames, length = cls._HEADER.unpack(file.read(cls._HEADER.size))
+            if magic != cls._MAGIC or version != cls._VERSION:
+                raise ValueError(f"{path} is not a version {cls._VERSION} LED recording")
+            data = np.frombuffer(file.read(frames * length * 3), dtype=np.uint8)
+
+        if data.size != frames * length * 3:
+            raise ValueError(f"{path} is truncated")
+        recording = cls(length)
+        recording._frames = list(data.reshape(frames, length, 3))
+        return recording
+
+def record_pattern(pattern: Pattern, length: int, frames: int, period: seconds = 0.02) -> LEDRecording:
+    '''
+    Runs a pattern through LEDEngine on a HeadlessLED with simulated time, and records every frame
+
+    The pattern is reset first, so a pattern with a fixed seed produces the same recording on every run
+
+    Parameters:
+        - pattern (Pattern): The pattern to record
+        - length (int): The number of LEDs on the simulated strip
+        - frames (int): The number of robot loop cycles to record
+        - period (seconds): The simulated time between cycles
+
+    Returns:
+        - LEDRecording: One frame per cycle
+    '''
+    time: list[seconds] = [0.0]
+    clock = LEDClock(lambda: time[0])
+    pattern.set_clock(clock)
+
+    engine = LEDEngine(HeadlessLED(), length, clock)
+    engine.set_pattern(pattern)
+
+    recording = LEDRecording(length)
+    try:
+        for cycle in range(frames):
+            time[0] = cycle * period
+            engine.periodic()
+            recording.append(engine.frame.pixels)
+    finally:
+        CommandScheduler.getInstance().unregisterSubsystem(engine)
+    return recording
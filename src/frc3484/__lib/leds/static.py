@@ -1,54 +1,56 @@
-from wpilib import AddressableLED, LEDPattern, Timer, Color
+from wpilib import Color
 from wpimath.units import meters
-from typing import Iterable
+from typing import Iterable, override
 from enum import Enum
 
+import numpy as np
+from numpy.typing import NDArray
+
+from .frame import LEDFrame
+from .pattern import Pattern
+from .gamma import apply_gamma
+from .utils import colors_to_array
+
 class PatternState(Enum):
     fill = 0,
     empty = 1
 
-class Static:
+class Static(Pattern):
     def __init__(self, colors: Iterable[Color], bar_size: int, led_spacing: meters, fill_size: int, gamma: float) -> None:
-        self._colors: list[Color] = []
-        for color in colors:
-            self._colors.append(self._correct_gamma(color))
+        super().__init__()
+        self._gamma: float = gamma
+        self._colors: NDArray[np.uint8] = apply_gamma(colors_to_array(colors), gamma)
         self._bar_size: int = bar_size
         self._led_spacing: meters = led_spacing
         self._fill_size: int = fill_size
-        self._gamma: float = gamma
-        self._center_point: int
+        self._center_point: int = (bar_size - 1) // 2
         self._leds_placed: int = 0
         self._state: PatternState = PatternState.fill
 
+    @override
     def reset(self):
         self._leds_placed = 0
         self._state = PatternState.fill
-    def _apply_to(self, data: list[AddressableLED.LEDData]):
+    @override
+    def render(self, frame: LEDFrame) -> None:
+        pixels = frame.pixels
         match self._state:
             case PatternState.fill:
-                for i in range(self._bar_size):
-                    data[i].setRGB(0, 0, 0)
+                pixels[:self._bar_size] = 0
 
-                for i in range(self._leds_placed + 1):
-                    left = i
-                    right = self._bar_size - 1 - i
-                    if left <= right:
-                        data[left].setLED(self._colors[0])
-                        data[right].setLED(self._colors[0])
+                # Light the same number of LEDs in from each end of the bar, stopping at the center
+                lit = max(min(self._leds_placed, self._center_point) + 1, 0)
+                if lit > 0:
+                    pixels[:lit] = self._colors[0]
+                    pixels[self._bar_size - lit:self._bar_size] = self._colors[0]
 
-                        self._leds_placed += 1
+                    self._leds_placed += lit
 
-                        if self._leds_placed > self._center_point:
-                            self._state = PatternState.empty
-                return data
+                    if self._leds_placed > self._center_point:
+                        self._state = PatternState.empty
 
             case PatternState.empty:
-                for i in range(self._bar_size):
-                    data[i].setRGB(0, 0, 0)
+                pixels[:self._bar_size] = 0
 
                 self._leds_placed = 0
                 self._state = PatternState.fill
-                return data
-
-    def _correct_gamma(self, color: Color) -> Color:
-        return Color(color.red** self._gamma, color.green**self._gamma, color.blue**self._gamma)
\ No newline at end of file
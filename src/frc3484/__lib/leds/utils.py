@@ -1,4 +1,45 @@
+from typing import Iterable
+
+import numpy as np
+from numpy.typing import NDArray
+
 from wpilib import Color
 
-def correct_gamma(self, color: Color) -> Color:
-    return Color(color.red** self._gamma, color.green**self._gamma, color.blue**self._gamma)
\ No newline at end of file
+def correct_gamma(color: Color, gamma: float) -> Color:
+    '''
+    Gamma-corrects a single color
+
+    Use apply_gamma to correct whole frames or palettes
+
+    Parameters:
+        - color (Color): The color to correct
+        - gamma (float): The gamma exponent
+
+    Returns:
+        - Color: The corrected color
+    '''
+    return Color(color.red ** gamma, color.green ** gamma, color.blue ** gamma)
+
+def colors_to_array(colors: Iterable[Color]) -> NDArray[np.float64]:
+    '''
+    Converts colors into an (n, 3) array of RGB values from 0.0 to 1.0
+
+    Parameters:
+        - colors (Iterable[Color]): The colors to convert
+
+    Returns:
+        - NDArray[np.float64]: One row per color
+    '''
+    return np.array([(color.red, color.green, color.blue) for color in colors], dtype=np.float64).reshape(-1, 3)
+
+def to_rgb8(values: NDArray[np.float64]) -> NDArray[np.uint8]:
+    '''
+    Converts RGB values from 0.0 to 1.0 into 8-bit channels, truncating the same way LEDData.setLED does
+
+    Parameters:
+        - values (NDArray[np.float64]): RGB values from 0.0 to 1.0
+
+    Returns:
+        - NDArray[np.uint8]: RGB values from 0 to 255
+    '''
+    return (np.clip(values, 0.0, 1.0) * 255).astype(np.uint8)
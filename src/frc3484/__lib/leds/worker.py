@@ -0,0 +1,119 @@
+import threading
+
+import numpy as np
+
+from .clock import LEDClock
+from .frame import LEDFrame
+from .pattern import Pattern
+
+class LEDRenderWorker:
+    '''
+    Renders LED frames on a background thread so the robot loop only has to pick them up
+
+    The worker renders into a back buffer and swaps it with a ready buffer when the frame is done.
+    The robot loop copies the ready buffer out with a non-blocking take(). If the worker is still busy when the next
+    frame is requested, it finishes the current frame and then renders one more, so a slow pattern drops frames
+    instead of blocking the loop
+
+    Parameters:
+        - length (int): The number of LEDs on the strip
+        - clock (LEDClock): The clock used to schedule frames
+    '''
+    def __init__(self, length: int, clock: LEDClock) -> None:
+        self._clock: LEDClock = clock
+        self._back: LEDFrame = LEDFrame(length)
+        self._ready: LEDFrame = LEDFrame(length)
+        self._has_frame: bool = False
+        self._lock: threading.Lock = threading.Lock()
+        self._requested: threading.Event = threading.Event()
+        self._running: bool = False
+        self._thread: threading.Thread | None = None
+
+        self._pattern: Pattern | None = None
+        self._pending_pattern: Pattern | None = None
+        self._pattern_changed: bool = False
+
+    def start(self) -> None:
+        '''
+        Starts the render thread
+        '''
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="LEDRenderWorker", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        '''
+        Stops the render thread and waits for the frame in progress to finish
+        '''
+        if self._thread is None:
+            return
+        self._running = False
+        self._requested.set()
+        self._thread.join()
+        self._thread = None
+
+    def set_pattern(self, pattern: Pattern | None) -> None:
+        '''
+        Sets the pattern to render. The switch happens on the render thread before its next frame
+
+        Parameters:
+            - pattern (Pattern | None): The pattern to render, or None to render black
+        '''
+        self._pending_pattern = pattern
+        self._pattern_changed = True
+
+    def request(self) -> None:
+        '''
+        Asks the render thread for the next frame without waiting for it
+        '''
+        self._requested.set()
+
+    def take(self, frame: LEDFrame) -> bool:
+        '''
+        Copies the newest finished frame into a frame without blocking
+
+        Parameters:
+            - frame (LEDFrame): The frame to copy into
+
+        Returns:
+            - bool: True if a new frame was copied, False if none was ready or the render thread was mid-swap
+        '''
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            if not self._has_frame:
+                return False
+            np.copyto(frame.pixels, self._ready.pixels)
+            self._has_frame = False
+            return True
+        finally:
+            self._lock.release()
+
+    def _run(self) -> None:
+        while True:
+            _ = self._requested.wait()
+            self._requested.clear()
+            if not self._running:
+                return
+
+            if self._pattern_changed:
+                self._pattern_changed = False
+                pattern = self._pending_pattern
+                if pattern is not self._pattern and pattern is not None:
+                    pattern.reset()
+                    pattern.invalidate()
+                self._pattern = pattern
+
+            # Only this thread writes the buffers, so the ready buffer can be read without the lock.
+            # Starting from the last frame keeps pixels that a pattern doesn't redraw
+            np.copyto(self._back.pixels, self._ready.pixels)
+            if self._pattern is None:
+                self._back.clear()
+            elif not self._pattern.update(self._back, self._clock.now()):
+                continue
+
+            with self._lock:
+                self._back, self._ready = self._ready, self._back
+                self._has_frame = True
@@ -1,23 +1,25 @@
 from enum import Enum
 from typing import override
 
-from wpilib import SmartDashboard
-from wpimath.units import degrees, degrees_per_second, turns
+from wpilib import Timer
+from wpimath.units import degrees, degrees_per_second, seconds, turns
 # from wpimath.controller import PIDController, SimpleMotorFeedforwardMeters
 # from wpimath.trajectory import TrapezoidProfile
 
 
 from phoenix6 import controls
 from phoenix6.hardware import CANcoder
-from phoenix6.configs import ExternalFeedbackConfigs, FeedbackConfigs, TalonFXSConfiguration, TalonFXConfiguration, CurrentLimitsConfigs, Slot0Configs
+from phoenix6.configs import ExternalFeedbackConfigs, FeedbackConfigs, TalonFXSConfiguration, TalonFXConfiguration, Slot0Configs
 from phoenix6.signals import ExternalFeedbackSensorSourceValue, FeedbackSensorSourceValue
 
 from .power_motor import PowerMotor
+from .profiles import MotionProfile, profile_from_config
 from ..datatypes.motion_datatypes import SC_AngularFeedForwardConfig, SC_PIDConfig, SC_MotorConfig, SC_TrapezoidConfig
 
 class State(Enum):
     POWER = 0
     POSITION = 1
+    PROFILE = 2
 
 class AngularPositionMotor(PowerMotor):
     '''
@@ -59,15 +61,20 @@ class AngularPositionMotor(PowerMotor):
 
         self._gear_ratio: float = gear_ratio
         self._angle_tolerance: degrees = angle_tolerance
+        # The tolerance in the units of get_position, converted with _to_rotations like every other position
+        self._position_tolerance: float = angle_tolerance
+        self._trapezoid_config: SC_TrapezoidConfig = trapezoid_config
+        self._acceleration_gain: float = feed_forward_config.A
+
+        # Profiles are followed on the host by streaming position setpoints with velocity and acceleration feed forward
+        self._profile_request: controls.PositionVoltage = controls.PositionVoltage(0.0, slot=0, enable_foc=False)
+        self._profile: MotionProfile | None = None
+        self._profile_start: seconds = 0.0
+        # The last commanded position, in the units of get_position, used as the start of the next profiled move
+        self._target_position: float | None = None
 
         self._open_loop_request: controls.DutyCycleOut = controls.DutyCycleOut(0.0, enable_foc=False)
         self._closed_loop_request: controls.MotionMagicVoltage | controls.PositionVoltage = controls.PositionVoltage(0.0, 0, enable_foc=False) if trapezoid_config == SC_TrapezoidConfig() else controls.MotionMagicVoltage(0.0, slot=0, enable_foc=False)
-        self._motor_config.current_limits = CurrentLimitsConfigs() \
-            .with_supply_current_limit_enable(motor_config.current_limit_enabled) \
-            .with_supply_current_limit(motor_config.current_limit) \
-            .with_supply_current_lower_limit(motor_config.current_threshold) \
-            .with_supply_current_lower_time(motor_config.current_time) 
-
         self._motor_config.slot0 = Slot0Configs() \
             .with_k_p(pid_config.Kp) \
             .with_k_i(pid_config.Ki) \
@@ -105,7 +112,6 @@ class AngularPositionMotor(PowerMotor):
         else:
             raise ValueError(f"Invalid motor type: {motor_config.motor_type}")
 
-        _ = self._motor.configurator.apply(self._motor_config)        
 
 
 
@@ -116,20 +122,36 @@ class AngularPositionMotor(PowerMotor):
         '''
         match self._state:
             case State.POSITION:
-                self._motor.set_control(self._closed_loop_request)
+                self._send_control(self._closed_loop_request)
+            case State.PROFILE:
+                if self._profile is not None:
+                    position, velocity, acceleration = self._profile.sample(Timer.getFPGATimestamp() - self._profile_start)
+                    request = self._profile_request
+                    request.position = self._to_rotations(position)
+                    request.velocity = self._to_rotations(velocity)
+                    request.feed_forward = self._acceleration_gain * self._to_rotations(acceleration)
+                    self._send_control(request)
             case State.POWER:
-                self._motor.set_control(self._open_loop_request)
-        if SmartDashboard.getBoolean(f"{self._motor_name} Diagnostics", defaultValue=False):
+                self._send_control(self._open_loop_request)
+        if self._diagnostics.enabled and self._diagnostics.is_due():
             self.print_diagnostics()
 
     def at_target_position(self) -> bool:
         '''
         Returns whether the motor is at the target angle or not
 
+        While following a profile, the target is the end of the profile, and the motor is only at it once the profile
+        has finished. In power mode there is no target, so this is always False
+
         Returns:
             - bool: True if the motor is at the target angle, False otherwise
         '''
-        return abs(self._closed_loop_request.position - self._motor.get_position().value) < self._angle_tolerance
+        if self._state == State.PROFILE and self.get_profile_time_remaining() > 0:
+            return False
+        if self._target_position is None:
+            return False
+        error = self._to_rotations(self._target_position) - self._signals.position.value
+        return abs(error) < self._to_rotations(self._position_tolerance)
 
     def get_position(self) -> degrees:
         '''
@@ -138,7 +160,7 @@ class AngularPositionMotor(PowerMotor):
         Returns:
             - degrees: The current angle of the motor
         '''
-        return (self._motor.get_position().value / self._gear_ratio) * 360
+        return (self._signals.position.value / self._gear_ratio) * 360
 
     def get_velocity(self) -> degrees_per_second:
         '''
@@ -147,7 +169,7 @@ class AngularPositionMotor(PowerMotor):
         Returns:
             - degrees_per_second: The current velocity of the motor
         '''
-        return (self._motor.get_velocity().value / self._gear_ratio) * 360
+        return (self._signals.velocity.value / self._gear_ratio) * 360
 
     def set_power(self, power: float) -> None:
         '''
@@ -157,6 +179,7 @@ class AngularPositionMotor(PowerMotor):
             - power (float): The power to set the motor to
         '''
         self._open_loop_request.output = power
+        self._target_position = None
         self._state = State.POWER
 
     def set_target_position(self, position: degrees) -> None:
@@ -166,19 +189,73 @@ class AngularPositionMotor(PowerMotor):
         Parameters:
             - angle (degrees): The angle to set the motor to
         '''
-        self._closed_loop_request.position = position * (self._gear_ratio * 360)
+        self._closed_loop_request.position = self._to_rotations(position)
+        self._target_position = position
         self._state = State.POSITION
         
 
 
+    def follow_profile(self, profile: MotionProfile) -> None:
+        '''
+        Starts following a profile, streaming its setpoints to the motor every cycle
+
+        Parameters:
+            - profile (MotionProfile): The profile to follow, in the same units as get_position
+        '''
+        self._profile = profile
+        self._profile_start = Timer.getFPGATimestamp()
+        self._target_position = profile.end
+        self._state = State.PROFILE
+
+    def move_to(self, position: float, trapezoid_config: SC_TrapezoidConfig | None = None) -> MotionProfile:
+        '''
+        Follows a profile from the current position to a new one
+
+        If the motor has reached its last commanded position, the profile starts from that position instead of the
+        measured one, so repeated moves between the same positions reuse their cached profile tables
+
+        Parameters:
+            - position (float): The position to move to, in the same units as get_position
+            - trapezoid_config (SC_TrapezoidConfig | None): The constraints of the move, or None for the motor's config
+
+        Returns:
+            - MotionProfile: The profile being followed
+        '''
+        config = self._trapezoid_config if trapezoid_config is None else trapezoid_config
+        if config.max_velocity <= 0 or config.max_acceleration <= 0:
+            raise ValueError(f"Invalid trapezoid config for a profiled move: {config}")
+        start = self._target_position
+        if start is None or not self.at_target_position():
+            start = self.get_position()
+        profile = profile_from_config(start, position, config)
+        self.follow_profile(profile)
+        return profile
+
+    def get_profile_time_remaining(self) -> seconds:
+        '''
+        Returns how long the profile being followed needs to reach its end
+
+        Returns:
+            - seconds: The time left, or 0.0 if no profile is being followed
+        '''
+        if self._state != State.PROFILE or self._profile is None:
+            return 0.0
+        return self._profile.get_time_remaining(Timer.getFPGATimestamp() - self._profile_start)
+
+    def _to_rotations(self, value: degrees) -> turns:
+        '''
+        Converts a position, velocity or acceleration in the units of get_position to motor rotations
+        '''
+        return value / 360 * self._gear_ratio
+
     @override
     def print_diagnostics(self) -> None:
         '''
-        Prints diagnostic information to Smart Dashboard
+        Publishes diagnostic information to the motor's NetworkTables table
         '''
-        _ = SmartDashboard.putNumber(f"{self._motor_name} position (degrees)", self.get_position())
-        _ = SmartDashboard.putNumber(f"{self._motor_name} Velocity", self.get_velocity())
-        _ = SmartDashboard.putBoolean(f"{self._motor_name} At Target position", self.at_target_position())
+        self._diagnostics.publish_number("Position (degrees)", self.get_position())
+        self._diagnostics.publish_number("Velocity (degrees/s)", self.get_velocity())
+        self._diagnostics.publish_boolean("At Target Position", self.at_target_position())
         super().print_diagnostics()
 
     @override
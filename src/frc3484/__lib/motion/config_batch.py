@@ -0,0 +1,98 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from phoenix6 import StatusCode
+from phoenix6.configs import TalonFXConfiguration, TalonFXSConfiguration
+from phoenix6.hardware import TalonFX, TalonFXS
+from wpilib import DriverStation
+
+'''
+Deferred motor configuration.
+
+Motors queue their configuration objects while they are constructed, so every subclass can add to the same object
+before anything is sent. Each queued configuration is then applied exactly once, and queued devices are applied in
+parallel because every apply blocks until the device acknowledges it. Failed applies are reported to the driver
+station and returned to the caller.
+'''
+
+class ConfigBatch:
+    '''
+    Motor configurations waiting to be applied
+    '''
+    MAX_WORKERS: int = 8 # The most devices configured at the same time
+
+    def __init__(self) -> None:
+        self._pending: dict[int, tuple[TalonFX | TalonFXS, TalonFXConfiguration | TalonFXSConfiguration]] = {}
+
+    def queue(self, motor: TalonFX | TalonFXS, config: TalonFXConfiguration | TalonFXSConfiguration) -> None:
+        '''
+        Queues a configuration to be applied later
+
+        The configuration object is applied as it is at that time, so it can still be changed after it is queued
+
+        Parameters:
+            - motor (TalonFX | TalonFXS): The motor to configure
+            - config (TalonFXConfiguration | TalonFXSConfiguration): The full configuration of the motor
+        '''
+        self._pending[id(motor)] = (motor, config)
+
+    def is_pending(self, motor: TalonFX | TalonFXS) -> bool:
+        '''
+        Returns whether a motor's configuration is still waiting to be applied
+
+        Parameters:
+            - motor (TalonFX | TalonFXS): The motor to check
+
+        Returns:
+            - bool: True if the configuration hasn't been applied yet
+        '''
+        return id(motor) in self._pending
+
+    def has_pending(self) -> bool:
+        '''
+        Returns whether any configuration is waiting to be applied
+
+        Returns:
+            - bool: True if there is a queued configuration
+        '''
+        return bool(self._pending)
+
+    def apply(self, motors: Iterable[TalonFX | TalonFXS] | None = None) -> dict[int, StatusCode]:
+        '''
+        Applies queued configurations in parallel, reporting each one that fails to the driver station
+
+        Parameters:
+            - motors (Iterable[TalonFX | TalonFXS] | None): The motors to configure, or None for every queued motor
+
+        Returns:
+            - dict[int, StatusCode]: The result of each apply, by device ID
+        '''
+        if motors is None:
+            batch = list(self._pending.values())
+            self._pending.clear()
+        else:
+            batch = [pending for motor in motors if (pending := self._pending.pop(id(motor), None)) is not None]
+        if not batch:
+            return {}
+
+        if len(batch) == 1:
+            statuses = [_apply(*batch[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(batch))) as pool:
+                futures = [pool.submit(_apply, motor, config) for motor, config in batch]
+                statuses = [future.result() for future in futures]
+
+        results: dict[int, StatusCode] = {}
+        for (motor, _), status in zip(batch, statuses):
+            if not status.is_ok():
+                DriverStation.reportWarning(f"Failed to configure motor {motor.device_id}: {status}", False)
+            results[motor.device_id] = status
+        return results
+
+def _apply(motor: TalonFX | TalonFXS, config: TalonFXConfiguration | TalonFXSConfiguration) -> StatusCode:
+    '''
+    Applies a full configuration to a motor, blocking until the device acknowledges it
+    '''
+    return motor.configurator.apply(config)
+
+CONFIG_BATCH: ConfigBatch = ConfigBatch()
@@ -0,0 +1,115 @@
+from ntcore import BooleanEntry, BooleanPublisher, DoublePublisher, EventFlags, NetworkTable, NetworkTableInstance
+from wpilib import Timer
+from wpimath.units import seconds
+
+'''
+Per-motor diagnostics published through NetworkTables handles that are created once.
+
+Each motor gets its own table, such as "Motors/5", with a "Diagnostics" flag that turns publishing on. The flags are
+kept up to date by NetworkTables listeners, so a motor with diagnostics off only checks one attribute per cycle.
+While diagnostics are on, values are published at most once every PUBLISH_PERIOD seconds.
+'''
+
+class MotorDiagnostics:
+    '''
+    The diagnostics table of a single motor
+
+    Parameters:
+        - device_id (int): The CAN ID of the motor, used as the name of its table
+        - table (str): The table that holds the table of every motor
+    '''
+    PUBLISH_PERIOD: seconds = 0.1 # Time between diagnostics updates while they are on
+
+    def __init__(self, device_id: int, table: str = "Motors") -> None:
+        self._table: NetworkTable = NetworkTableInstance.getDefault().getTable(table).getSubTable(str(device_id))
+        self._number_publishers: dict[str, DoublePublisher] = {}
+        self._boolean_publishers: dict[str, BooleanPublisher] = {}
+        self._flag_entries: dict[str, BooleanEntry] = {}
+        self._flags: dict[str, bool] = {}
+        self._next_publish: seconds = 0.0
+
+        self.enabled: bool = False
+        self.add_flag("Diagnostics")
+
+    def add_flag(self, name: str, default: bool = False) -> None:
+        '''
+        Adds a boolean that can be toggled from the dashboard and read without touching NetworkTables
+
+        Parameters:
+            - name (str): The name of the flag
+            - default (bool): The value the flag starts with
+        '''
+        if name in self._flag_entries:
+            return
+        entry = self._table.getBooleanTopic(name).getEntry(default)
+        entry.set(default)
+        self._flag_entries[name] = entry
+        self._set_flag(name, default)
+        _ = NetworkTableInstance.getDefault().addListener(
+            entry,
+            EventFlags.kValueAll,
+            lambda _: self._set_flag(name, entry.get())
+        )
+
+    def _set_flag(self, name: str, value: bool) -> None:
+        '''
+        Stores the value of a flag when it changes
+        '''
+        self._flags[name] = value
+        if name == "Diagnostics":
+            self.enabled = value
+
+    def get_flag(self, name: str) -> bool:
+        '''
+        Returns the value of a flag
+
+        Parameters:
+            - name (str): The name of the flag
+
+        Returns:
+            - bool: The value of the flag, or False if it hasn't been added
+        '''
+        return self._flags.get(name, False)
+
+    def is_due(self) -> bool:
+        '''
+        Returns whether diagnostics are on and PUBLISH_PERIOD has passed since the last update
+
+        Returns:
+            - bool: True if the diagnostics should be published this cycle
+        '''
+        if not self.enabled:
+            return False
+        now = Timer.getFPGATimestamp()
+        if now < self._next_publish:
+            return False
+        self._next_publish = now + self.PUBLISH_PERIOD
+        return True
+
+    def publish_number(self, name: str, value: float) -> None:
+        '''
+        Publishes a number to the motor's table
+
+        Parameters:
+            - name (str): The name of the value
+            - value (float): The value to publish
+        '''
+        publisher = self._number_publishers.get(name)
+        if publisher is None:
+            publisher = self._table.getDoubleTopic(name).publish()
+            self._number_publishers[name] = publisher
+        publisher.set(value)
+
+    def publish_boolean(self, name: str, value: bool) -> None:
+        '''
+        Publishes a boolean to the motor's table
+
+        Parameters:
+            - name (str): The name of the value
+            - value (bool): The value to publish
+        '''
+        publisher = self._boolean_publishers.get(name)
+        if publisher is None:
+            publisher = self._table.getBooleanTopic(name).publish()
+            self._boolean_publishers[name] = publisher
+        publisher.set(value)
@@ -1,7 +1,6 @@
 from enum import Enum
 from typing import override
 
-from wpilib import SmartDashboard
 from wpimath.units import degrees, degrees_per_second, turns
 # from wpimath.controller import PIDController, SimpleMotorFeedforwardMeters
 # from wpimath.trajectory import TrapezoidProfile
@@ -9,7 +8,7 @@ from wpimath.units import degrees, degrees_per_second, turns
 
 from phoenix6 import controls
 from phoenix6.hardware import CANcoder
-from phoenix6.configs import ExternalFeedbackConfigs, FeedbackConfigs, TalonFXSConfiguration, TalonFXConfiguration, CurrentLimitsConfigs, Slot0Configs
+from phoenix6.configs import ExternalFeedbackConfigs, FeedbackConfigs, TalonFXSConfiguration, TalonFXConfiguration, Slot0Configs
 from phoenix6.signals import ExternalFeedbackSensorSourceValue, FeedbackSensorSourceValue
 
 from .power_motor import PowerMotor
@@ -63,12 +62,6 @@ class ExpoMotor(PowerMotor):
         self._open_loop_request: controls.DutyCycleOut = controls.DutyCycleOut(0.0, enable_foc=False)
         self._closed_loop_request: controls.MotionMagicExpoVoltage = controls.MotionMagicExpoVoltage(0.0, slot=0, enable_foc=False)
 
-        self._motor_config.current_limits = CurrentLimitsConfigs() \
-            .with_supply_current_limit_enable(motor_config.current_limit_enabled) \
-            .with_supply_current_limit(motor_config.current_limit) \
-            .with_supply_current_lower_limit(motor_config.current_threshold) \
-            .with_supply_current_lower_time(motor_config.current_time) 
-
         self._motor_config.slot0 = Slot0Configs() \
             .with_k_p(pid_config.Kp) \
             .with_k_i(pid_config.Ki) \
@@ -111,7 +104,6 @@ class ExpoMotor(PowerMotor):
         else:
             raise ValueError(f"Invalid motor type: {motor_config.motor_type}")
 
-        _ = self._motor.configurator.apply(self._motor_config)        
 
 
 
@@ -122,10 +114,10 @@ class ExpoMotor(PowerMotor):
         '''
         match self._state:
             case State.POSITION:
-                self._motor.set_control(self._closed_loop_request)
+                self._send_control(self._closed_loop_request)
             case State.POWER:
-                self._motor.set_control(self._open_loop_request)
-        if SmartDashboard.getBoolean(f"{self._motor_name} Diagnostics", defaultValue=False):
+                self._send_control(self._open_loop_request)
+        if self._diagnostics.enabled and self._diagnostics.is_due():
             self.print_diagnostics()
 
     def at_target_position(self) -> bool:
@@ -135,7 +127,7 @@ class ExpoMotor(PowerMotor):
         Returns:
             - bool: True if the motor is at the target angle, False otherwise
         '''
-        return abs(self._closed_loop_request.position - self._motor.get_position().value) < self._angle_tolerance
+        return abs(self._closed_loop_request.position - self._signals.position.value) < self._angle_tolerance
 
     def get_position(self) -> degrees:
         '''
@@ -144,7 +136,7 @@ class ExpoMotor(PowerMotor):
         Returns:
             - degrees: The current angle of the motor
         '''
-        return (self._motor.get_position().value / self._gear_ratio) * 360
+        return (self._signals.position.value / self._gear_ratio) * 360
 
     def get_velocity(self) -> degrees_per_second:
         '''
@@ -153,7 +145,7 @@ class ExpoMotor(PowerMotor):
         Returns:
             - degrees_per_second: The current velocity of the motor
         '''
-        return (self._motor.get_velocity().value / self._gear_ratio) * 360
+        return (self._signals.velocity.value / self._gear_ratio) * 360
 
     def set_power(self, power: float) -> None:
         '''
@@ -180,11 +172,11 @@ class ExpoMotor(PowerMotor):
     @override
     def print_diagnostics(self) -> None:
         '''
-        Prints diagnostic information to Smart Dashboard
+        Publishes diagnostic information to the motor's NetworkTables table
         '''
-        _ = SmartDashboard.putNumber(f"{self._motor_name} position (degrees)", self.get_position())
-        _ = SmartDashboard.putNumber(f"{self._motor_name} Velocity", self.get_velocity())
-        _ = SmartDashboard.putBoolean(f"{self._motor_name} At Target position", self.at_target_position())
+        self._diagnostics.publish_number("Position (degrees)", self.get_position())
+        self._diagnostics.publish_number("Velocity (degrees/s)", self.get_velocity())
+        self._diagnostics.publish_boolean("At Target Position", self.at_target_position())
         super().print_diagnostics()
 
     @override
@@ -0,0 +1,282 @@
+from collections import deque
+from typing import Callable, Literal
+
+from commands2.button import Trigger
+from wpimath.filter import Debouncer
+from wpimath.units import amperes, seconds, volts
+
+from .signal_cache import MotorSignals
+
+'''
+Windowed motor health monitoring.
+
+Each monitor keeps fixed-size ring buffers of a motor's supply current, supply voltage, velocity and duty cycle,
+filled from the shared signal cache once per loop. The mean, max and integral of the square of each window are kept
+up to date in O(1) per sample, and stall, overcurrent and brownout conditions are debounced before they are raised,
+so a single noisy sample never triggers or clears an event.
+'''
+
+HealthEvent = Literal["stall", "overcurrent", "brownout"]
+
+class RollingWindow:
+    '''
+    A fixed-size ring buffer that keeps the mean, max and integral of the square of its samples
+
+    Parameters:
+        - size (int): How many samples the window holds
+    '''
+    __slots__ = ("_values", "_squares", "_size", "_index", "_count", "_total", "_sum", "_sum_squares", "_maxima")
+
+    def __init__(self, size: int) -> None:
+        if size < 1:
+            raise ValueError(f"Invalid window size: {size}")
+        self._values: list[float] = [0.0] * size
+        self._squares: list[float] = [0.0] * size
+        self._size: int = size
+        self._index: int = 0
+        self._count: int = 0
+        self._total: int = 0
+        self._sum: float = 0.0
+        self._sum_squares: float = 0.0
+        # Candidates for the max as (sample number, value), with values decreasing from front to back
+        self._maxima: deque[tuple[int, float]] = deque()
+
+    def push(self, value: float, dt: seconds) -> None:
+        '''
+        Adds a sample, dropping the oldest one if the window is full
+
+        Parameters:
+            - value (float): The sample
+            - dt (seconds): The time the sample covers, used for the integral
+        '''
+        square = value * value * dt
+        index = self._index
+        if self._count == self._size:
+            self._sum -= self._values[index]
+            self._sum_squares -= self._squares[index]
+        else:
+            self._count += 1
+        self._values[index] = value
+        self._squares[index] = square
+        self._sum += value
+        self._sum_squares += square
+        self._index = (index + 1) % self._size
+
+        sample = self._total
+        self._total += 1
+        maxima = self._maxima
+        while maxima and maxima[-1][1] <= value:
+            _ = maxima.pop()
+        maxima.append((sample, value))
+        if maxima[0][0] <= sample - self._size:
+            _ = maxima.popleft()
+
+        # Running sums drift as samples are added and removed, so rebuild them once per window
+        if self._index == 0:
+            self._sum = sum(self._values[:self._count])
+            self._sum_squares = sum(self._squares[:self._count])
+
+    def get_mean(self) -> float:
+        '''
+        Returns the mean of the samples in the window, or 0.0 if it is empty
+        '''
+        return self._sum / self._count if self._count else 0.0
+
+    def get_sum(self) -> float:
+        '''
+        Returns the sum of the samples in the window
+        '''
+        return self._sum
+
+    def get_max(self) -> float:
+        '''
+        Returns the largest sample in the window, or 0.0 if it is empty
+        '''
+        return self._maxima[0][1] if self._maxima else 0.0
+
+    def get_integral_squares(self) -> float:
+        '''
+        Returns the integral of the square of the samples over the window, such as I²t for currents
+        '''
+        return self._sum_squares
+
+    def get_latest(self) -> float:
+        '''
+        Returns the newest sample, or 0.0 if the window is empty
+        '''
+        return self._values[self._index - 1] if self._count else 0.0
+
+    def is_full(self) -> bool:
+        '''
+        Returns whether the window holds size samples
+        '''
+        return self._count == self._size
+
+    def clear(self) -> None:
+        '''
+        Removes every sample
+        '''
+        self._index = 0
+        self._count = 0
+        self._sum = 0.0
+        self._sum_squares = 0.0
+        self._maxima.clear()
+
+class MotorHealthMonitor:
+    '''
+    Watches a motor for stalls, overcurrent and brownouts
+
+    Velocity and duty cycle are stored as magnitudes.
+
+    Parameters:
+        - signals (MotorSignals): The cached signals of the motor
+        - current_limit (amperes): The supply current limit of the motor, or 0 to skip overcurrent detection
+        - stall_limit (float): The stall percentage above which the motor counts as stalled
+        - stall_threshold (float): The duty cycle below which the motor never counts as stalled
+        - window (int): How many samples each window holds
+        - stall_velocity (float | None): The mean rotor speed in rotations per second that the motor must also stay
+          below to count as stalled, or None to judge stalls by current alone
+    '''
+    STALL_DEBOUNCE: seconds = 0.25
+    OVERCURRENT_RATIO: float = 1.0 # RMS current over the window, as a fraction of the current limit
+    OVERCURRENT_DEBOUNCE: seconds = 0.5
+    BROWNOUT_VOLTAGE: volts = 7.0
+    BROWNOUT_DEBOUNCE: seconds = 0.1
+
+    def __init__(
+        self,
+        signals: MotorSignals,
+        current_limit: amperes,
+        stall_limit: float,
+        stall_threshold: float,
+        window: int = 25,
+        stall_velocity: float | None = None
+    ) -> None:
+        self._signals: MotorSignals = signals
+        self._current_limit: amperes = current_limit
+        self._stall_limit: float = stall_limit
+        self._stall_threshold: float = stall_threshold
+        self._stall_velocity: float | None = stall_velocity
+
+        self.current: RollingWindow = RollingWindow(window)
+        self.voltage: RollingWindow = RollingWindow(window)
+        self.velocity: RollingWindow = RollingWindow(window)
+        self.duty_cycle: RollingWindow = RollingWindow(window)
+        self._time_steps: RollingWindow = RollingWindow(window)
+        self._last_time: seconds | None = None
+
+        self._debouncers: dict[HealthEvent, Debouncer] = {
+            "stall": Debouncer(self.STALL_DEBOUNCE, Debouncer.DebounceType.kBoth),
+            "overcurrent": Debouncer(self.OVERCURRENT_DEBOUNCE, Debouncer.DebounceType.kBoth),
+            "brownout": Debouncer(self.BROWNOUT_DEBOUNCE, Debouncer.DebounceType.kBoth),
+        }
+        self._active: dict[HealthEvent, bool] = {"stall": False, "overcurrent": False, "brownout": False}
+        self._counts: dict[HealthEvent, int] = {"stall": 0, "overcurrent": 0, "brownout": 0}
+        self._listeners: dict[HealthEvent, list[Callable[[], None]]] = {"stall": [], "overcurrent": [], "brownout": []}
+        self._triggers: dict[HealthEvent, Trigger] = {}
+
+    def update(self, now: seconds) -> None:
+        '''
+        Adds the latest signal values to the windows and updates the events
+
+        Parameters:
+            - now (seconds): The current time
+        '''
+        dt = now - self._last_time if self._last_time is not None else 0.0
+        self._last_time = now
+
+        signals = self._signals
+        self.current.push(signals.supply_current.value, dt)
+        self.voltage.push(signals.supply_voltage.value, dt)
+        self.velocity.push(abs(signals.velocity.value), dt)
+        self.duty_cycle.push(abs(signals.duty_cycle.value), dt)
+        self._time_steps.push(dt, 0.0)
+
+        stalled = self.get_stall_percentage() > self._stall_limit and \
+            (self._stall_velocity is None or self.velocity.get_mean() < self._stall_velocity)
+        # The current is over the limit when its I²t is more than a constant current at the limit would give
+        window_time = self._time_steps.get_sum()
+        overcurrent = self._current_limit > 0 and window_time > 0 and \
+            self.current.get_integral_squares() > (self.OVERCURRENT_RATIO * self._current_limit) ** 2 * window_time
+        brownout = self.voltage.get_mean() < self.BROWNOUT_VOLTAGE
+
+        self._set_event("stall", stalled)
+        self._set_event("overcurrent", overcurrent)
+        self._set_event("brownout", brownout)
+
+    def _set_event(self, event: HealthEvent, condition: bool) -> None:
+        '''
+        Debounces a condition and calls the listeners of its event when it becomes active
+        '''
+        active = self._debouncers[event].calculate(condition)
+        if active and not self._active[event]:
+            self._counts[event] += 1
+            for listener in self._listeners[event]:
+                listener()
+        self._active[event] = active
+
+    def get_stall_percentage(self) -> float:
+        '''
+        Returns the percentage of stall current drawn over the window
+
+        Returns 0.0 while the motor reports no stall current or supply voltage, such as when it is unpowered,
+        disconnected or simulated
+
+        Returns:
+            - float: The mean supply current as a fraction of the stall current at the mean voltage and duty cycle
+        '''
+        duty_cycle = self.duty_cycle.get_mean()
+        stall_current = self._signals.stall_current.value * self.voltage.get_mean() / 12.0
+        if duty_cycle <= self._stall_threshold or duty_cycle == 0 or stall_current <= 0:
+            return 0.0
+        return (self.current.get_mean() / stall_current) / duty_cycle
+
+    def is_active(self, event: HealthEvent) -> bool:
+        '''
+        Returns whether an event is active after debouncing
+
+        Parameters:
+            - event (HealthEvent): The event to check
+
+        Returns:
+            - bool: True if the event is active
+        '''
+        return self._active[event]
+
+    def get_count(self, event: HealthEvent) -> int:
+        '''
+        Returns how many times an event has become active
+
+        Parameters:
+            - event (HealthEvent): The event to count
+
+        Returns:
+            - int: The number of times the event started
+        '''
+        return self._counts[event]
+
+    def subscribe(self, event: HealthEvent, listener: Callable[[], None]) -> None:
+        '''
+        Calls a function each time an event becomes active
+
+        Parameters:
+            - event (HealthEvent): The event to listen for
+            - listener (Callable[[], None]): The function to call
+        '''
+        self._listeners[event].append(listener)
+
+    def get_trigger(self, event: HealthEvent) -> Trigger:
+        '''
+        Returns a trigger that is active while an event is, for binding commands
+
+        Parameters:
+            - event (HealthEvent): The event to follow
+
+        Returns:
+            - Trigger: The trigger
+        '''
+        trigger = self._triggers.get(event)
+        if trigger is None:
+            trigger = Trigger(lambda: self._active[event])
+            self._triggers[event] = trigger
+        return trigger
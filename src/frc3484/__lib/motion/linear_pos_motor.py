@@ -3,8 +3,7 @@ from typing import final, override
 
 from math import pi
 
-from wpilib import SmartDashboard
-from wpimath.units import inches, radiansToDegrees, inchesToMeters
+from wpimath.units import inches, radiansToDegrees, inchesToMeters, turns
 inches_per_second = float
 
 from phoenix6.hardware import CANcoder
@@ -67,6 +66,7 @@ class LinearPositionMotor(AngularPositionMotor):
 
         
         self._pulley_radius: inches = pulley_radius
+        self._position_tolerance = position_tolerance
         
 
     def at_target_position(self) -> bool:
@@ -105,16 +105,22 @@ class LinearPositionMotor(AngularPositionMotor):
         Parameters:
             - position (feet): The angle to set the motor to
         '''
-        super().set_target_position(position * self._gear_ratio)
+        super().set_target_position(position)
+
+    @override
+    def _to_rotations(self, value: inches) -> turns:
+        '''
+        Converts a position, velocity or acceleration in inches to motor rotations
+        '''
+        return value / (2 * pi * self._pulley_radius) * self._gear_ratio
 
     @override
     def print_diagnostics(self) -> None:
         '''
-        Prints diagnostic information to Smart Dashboard
+        Publishes diagnostic information to the motor's NetworkTables table
         '''
-        _ = SmartDashboard.putNumber(f"{self._motor_name} Position (feet)", self.get_position())
-        _ = SmartDashboard.putNumber(f"{self._motor_name} Velocity (feet/s)", self.get_velocity())
-        _ = SmartDashboard.putBoolean(f"{self._motor_name} At Target Position", self.at_target_position())
+        self._diagnostics.publish_number("Position (inches)", self.get_position())
+        self._diagnostics.publish_number("Velocity (inches/s)", self.get_velocity())
         return super().print_diagnostics()
 
     @override
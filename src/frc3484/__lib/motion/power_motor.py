@@ -1,31 +1,49 @@
 from phoenix6.units import rotation
 from commands2 import Subsystem
 
+from phoenix6 import StatusCode
 from phoenix6.hardware import TalonFX, TalonFXS
 from phoenix6.configs import CurrentLimitsConfigs, TalonFXConfiguration, TalonFXSConfiguration
 from phoenix6.controls import Follower
+from phoenix6.hardware.parent_device import SupportsSendRequest
 from phoenix6.signals import InvertedValue, MotorArrangementValue, NeutralModeValue
-from wpilib import SmartDashboard
-from wpimath.units import turns, turns_per_second, volts
+from phoenix6.sim import ChassisReference, TalonFXSimState, TalonFXSSimState
+from wpilib import Timer
+from wpimath.units import seconds, turns, turns_per_second, volts
 
 from ..datatypes.motion_datatypes import SC_MotorConfig
+from .config_batch import CONFIG_BATCH
+from .diagnostics import MotorDiagnostics
+from .health import MotorHealthMonitor
+from .signal_cache import MotorSignals, SignalCache, get_signal_cache
 
 class PowerMotor(Subsystem):
     '''
     Creates a motor template class that can be used to create a 
         base motor that simply powers forwards or backwards at a given power
 
+    Status signals are read from the shared signal cache, which refreshes every motor's signals once per loop.
+    Control requests are only sent when their mode or setpoint changes, or every KEEPALIVE_PERIOD seconds otherwise.
+
+    The configuration is queued instead of applied, so subclasses can add to it before it is sent once. Call
+    apply_configs() at the end of robotInit to apply every queued configuration in parallel before the robot runs.
+    A configuration that is still queued is applied on its own before the first control request or encoder write to
+    its motor, and any left after that are applied at the start of the first robot loop, which blocks that loop
+
     Parameters:
         - motor_config (SC_MotorConfig): The configuration for the motor
         - current_config (SC_TemplateMotorCurrentConfig): Current limit settings for the motor
     '''
     STALL_LIMIT: float = 0.75
     STALL_THRESHOLD: float = 0.1
+    KEEPALIVE_PERIOD: seconds = 0.5 # Time between re-sending a control request that hasn't changed
 
     def __init__(
             self, 
             motor_config: SC_MotorConfig
         ) -> None:
+        # The cache has to register as a subsystem before the first motor so it refreshes before any motor runs
+        signal_cache = get_signal_cache()
         super().__init__()
         
         self._motor: TalonFX | TalonFXS
@@ -59,9 +77,26 @@ class PowerMotor(Subsystem):
             .with_supply_current_lower_limit(motor_config.current_threshold) \
             .with_supply_current_lower_time(motor_config.current_time)
 
-        _ = self._motor.configurator.apply(self._motor_config)
-
-        _ = SmartDashboard.putBoolean(f"{self._motor.device_id} Diagnostics", False)
+        CONFIG_BATCH.queue(self._motor, self._motor_config)
+
+        self._signal_cache: SignalCache = signal_cache
+        self._signals: MotorSignals = MotorSignals(self._motor, motor_config.can_bus_name)
+        self._signal_cache.add_motor(self._signals)
+        self._health: MotorHealthMonitor = MotorHealthMonitor(
+            self._signals,
+            motor_config.current_limit,
+            self.STALL_LIMIT,
+            self.STALL_THRESHOLD
+        )
+        self._signal_cache.add_listener(self._health.update)
+
+        self._last_request: SupportsSendRequest | None = None
+        self._last_state: dict[str, object] = {}
+        self._next_keepalive: seconds = 0.0
+        self._frames_sent: int = 0
+        self._frames_suppressed: int = 0
+
+        self._diagnostics: MotorDiagnostics = MotorDiagnostics(self._motor.device_id)
         self._motor_inverted = motor_config.inverted
 
     @property
@@ -70,9 +105,9 @@ class PowerMotor(Subsystem):
 
     def periodic(self) -> None:
         '''
-        Handles printing diagnostic information to Smart Dashboard
+        Handles publishing diagnostic information to NetworkTables
         '''
-        if SmartDashboard.getBoolean(f"{self._motor.device_id} Diagnostics", False):
+        if self._diagnostics.enabled and self._diagnostics.is_due():
             self.print_diagnostics()
 
     def set_power(self, power: float) -> None:
@@ -82,53 +117,127 @@ class PowerMotor(Subsystem):
         Parameters:
             - power (float): The power to set the motor to
         '''
+        self._last_request = None
+        self._flush_config()
         self._motor.set(power)
 
+    def _send_control(self, request: SupportsSendRequest) -> None:
+        '''
+        Sends a control request if it is a different request from the last one, any of its fields changed, or the
+        keepalive period passed
+
+        Every field is compared, so a change to the feed forward, slot or velocity of a request is sent even when
+        its main setpoint stays the same
+
+        Parameters:
+            - request (SupportsSendRequest): The request to send
+        '''
+        now = Timer.getFPGATimestamp()
+        state = vars(request)
+        if request is self._last_request and state == self._last_state and now < self._next_keepalive:
+            self._frames_suppressed += 1
+            return
+
+        self._flush_config()
+        self._motor.set_control(request)
+        self._last_request = request
+        self._last_state = dict(state)
+        self._next_keepalive = now + self.KEEPALIVE_PERIOD
+        self._frames_sent += 1
+
+    def get_frames_sent(self) -> int:
+        '''
+        Returns how many control requests have been sent by periodic
+
+        Returns:
+            - int: The number of control frames sent
+        '''
+        return self._frames_sent
+
+    def get_frames_suppressed(self) -> int:
+        '''
+        Returns how many control requests were skipped because nothing changed
+
+        Returns:
+            - int: The number of control frames suppressed
+        '''
+        return self._frames_suppressed
+
     def set_brake_mode(self) -> None:
         '''
         Sets the motor to brake mode
         '''
-        self._motor_config.motor_output.neutral_mode = NeutralModeValue.BRAKE
-        _ = self._motor.configurator.apply(self._motor_config)
+        self._set_neutral_mode(NeutralModeValue.BRAKE)
 
     def set_coast_mode(self) -> None:
         '''
         Sets the motor to coast mode
         '''
-        self._motor_config.motor_output.neutral_mode = NeutralModeValue.COAST
-        _ = self._motor.configurator.apply(self._motor_config)
+        self._set_neutral_mode(NeutralModeValue.COAST)
+
+    def _set_neutral_mode(self, neutral_mode: NeutralModeValue) -> None:
+        '''
+        Changes the neutral mode, applying only the motor output configs if the full configuration was already applied
+        '''
+        self._motor_config.motor_output.neutral_mode = neutral_mode
+        if not CONFIG_BATCH.is_pending(self._motor):
+            _ = self._motor.configurator.apply(self._motor_config.motor_output)
+
+    def _flush_config(self) -> None:
+        '''
+        Applies the queued configuration if it is still pending, so nothing is sent to an unconfigured motor
+        '''
+        if CONFIG_BATCH.is_pending(self._motor):
+            _ = CONFIG_BATCH.apply([self._motor])
+
+    def apply_config(self) -> StatusCode | None:
+        '''
+        Applies the queued configuration now instead of before the first robot loop
+
+        Returns:
+            - StatusCode | None: The result of the apply, or None if the configuration was already applied
+        '''
+        return CONFIG_BATCH.apply([self._motor]).get(self._motor.device_id)
 
     def get_stall_percentage(self) -> float:
         '''
-        Returns the percentage of stall current being drawn by the motor
+        Returns the percentage of stall current being drawn by the motor, averaged over the health monitor's window
 
         Returns:
             - float: The percentage of stall current being drawn by the motor
         '''
-        if abs(self._motor.get()) > self.STALL_THRESHOLD:
-            return (self._motor.get_supply_current().value / (self._motor.get_motor_stall_current().value * self._motor.get_supply_voltage().value / 12.0)) / abs(self._motor.get())
-        else:
-            return 0
+        return self._health.get_stall_percentage()
         
     def follow(self, motor: "PowerMotor") -> None:
         Follower(motor.device_id, self._motor_inverted)
 
     def get_stalled(self) -> bool:
         '''
-        Returns whether the motor is stalled or not
+        Returns whether the motor is stalled or not, after debouncing
 
         Returns:
             - bool: True if the motor is stalled, False otherwise
         '''
-        return self.get_stall_percentage() > self.STALL_LIMIT
+        return self._health.is_active("stall")
+
+    def get_health(self) -> MotorHealthMonitor:
+        '''
+        Returns the health monitor of the motor, for subscribing to stall, overcurrent and brownout events
+
+        Returns:
+            - MotorHealthMonitor: The health monitor
+        '''
+        return self._health
     
     def print_diagnostics(self) -> None:
         '''
-        Prints diagnostic information to Smart Dashboard
+        Publishes diagnostic information to the motor's NetworkTables table
         '''
-        _ = SmartDashboard.putNumber(f"Motor {self.device_id} Power (%)", self._motor.get() * 100)
-        _ = SmartDashboard.putNumber(f"Motor {self.device_id} Stall Percentage", self.get_stall_percentage())
-        _ = SmartDashboard.putBoolean(f"Motor {self.device_id} Stalled", self.get_stalled())
+        self._diagnostics.publish_number("Power (%)", self._signals.duty_cycle.value * 100)
+        self._diagnostics.publish_number("Stall Percentage", self.get_stall_percentage())
+        self._diagnostics.publish_boolean("Stalled", self.get_stalled())
+        self._diagnostics.publish_number("Frames Sent", self._frames_sent)
+        self._diagnostics.publish_number("Frames Suppressed", self._frames_suppressed)
 
     def set_raw_voltage(self, voltage: volts) -> None:
         '''
@@ -139,6 +248,8 @@ class PowerMotor(Subsystem):
         Parameters:
             - voltage (volts): The voltage to set the motor to
         '''
+        self._last_request = None
+        self._flush_config()
         self._motor.setVoltage(voltage)
 
     def get_raw_voltage(self) -> volts:
@@ -150,7 +261,7 @@ class PowerMotor(Subsystem):
         Returns:
             - volts: The voltage of the motor
         '''
-        return self._motor.get_motor_voltage().value
+        return self._signals.motor_voltage.value
 
     def get_raw_position(self) -> turns:
         '''
@@ -161,7 +272,7 @@ class PowerMotor(Subsystem):
         Returns:
             - turns: The angular position of the motor
         '''
-        return self._motor.get_position().value
+        return self._signals.position.value
 
     def get_raw_velocity(self) -> turns_per_second:
         '''
@@ -172,7 +283,7 @@ class PowerMotor(Subsystem):
         Returns:
             - turns_per_second: The angular velocity of the motor
         '''
-        return self._motor.get_velocity().value
+        return self._signals.velocity.value
 
     def set_encoder_position(self, position: turns) -> None:
         '''
@@ -181,4 +292,42 @@ class PowerMotor(Subsystem):
         Parameters:
             - position (turns): The encoder position to set the motor to
         '''
-        self._motor.set_position(position)
\ No newline at end of file
+        self._flush_config()
+        self._motor.set_position(position)
+
+    def get_sim_state(self) -> TalonFXSimState | TalonFXSSimState:
+        '''
+        Returns the simulation state of the motor
+
+        Returns:
+            - TalonFXSimState | TalonFXSSimState: The simulation state of the TalonFX or TalonFXS
+        '''
+        return self._motor.sim_state
+
+    def set_sim_orientation(self) -> None:
+        '''
+        Sets the orientation of the simulated motor to match its inversion, so simulated voltages and positions have
+        the same sign as on the robot
+        '''
+        orientation = ChassisReference.Clockwise_Positive if self._motor_inverted else ChassisReference.CounterClockwise_Positive
+        sim_state = self._motor.sim_state
+        # The TalonFXS drives different motors and sensors, so its orientation is set per motor
+        if isinstance(sim_state, TalonFXSSimState):
+            sim_state.motor_orientation = orientation
+        else:
+            sim_state.orientation = orientation
+
+def apply_configs(*motors: PowerMotor) -> dict[int, StatusCode]:
+    '''
+    Applies the queued configurations of several motors in parallel, such as every motor of a mechanism
+
+    Call this with no motors at the end of robotInit, after every motor is constructed, so all devices are configured
+    at once before the robot runs instead of one at a time on first use
+
+    Parameters:
+        - motors (PowerMotor): The motors to configure, or none to configure every queued motor
+
+    Returns:
+        - dict[int, StatusCode]: The result of each apply, by device ID
+    '''
+    return CONFIG_BATCH.apply([motor._motor for motor in motors] if motors else None)
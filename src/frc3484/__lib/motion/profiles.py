@@ -0,0 +1,374 @@
+from collections import OrderedDict
+from math import exp, sqrt
+from typing import Callable
+
+import numpy as np
+from numpy.typing import NDArray
+
+from wpimath.units import seconds
+
+from ..datatypes.motion_datatypes import SC_ExpoConfig, SC_TrapezoidConfig
+
+'''
+Host-side motion profiles.
+
+A profile is precomputed once into a table of position, velocity and acceleration setpoints at TABLE_PERIOD, so
+sampling it and asking how long a move takes are both O(1). The table only depends on the distance of the move and
+its constraints, so tables are kept in a shared cache and reused for every move of the same length, in either
+direction and from any start position.
+
+Profiles use whatever units their constraints are in, such as degrees for AngularPositionMotor or inches for
+LinearPositionMotor.
+'''
+
+TABLE_PERIOD: seconds = 0.005 # Time between the setpoints in a profile table
+
+class _ProfileTable:
+    '''
+    The setpoints of a move from 0 to a positive distance
+    '''
+    __slots__ = ("positions", "velocities", "accelerations", "duration", "distance")
+
+    def __init__(self, duration: seconds, distance: float, state: Callable[[float], tuple[float, float, float]]) -> None:
+        samples = int(duration / TABLE_PERIOD) + 2
+        self.positions: NDArray[np.float64] = np.empty(samples)
+        self.velocities: NDArray[np.float64] = np.empty(samples)
+        self.accelerations: NDArray[np.float64] = np.empty(samples)
+        for i in range(samples - 1):
+            self.positions[i], self.velocities[i], self.accelerations[i] = state(min(i * TABLE_PERIOD, duration))
+        # The last sample is the exact end, so rounding in the table never leaves the move short
+        self.positions[-1], self.velocities[-1], self.accelerations[-1] = distance, 0.0, 0.0
+        self.duration: seconds = duration
+        self.distance: float = distance
+
+def _piecewise_jerk(segments: list[tuple[seconds, float]], distance: float) -> _ProfileTable:
+    '''
+    Builds a table from segments of constant jerk, or of constant acceleration when a jerk is None
+
+    Parameters:
+        - segments (list[tuple[seconds, float]]): The duration and jerk of each segment, starting from rest
+        - distance (float): The distance of the move
+
+    Returns:
+        - _ProfileTable: The setpoints of the move
+    '''
+    starts: list[tuple[seconds, float, float, float, float]] = []
+    t = p = v = a = 0.0
+    for duration, jerk in segments:
+        starts.append((t, p, v, a, jerk))
+        p += v * duration + a * duration ** 2 / 2 + jerk * duration ** 3 / 6
+        v += a * duration + jerk * duration ** 2 / 2
+        a += jerk * duration
+        t += duration
+
+    def state(time: float) -> tuple[float, float, float]:
+        start = starts[0]
+        for segment in starts:
+            if segment[0] > time:
+                break
+            start = segment
+        t0, p0, v0, a0, jerk = start
+        dt = time - t0
+        return (
+            p0 + v0 * dt + a0 * dt ** 2 / 2 + jerk * dt ** 3 / 6,
+            v0 + a0 * dt + jerk * dt ** 2 / 2,
+            a0 + jerk * dt
+        )
+
+    return _ProfileTable(t, distance, state)
+
+def _build_trapezoid(distance: float, max_velocity: float, max_acceleration: float) -> _ProfileTable:
+    '''
+    Builds a move that accelerates, cruises and decelerates at constant rates
+    '''
+    if max_velocity <= 0 or max_acceleration <= 0:
+        raise ValueError(f"Invalid trapezoid constraints: {max_velocity} velocity, {max_acceleration} acceleration")
+    # Moves too short to reach max velocity peak at the velocity that covers the distance instead
+    velocity = min(max_velocity, sqrt(distance * max_acceleration))
+    ramp = velocity / max_acceleration
+    cruise = (distance - velocity * ramp) / velocity if velocity > 0 else 0.0
+
+    def state(time: float) -> tuple[float, float, float]:
+        if time < ramp:
+            return max_acceleration * time ** 2 / 2, max_acceleration * time, max_acceleration
+        if time < ramp + cruise:
+            return velocity * ramp / 2 + velocity * (time - ramp), velocity, 0.0
+        remaining = max(2 * ramp + cruise - time, 0.0)
+        return distance - max_acceleration * remaining ** 2 / 2, max_acceleration * remaining, -max_acceleration
+
+    return _ProfileTable(2 * ramp + cruise, distance, state)
+
+def _build_scurve(distance: float, max_velocity: float, max_acceleration: float, max_jerk: float) -> _ProfileTable:
+    '''
+    Builds a move whose acceleration ramps at a limited jerk, in up to seven segments
+    '''
+    if max_velocity <= 0 or max_acceleration <= 0 or max_jerk <= 0:
+        raise ValueError(
+            f"Invalid S-curve constraints: {max_velocity} velocity, {max_acceleration} acceleration, {max_jerk} jerk"
+        )
+
+    def ramp_time(velocity: float) -> seconds:
+        # Time to reach a velocity from rest
+        if velocity >= max_acceleration ** 2 / max_jerk:
+            return velocity / max_acceleration + max_acceleration / max_jerk
+        return 2 * sqrt(velocity / max_jerk)
+
+    velocity = max_velocity
+    if velocity * ramp_time(velocity) > distance:
+        # Too short to cruise, so find the peak velocity where the two ramps cover the whole distance
+        velocity = max_acceleration * (
+            -max_acceleration / max_jerk + sqrt((max_acceleration / max_jerk) ** 2 + 4 * distance / max_acceleration)
+        ) / 2
+        if velocity < max_acceleration ** 2 / max_jerk:
+            velocity = (distance * sqrt(max_jerk) / 2) ** (2 / 3)
+
+    acceleration = min(max_acceleration, sqrt(velocity * max_jerk))
+    jerk_time = acceleration / max_jerk
+    constant_time = max(velocity / acceleration - jerk_time, 0.0) if acceleration > 0 else 0.0
+    cruise_time = max((distance - velocity * ramp_time(velocity)) / velocity, 0.0) if velocity > 0 else 0.0
+
+    return _piecewise_jerk([
+        (jerk_time, max_jerk),
+        (constant_time, 0.0),
+        (jerk_time, -max_jerk),
+        (cruise_time, 0.0),
+        (jerk_time, -max_jerk),
+        (constant_time, 0.0),
+        (jerk_time, max_jerk),
+    ], distance)
+
+def _build_expo(distance: float, Kv: float, Ka: float, max_voltage: float) -> _ProfileTable:
+    '''
+    Builds a move that follows the response of a motor with the given gains at full voltage, mirrored to stop
+    '''
+    if Kv <= 0 or Ka <= 0 or max_voltage <= 0:
+        raise ValueError(f"Invalid expo constraints: {Kv} Kv, {Ka} Ka, {max_voltage} max voltage")
+    top_speed = max_voltage / Kv
+    time_constant = Ka / Kv
+
+    def accelerate(time: float) -> tuple[float, float, float]:
+        decay = exp(-time / time_constant)
+        return top_speed * (time - time_constant * (1 - decay)), top_speed * (1 - decay), top_speed / time_constant * decay
+
+    # The move accelerates for the first half of the distance and mirrors that to stop, so solve for the halfway time
+    low, high = 0.0, time_constant + distance / top_speed
+    while accelerate(high)[0] < distance / 2:
+        high *= 2
+    for _ in range(60):
+        middle = (low + high) / 2
+        if accelerate(middle)[0] < distance / 2:
+            low = middle
+        else:
+            high = middle
+    half = high
+
+    def state(time: float) -> tuple[float, float, float]:
+        if time <= half:
+            return accelerate(time)
+        position, velocity, acceleration = accelerate(max(2 * half - time, 0.0))
+        return distance - position, velocity, -acceleration
+
+    return _ProfileTable(2 * half, distance, state)
+
+class MotionProfile:
+    '''
+    A move from one position to another, sampled from a cached table
+
+    Parameters:
+        - start (float): The position the move starts at
+        - end (float): The position the move ends at
+        - table (_ProfileTable): The setpoints of a move of the same distance
+    '''
+    __slots__ = ("start", "end", "_table", "_direction")
+
+    def __init__(self, start: float, end: float, table: _ProfileTable) -> None:
+        self.start: float = start
+        self.end: float = end
+        self._table: _ProfileTable = table
+        self._direction: float = 1.0 if end >= start else -1.0
+
+    @property
+    def duration(self) -> seconds:
+        '''
+        The time the move takes
+        '''
+        return self._table.duration
+
+    def get_time_remaining(self, elapsed: seconds) -> seconds:
+        '''
+        Returns how long is left until the move reaches its end
+
+        Parameters:
+            - elapsed (seconds): The time since the move started
+
+        Returns:
+            - seconds: The time left, or 0.0 once the move is finished
+        '''
+        return max(self._table.duration - elapsed, 0.0)
+
+    def sample(self, elapsed: seconds) -> tuple[float, float, float]:
+        '''
+        Returns the setpoint at a point in the move, interpolating between table entries
+
+        Parameters:
+            - elapsed (seconds): The time since the move started
+
+        Returns:
+            - tuple[float, float, float]: The position, velocity and acceleration
+        '''
+        table = self._table
+        if elapsed >= table.duration:
+            return self.end, 0.0, 0.0
+        step = max(elapsed, 0.0) / TABLE_PERIOD
+        index = int(step)
+        fraction = step - index
+        direction = self._direction
+        positions = table.positions
+        velocities = table.velocities
+        position = positions[index] + (positions[index + 1] - positions[index]) * fraction
+        velocity = velocities[index] + (velocities[index + 1] - velocities[index]) * fraction
+        return self.start + direction * float(position), direction * float(velocity), direction * float(table.accelerations[index])
+
+class ProfileCache:
+    '''
+    A least recently used cache of profile tables
+
+    Parameters:
+        - size (int): How many tables to keep
+    '''
+    def __init__(self, size: int = 64) -> None:
+        self._size: int = size
+        self._tables: OrderedDict[tuple[object, ...], _ProfileTable] = OrderedDict()
+        self._hits: int = 0
+        self._misses: int = 0
+
+    def get(self, key: tuple[object, ...], build: Callable[[], _ProfileTable]) -> _ProfileTable:
+        '''
+        Returns the table for a key, building it if it isn't cached
+
+        Parameters:
+            - key (tuple[object, ...]): The kind, distance and constraints of the move
+            - build (Callable[[], _ProfileTable]): Builds the table
+
+        Returns:
+            - _ProfileTable: The table
+        '''
+        table = self._tables.get(key)
+        if table is not None:
+            self._tables.move_to_end(key)
+            self._hits += 1
+            return table
+        self._misses += 1
+        table = build()
+        self._tables[key] = table
+        if len(self._tables) > self._size:
+            _ = self._tables.popitem(last=False)
+        return table
+
+    def get_hits(self) -> int:
+        '''
+        Returns how many profiles were served from the cache
+        '''
+        return self._hits
+
+    def get_misses(self) -> int:
+        '''
+        Returns how many profiles had to be built
+        '''
+        return self._misses
+
+    def clear(self) -> None:
+        '''
+        Removes every cached table
+        '''
+        self._tables.clear()
+
+PROFILE_CACHE: ProfileCache = ProfileCache()
+
+def _distance(start: float, end: float) -> float:
+    '''
+    Returns the distance of a move, rounded so moves that only differ by floating point error share a table
+    '''
+    return round(abs(end - start), 9)
+
+def trapezoid_profile(start: float, end: float, max_velocity: float, max_acceleration: float) -> MotionProfile:
+    '''
+    Creates a profile that accelerates, cruises and decelerates at constant rates
+
+    Parameters:
+        - start (float): The position to start at
+        - end (float): The position to end at
+        - max_velocity (float): The cruise velocity
+        - max_acceleration (float): The acceleration and deceleration
+
+    Returns:
+        - MotionProfile: The profile
+    '''
+    distance = _distance(start, end)
+    key = ("trapezoid", distance, max_velocity, max_acceleration)
+    return MotionProfile(start, end, PROFILE_CACHE.get(key, lambda: _build_trapezoid(distance, max_velocity, max_acceleration)))
+
+def scurve_profile(start: float, end: float, max_velocity: float, max_acceleration: float, max_jerk: float) -> MotionProfile:
+    '''
+    Creates a profile whose acceleration changes at a limited jerk
+
+    Parameters:
+        - start (float): The position to start at
+        - end (float): The position to end at
+        - max_velocity (float): The cruise velocity
+        - max_acceleration (float): The largest acceleration
+        - max_jerk (float): The rate the acceleration changes at
+
+    Returns:
+        - MotionProfile: The profile
+    '''
+    distance = _distance(start, end)
+    key = ("scurve", distance, max_velocity, max_acceleration, max_jerk)
+    return MotionProfile(
+        start,
+        end,
+        PROFILE_CACHE.get(key, lambda: _build_scurve(distance, max_velocity, max_acceleration, max_jerk))
+    )
+
+def expo_profile(start: float, end: float, expo_config: SC_ExpoConfig, max_voltage: float = 12.0) -> MotionProfile:
+    '''
+    Creates a profile shaped like Motion Magic Expo, following a motor with the given gains at full voltage
+
+    Parameters:
+        - start (float): The position to start at
+        - end (float): The position to end at
+        - expo_config (SC_ExpoConfig): The velocity and acceleration gains, in the units of the positions
+        - max_voltage (float): The voltage the motor accelerates with
+
+    Returns:
+        - MotionProfile: The profile
+    '''
+    distance = _distance(start, end)
+    key = ("expo", distance, expo_config.Kv, expo_config.Ka, max_voltage)
+    return MotionProfile(
+        start,
+        end,
+        PROFILE_CACHE.get(key, lambda: _build_expo(distance, expo_config.Kv, expo_config.Ka, max_voltage))
+    )
+
+def profile_from_config(start: float, end: float, trapezoid_config: SC_TrapezoidConfig) -> MotionProfile:
+    '''
+    Creates an S-curve profile if the config has a jerk limit, or a trapezoid profile otherwise
+
+    Parameters:
+        - start (float): The position to start at
+        - end (float): The position to end at
+        - trapezoid_config (SC_TrapezoidConfig): The constraints of the move
+
+    Returns:
+        - MotionProfile: The profile
+    '''
+    if trapezoid_config.max_jerk > 0:
+        return scurve_profile(
+            start,
+            end,
+            trapezoid_config.max_velocity,
+            trapezoid_config.max_acceleration,
+            trapezoid_config.max_jerk
+        )
+    return trapezoid_profile(start, end, trapezoid_config.max_velocity, trapezoid_config.max_acceleration)
@@ -0,0 +1,174 @@
+from typing import Callable, override
+
+from commands2 import Subsystem
+from phoenix6 import BaseStatusSignal, StatusCode, StatusSignal
+from phoenix6.hardware import TalonFX, TalonFXS
+from wpilib import DriverStation, Timer
+from wpimath.units import seconds
+
+from .config_batch import CONFIG_BATCH
+
+'''
+A shared cache of motor status signals.
+
+Every motor adds the status signals it reads, and the cache refreshes them with one batched
+BaseStatusSignal.refresh_all call per CAN bus per robot loop, since Phoenix can only refresh signals on the same bus
+together. Getters then read the values from that refresh, so the number of CAN round trips per loop stays the same no
+matter how many getters are called.
+'''
+
+class MotorSignals:
+    '''
+    The status signals read by PowerMotor and its subclasses
+
+    The signals are fetched without refreshing, so creating them doesn't wait on the CAN bus
+
+    Parameters:
+        - motor (TalonFX | TalonFXS): The motor to read
+        - can_bus (str): The name of the CAN bus the motor is on
+    '''
+    def __init__(self, motor: TalonFX | TalonFXS, can_bus: str) -> None:
+        self.can_bus: str = can_bus
+        self.duty_cycle: StatusSignal[float] = motor.get_duty_cycle(refresh=False)
+        self.supply_current: StatusSignal[float] = motor.get_supply_current(refresh=False)
+        self.stall_current: StatusSignal[float] = motor.get_motor_stall_current(refresh=False)
+        self.supply_voltage: StatusSignal[float] = motor.get_supply_voltage(refresh=False)
+        self.motor_voltage: StatusSignal[float] = motor.get_motor_voltage(refresh=False)
+        self.position: StatusSignal[float] = motor.get_position(refresh=False)
+        self.velocity: StatusSignal[float] = motor.get_velocity(refresh=False)
+
+    def get_all(self) -> list[BaseStatusSignal]:
+        '''
+        Returns every signal in the set
+
+        Returns:
+            - list[BaseStatusSignal]: The signals
+        '''
+        return [
+            self.duty_cycle,
+            self.supply_current,
+            self.stall_current,
+            self.supply_voltage,
+            self.motor_voltage,
+            self.position,
+            self.velocity
+        ]
+
+class SignalCache(Subsystem):
+    '''
+    Refreshes the status signals of every motor once per robot loop, with one batched call per CAN bus
+
+    Use get_signal_cache instead of creating this directly. The cache is created before the first motor registers as
+    a subsystem, so its periodic runs before every motor's periodic. Configurations should be applied in robotInit with
+    apply_configs, and any still queued when the first loop starts are applied here as a fallback, which blocks that
+    loop until every device acknowledges its configuration.
+    '''
+    def __init__(self) -> None:
+        super().__init__()
+        self._signals: dict[str, list[BaseStatusSignal]] = {}
+        self._statuses: dict[str, StatusCode] = {}
+        self._refresh_count: int = 0
+        self._listeners: list[Callable[[seconds], None]] = []
+
+    def add_motor(self, signals: MotorSignals) -> None:
+        '''
+        Adds a motor's signals to the batched refresh of its bus and refreshes them once so they start with real values
+
+        Parameters:
+            - signals (MotorSignals): The signals to add
+        '''
+        new_signals = signals.get_all()
+        self._signals.setdefault(signals.can_bus, []).extend(new_signals)
+        self._check_status(signals.can_bus, BaseStatusSignal.refresh_all(*new_signals))
+
+    def add_listener(self, listener: Callable[[seconds], None]) -> None:
+        '''
+        Calls a function with the current time after every batched refresh
+
+        Parameters:
+            - listener (Callable[[seconds], None]): The function to call
+        '''
+        self._listeners.append(listener)
+
+    def remove_motor(self, signals: MotorSignals) -> None:
+        '''
+        Removes a motor's signals from the batched refresh
+
+        Parameters:
+            - signals (MotorSignals): The signals to remove
+        '''
+        removed = set(map(id, signals.get_all()))
+        remaining = [signal for signal in self._signals.get(signals.can_bus, []) if id(signal) not in removed]
+        if remaining:
+            self._signals[signals.can_bus] = remaining
+        else:
+            _ = self._signals.pop(signals.can_bus, None)
+
+    @override
+    def periodic(self) -> None:
+        '''
+        Applies any motor configurations still queued, as a fallback for apply_configs, and refreshes every registered
+        signal
+        '''
+        if CONFIG_BATCH.has_pending():
+            _ = CONFIG_BATCH.apply()
+        self.refresh()
+
+    def refresh(self) -> None:
+        '''
+        Refreshes every signal with one batched call per CAN bus
+        '''
+        if self._signals:
+            for can_bus, signals in self._signals.items():
+                self._check_status(can_bus, BaseStatusSignal.refresh_all(*signals))
+            self._refresh_count += 1
+        if self._listeners:
+            now = Timer.getFPGATimestamp()
+            for listener in self._listeners:
+                listener(now)
+
+    def _check_status(self, can_bus: str, status: StatusCode) -> None:
+        '''
+        Reports a failed refresh when the status of a bus changes, so a failure that repeats every loop is only
+        reported once
+        '''
+        if self._statuses.get(can_bus) == status:
+            return
+        self._statuses[can_bus] = status
+        if not status.is_ok():
+            DriverStation.reportWarning(f"Failed to refresh motor signals on CAN bus {can_bus}: {status}", False)
+
+    def get_status(self, can_bus: str) -> StatusCode | None:
+        '''
+        Returns the result of the last refresh of a CAN bus
+
+        Parameters:
+            - can_bus (str): The name of the CAN bus
+
+        Returns:
+            - StatusCode | None: The status, or None if the bus has no signals
+        '''
+        return self._statuses.get(can_bus)
+
+    def get_refresh_count(self) -> int:
+        '''
+        Returns how many batched refreshes have been made
+
+        Returns:
+            - int: The number of refreshes
+        '''
+        return self._refresh_count
+
+_signal_cache: SignalCache | None = None
+
+def get_signal_cache() -> SignalCache:
+    '''
+    Returns the shared signal cache, creating it on first use
+
+    Returns:
+        - SignalCache: The shared cache
+    '''
+    global _signal_cache
+    if _signal_cache is None:
+        _signal_cache = SignalCache()
+    return _signal_cache
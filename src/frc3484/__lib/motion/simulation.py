@@ -0,0 +1,303 @@
+from math import inf, pi
+from typing import Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+
+from phoenix6.hardware import CANcoder
+from phoenix6.sim import TalonFXSimState, TalonFXSSimState
+from phoenix6.signals import NeutralModeValue
+from wpimath.units import kilogram_square_meters, seconds, volts
+
+from ..datatypes.motion_datatypes import SC_AngularFeedForwardConfig, SC_ExpoConfig, SC_MotorConfig
+from .power_motor import PowerMotor
+
+'''
+A DC motor and gearbox plant for simulating PowerMotors.
+
+MotorPlant integrates every simulated motor at once with numpy, from the voltage applied to each one. The model
+includes back EMF, the supply current limit, brake and coast neutral modes, and constant gravity and friction loads
+taken from the G and S feed forward gains. Positions and velocities are in rotor rotations. MotorPlant doesn't depend
+on Phoenix, so sweeps can step it much faster than real time.
+
+PhoenixPlantSim connects a MotorPlant to the Phoenix simulation state of real PowerMotors, so the closed loops running
+in the simulated motor controllers drive the plant.
+'''
+
+# Free speed (rotations per second), stall torque (newton meters) and stall current (amperes) of each motor type
+_MOTOR_CONSTANTS: dict[str, tuple[float, float, float]] = {
+    "falcon": (6380 / 60, 4.69, 257.0),
+    "minion": (7200 / 60, 3.17, 211.0),
+}
+
+class MotorPlant:
+    '''
+    The mechanical state of a set of simulated motors
+
+    Parameters:
+        - battery_voltage (volts): The battery voltage with no load
+        - battery_resistance (float): The internal resistance of the battery in ohms, or 0 to ignore battery sag
+    '''
+    MIN_BATTERY_VOLTAGE: volts = 1.0 # The lowest the battery can sag to
+    SUBSTEPS: int = 4 # Integration steps per call to step
+    STICTION_VELOCITY: float = 1e-3 # Rotations per second below which static friction can hold a motor still
+
+    def __init__(self, battery_voltage: volts = 12.0, battery_resistance: float = 0.015) -> None:
+        self._nominal_voltage: volts = battery_voltage
+        self._battery_resistance: float = battery_resistance
+        self._battery_voltage: volts = battery_voltage
+
+        self._position: NDArray[np.float64] = np.zeros(0)
+        self._velocity: NDArray[np.float64] = np.zeros(0)
+        self._stator_current: NDArray[np.float64] = np.zeros(0)
+        self._supply_current: NDArray[np.float64] = np.zeros(0)
+
+        self._emf: NDArray[np.float64] = np.zeros(0)
+        self._resistance: NDArray[np.float64] = np.zeros(0)
+        self._torque_constant: NDArray[np.float64] = np.zeros(0)
+        self._inertia: NDArray[np.float64] = np.zeros(0)
+        self._gravity: NDArray[np.float64] = np.zeros(0)
+        self._friction: NDArray[np.float64] = np.zeros(0)
+        self._current_limit: NDArray[np.float64] = np.zeros(0)
+        self._coast: NDArray[np.bool_] = np.zeros(0, dtype=np.bool_)
+
+    def add(
+        self,
+        motor_config: SC_MotorConfig,
+        feed_forward_config: SC_AngularFeedForwardConfig = SC_AngularFeedForwardConfig(),
+        expo_config: SC_ExpoConfig | None = None,
+        gear_ratio: float = 1.0,
+        inertia: kilogram_square_meters | None = None,
+        sensor_ratio: float = 1.0
+    ) -> int:
+        '''
+        Adds a motor to the plant
+
+        The inertia of the mechanism is taken from inertia if it is given, otherwise from the A feed forward gain, and
+        otherwise from the Ka gain of the expo config. The gains are in the units of the feedback sensor.
+
+        Parameters:
+            - motor_config (SC_MotorConfig): The configuration of the motor
+            - feed_forward_config (SC_AngularFeedForwardConfig): The feed forward gains, used for gravity and friction
+            - expo_config (SC_ExpoConfig | None): The expo gains, used for inertia if there is no A gain
+            - gear_ratio (float): Rotor rotations per mechanism rotation
+            - inertia (kilogram_square_meters | None): The moment of inertia of the mechanism
+            - sensor_ratio (float): Rotor rotations per feedback sensor rotation
+
+        Returns:
+            - int: The index of the motor
+        '''
+        if motor_config.motor_type not in _MOTOR_CONSTANTS:
+            raise ValueError(f"Invalid motor type: {motor_config.motor_type}")
+        if gear_ratio <= 0 or sensor_ratio <= 0:
+            raise ValueError(f"Invalid gear ratio: {gear_ratio}, sensor ratio: {sensor_ratio}")
+        free_speed, stall_torque, stall_current = _MOTOR_CONSTANTS[motor_config.motor_type]
+
+        resistance = 12.0 / stall_current
+        torque_constant = stall_torque / stall_current
+        torque_per_volt = torque_constant / resistance
+
+        # Inertia is stored as rotor torque per rotation per second squared
+        if inertia is not None:
+            rotor_inertia = 2 * pi * inertia / gear_ratio ** 2
+        elif feed_forward_config.A > 0:
+            rotor_inertia = feed_forward_config.A / sensor_ratio * torque_per_volt
+        elif expo_config is not None and expo_config.Ka > 0:
+            rotor_inertia = expo_config.Ka / sensor_ratio * torque_per_volt
+        else:
+            raise ValueError("Invalid plant: needs an inertia, an A feed forward gain or an expo Ka gain")
+        if rotor_inertia <= 0:
+            raise ValueError(f"Invalid inertia: {inertia}")
+
+        self._position = np.append(self._position, 0.0)
+        self._velocity = np.append(self._velocity, 0.0)
+        self._stator_current = np.append(self._stator_current, 0.0)
+        self._supply_current = np.append(self._supply_current, 0.0)
+
+        self._emf = np.append(self._emf, 12.0 / free_speed)
+        self._resistance = np.append(self._resistance, resistance)
+        self._torque_constant = np.append(self._torque_constant, torque_constant)
+        self._inertia = np.append(self._inertia, rotor_inertia)
+        self._gravity = np.append(self._gravity, feed_forward_config.G * torque_per_volt)
+        self._friction = np.append(self._friction, abs(feed_forward_config.S) * torque_per_volt)
+        self._current_limit = np.append(self._current_limit, motor_config.current_limit if motor_config.current_limit_enabled else inf)
+        self._coast = np.append(self._coast, motor_config.neutral_mode == NeutralModeValue.COAST)
+        return len(self._position) - 1
+
+    def step(self, voltages: Sequence[float] | NDArray[np.float64], dt: seconds) -> None:
+        '''
+        Advances every motor by one time step
+
+        Parameters:
+            - voltages (Sequence[float] | NDArray[np.float64]): The voltage applied to each motor, in index order
+            - dt (seconds): The length of the step
+        '''
+        applied = np.asarray(voltages, dtype=np.float64)
+        if applied.shape != self._position.shape:
+            raise ValueError(f"Invalid voltages: expected {self._position.shape[0]}, got {applied.shape}")
+        if dt <= 0:
+            raise ValueError(f"Invalid time step: {dt}")
+
+        h = dt / self.SUBSTEPS
+        duty = np.abs(applied) / self._battery_voltage
+        # The supply current is the stator current scaled by the duty cycle, so the limit scales the other way
+        with np.errstate(divide="ignore"):
+            limit = np.where(duty > 0, self._current_limit / duty, inf)
+        neutral_coast = self._coast & (applied == 0.0)
+
+        position = self._position
+        velocity = self._velocity
+        current = self._stator_current
+        for _ in range(self.SUBSTEPS):
+            current = np.clip((applied - self._emf * velocity) / self._resistance, -limit, limit)
+            current[neutral_coast] = 0.0
+            drive = self._torque_constant * current - self._gravity
+
+            moving_direction = np.sign(np.where(velocity != 0.0, velocity, drive))
+            acceleration = (drive - self._friction * moving_direction) / self._inertia
+            new_velocity = velocity + acceleration * h
+
+            # Friction can stop a motor but never push it backwards
+            held = (np.abs(drive) <= self._friction) & (
+                (np.abs(velocity) < self.STICTION_VELOCITY) | (np.sign(new_velocity) != np.sign(velocity))
+            )
+            new_velocity[held] = 0.0
+
+            position = position + 0.5 * (velocity + new_velocity) * h
+            velocity = new_velocity
+
+        self._position = position
+        self._velocity = velocity
+        self._stator_current = current
+        self._supply_current = current * applied / self._battery_voltage
+        self._battery_voltage = max(
+            self._nominal_voltage - self._battery_resistance * float(self._supply_current.sum()),
+            self.MIN_BATTERY_VOLTAGE
+        )
+
+    def set_state(self, index: int, position: float = 0.0, velocity: float = 0.0) -> None:
+        '''
+        Moves a motor to a new state
+
+        Parameters:
+            - index (int): The index of the motor
+            - position (float): The rotor position in rotations
+            - velocity (float): The rotor velocity in rotations per second
+        '''
+        self._position[index] = position
+        self._velocity[index] = velocity
+
+    def get_battery_voltage(self) -> volts:
+        '''
+        Returns the battery voltage after the last step
+
+        Returns:
+            - volts: The battery voltage under the current load
+        '''
+        return self._battery_voltage
+
+    def get_positions(self) -> NDArray[np.float64]:
+        '''
+        Returns the rotor position of every motor in rotations
+        '''
+        return self._position
+
+    def get_velocities(self) -> NDArray[np.float64]:
+        '''
+        Returns the rotor velocity of every motor in rotations per second
+        '''
+        return self._velocity
+
+    def get_stator_currents(self) -> NDArray[np.float64]:
+        '''
+        Returns the stator current of every motor in amperes
+        '''
+        return self._stator_current
+
+    def get_supply_currents(self) -> NDArray[np.float64]:
+        '''
+        Returns the supply current of every motor in amperes
+        '''
+        return self._supply_current
+
+class PhoenixPlantSim:
+    '''
+    Drives the Phoenix simulation state of PowerMotors from a MotorPlant
+
+    Call update from simulationPeriodic. The simulated motor controllers run in real time, so sweeps that need to
+    run faster than that should step a MotorPlant directly.
+
+    Parameters:
+        - plant (MotorPlant | None): The plant to use, or None to create one
+    '''
+    def __init__(self, plant: MotorPlant | None = None) -> None:
+        self._plant: MotorPlant = plant or MotorPlant()
+        self._sim_states: list[TalonFXSimState | TalonFXSSimState] = []
+        self._encoders: list[tuple[CANcoder, float] | None] = []
+
+    def add_motor(
+        self,
+        motor: PowerMotor,
+        motor_config: SC_MotorConfig,
+        feed_forward_config: SC_AngularFeedForwardConfig = SC_AngularFeedForwardConfig(),
+        expo_config: SC_ExpoConfig | None = None,
+        gear_ratio: float = 1.0,
+        inertia: kilogram_square_meters | None = None,
+        encoder: CANcoder | None = None
+    ) -> int:
+        '''
+        Simulates a motor, and the CANcoder it uses for feedback if it has one
+
+        Parameters:
+            - motor (PowerMotor): The motor to simulate
+            - motor_config (SC_MotorConfig): The configuration the motor was created with
+            - feed_forward_config (SC_AngularFeedForwardConfig): The feed forward gains the motor was created with
+            - expo_config (SC_ExpoConfig | None): The expo gains the motor was created with
+            - gear_ratio (float): Rotor rotations per mechanism rotation
+            - inertia (kilogram_square_meters | None): The moment of inertia of the mechanism
+            - encoder (CANcoder | None): The external encoder on the mechanism
+
+        Returns:
+            - int: The index of the motor in the plant
+        '''
+        sensor_ratio = gear_ratio if encoder is not None else 1.0
+        index = self._plant.add(motor_config, feed_forward_config, expo_config, gear_ratio, inertia, sensor_ratio)
+        motor.set_sim_orientation()
+        self._sim_states.append(motor.get_sim_state())
+        self._encoders.append(None if encoder is None else (encoder, gear_ratio))
+        return index
+
+    def update(self, dt: seconds = 0.02) -> None:
+        '''
+        Steps the plant with the voltages the simulated motor controllers are applying and writes back the new state
+
+        Parameters:
+            - dt (seconds): The time since the last update
+        '''
+        battery_voltage = self._plant.get_battery_voltage()
+        voltages = np.empty(len(self._sim_states))
+        for i, sim_state in enumerate(self._sim_states):
+            _ = sim_state.set_supply_voltage(battery_voltage)
+            voltages[i] = sim_state.motor_voltage
+
+        self._plant.step(voltages, dt)
+
+        positions = self._plant.get_positions()
+        velocities = self._plant.get_velocities()
+        for i, sim_state in enumerate(self._sim_states):
+            _ = sim_state.set_raw_rotor_position(positions[i])
+            _ = sim_state.set_rotor_velocity(velocities[i])
+            encoder = self._encoders[i]
+            if encoder is not None:
+                cancoder, gear_ratio = encoder
+                _ = cancoder.sim_state.set_raw_position(positions[i] / gear_ratio)
+                _ = cancoder.sim_state.set_velocity(velocities[i] / gear_ratio)
+
+    def get_plant(self) -> MotorPlant:
+        '''
+        Returns the plant being simulated
+
+        Returns:
+            - MotorPlant: The plant
+        '''
+        return self._plant
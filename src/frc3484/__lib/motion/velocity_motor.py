@@ -1,9 +1,7 @@
 from typing import override
 
-from wpilib import SmartDashboard
-
 from phoenix6 import controls
-from phoenix6.configs import CurrentLimitsConfigs, Slot0Configs
+from phoenix6.configs import Slot0Configs
 from wpimath.units import turns
 
 from ..datatypes.motion_datatypes import SC_AngularFeedForwardConfig, SC_PIDConfig, SC_MotorConfig, SC_LauncherSpeed
@@ -37,16 +35,11 @@ class VelocityMotor(PowerMotor):
         self._tolerance: float = tolerance
         self._gear_ratio: float = gear_ratio
         self._motor_name: str = str(self._motor.device_id)
+        self._diagnostics.add_flag("Test Mode")
 
         self._open_loop_request: controls.DutyCycleOut = controls.DutyCycleOut(0.0, enable_foc=False)
         self._closed_loop_request: controls.VelocityVoltage = controls.VelocityVoltage(0.0, slot=0, enable_foc=False)
 
-        self._motor_config.current_limits = CurrentLimitsConfigs() \
-            .with_supply_current_limit_enable(motor_config.current_limit_enabled) \
-            .with_supply_current_limit(motor_config.current_limit) \
-            .with_supply_current_lower_limit(motor_config.current_threshold) \
-            .with_supply_current_lower_time(motor_config.current_time) 
-
         self._motor_config.slot0 = Slot0Configs() \
             .with_k_p(pid_config.Kp) \
             .with_k_i(pid_config.Ki) \
@@ -61,17 +54,17 @@ class VelocityMotor(PowerMotor):
         '''
         Handles Smart Dashboard diagnostic information and actually controlling the motors
         '''
-        if not SmartDashboard.getBoolean(f"{self._motor_name} Test Mode", False):
+        if not self._diagnostics.get_flag("Test Mode"):
             if self._open_loop_request.output == 0.0 and self._closed_loop_request.velocity == 0.0:
-                self._motor.set_control(self._open_loop_request.with_output(0))
+                self._send_control(self._open_loop_request.with_output(0))
 
             elif self._open_loop_request.output != 0.0:
-                self._motor.set_control(self._open_loop_request)
+                self._send_control(self._open_loop_request)
             
             else:
-                self._motor.set_control(self._closed_loop_request)
+                self._send_control(self._closed_loop_request)
 
-        if SmartDashboard.getBoolean(f"{self._motor_name} Diagnostics", False):
+        if self._diagnostics.enabled and self._diagnostics.is_due():
             self.print_diagnostics()
     
     def set_speed(self, speed: SC_LauncherSpeed) -> None:
@@ -96,10 +89,10 @@ class VelocityMotor(PowerMotor):
             return True
 
         elif self._open_loop_request.output != 0.0:
-            return (self._motor.get_velocity().value - self._closed_loop_request.velocity) * (1 if self._closed_loop_request.velocity >= 0 else -1) > 0
+            return (self._signals.velocity.value - self._closed_loop_request.velocity) * (1 if self._closed_loop_request.velocity >= 0 else -1) > 0
 
         # Convert RPS to RPM, then subtract the target speed and compare to the tolerance
-        return abs(self._motor.get_velocity().value - self._closed_loop_request.velocity) < self._tolerance
+        return abs(self._signals.velocity.value - self._closed_loop_request.velocity) < self._tolerance
 
     @override
     def set_power(self, power: float) -> None:
@@ -117,10 +110,10 @@ class VelocityMotor(PowerMotor):
     @override
     def print_diagnostics(self) -> None:
         '''
-        Prints diagnostic information to Smart Dashboard
+        Publishes diagnostic information to the motor's NetworkTables table
         '''
-        _ = SmartDashboard.putNumber(f"{self._motor_name} Speed (RPM)", self._motor.get_velocity().value * 60)
-        _ = SmartDashboard.putNumber(f"{self._motor_name} At Target RPM", self.at_target_speed())
+        self._diagnostics.publish_number("Speed (RPM)", self._signals.velocity.value * 60)
+        self._diagnostics.publish_boolean("At Target RPM", self.at_target_speed())
         super().print_diagnostics()
 
     @override
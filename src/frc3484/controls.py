@@ -1,10 +1,32 @@
 from .__lib.controls.controller import SC_Controller
+from .__lib.controls.hub import SC_ControllerHub, detect_controller_map
 from .__lib.controls.controller_constants import XboxControllerMap, DualShock4Map, LogitechExtreme3DMap, Input
+from .__lib.controls.compiled_input import CompiledInput
+from .__lib.controls.snapshot import ControllerSnapshot
+from .__lib.controls.bindings import Binding
+from .__lib.controls.recording import ControllerRecording, ReplayHID
+from .__lib.controls.faults import FaultLog, ControlsFault, CONTROLS_FAULTS
+from .__lib.controls.haptics import RumblePattern, RumblePulse, RumbleRamp, RumbleHeartbeat, RumbleCue
 
 __all__ = [
     "SC_Controller",
+    "SC_ControllerHub",
+    "detect_controller_map",
     "XboxControllerMap",
     "DualShock4Map",
     "LogitechExtreme3DMap",
     "Input",
-    ]
\ No newline at end of file
+    "CompiledInput",
+    "ControllerSnapshot",
+    "Binding",
+    "ControllerRecording",
+    "ReplayHID",
+    "FaultLog",
+    "ControlsFault",
+    "CONTROLS_FAULTS",
+    "RumblePattern",
+    "RumblePulse",
+    "RumbleRamp",
+    "RumbleHeartbeat",
+    "RumbleCue",
+    ]
@@ -12,6 +12,8 @@ from .__lib.datatypes.motion_datatypes import \
     SC_TrapezoidConfig, \
     SC_MotorConfig, \
     SC_ExpoConfig
+from .__lib.datatypes.led_datatypes import SC_LEDSegment
+from .__lib.datatypes.controls_datatypes import SC_AxisShaping
 from .__lib.datatypes.swerve_datatypes import \
     SC_SwerveConfig, \
     SC_SwerveCurrentConfig, \
@@ -34,5 +36,7 @@ __all__ = [
     "SC_CameraResults",
     "SC_ApriltagTarget",
     "SC_ExpoConfig",
-    "SC_TrapezoidConfig"
+    "SC_TrapezoidConfig",
+    "SC_LEDSegment",
+    "SC_AxisShaping"
 ]
\ No newline at end of file
@@ -1,17 +1,47 @@
 from .__lib.leds.colorstack import ColorStack
 from .__lib.leds.colorwave import ColorWave
+from .__lib.leds.compositor import LEDCompositor, BlendMode
 from .__lib.leds.fallingsand import FallingSand
 from .__lib.leds.fire import Fire
 from .__lib.leds.static import Static
+from .__lib.leds.clock import LEDClock, DEFAULT_CLOCK
+from .__lib.leds.engine import LEDEngine, LEDStrip
+from .__lib.leds.worker import LEDRenderWorker
+from .__lib.leds.frame import LEDFrame
+from .__lib.leds.pattern import Pattern
+from .__lib.leds.recording import HeadlessLED, LEDRecording, record_pattern
+from .__lib.leds.benchmark import LEDBenchmarkResult, benchmark_pattern, run_benchmarks, check_golden_recordings, record_golden_recordings
+from .__lib.leds.gamma import get_gamma_table, apply_gamma
 from .__lib.leds.utils import correct_gamma
+from .__lib.datatypes.led_datatypes import SC_LEDSegment
 
 
 
 __all__ = [
     "ColorStack",
     "ColorWave",
+    "LEDCompositor",
+    "BlendMode",
     "FallingSand",
     "Fire",
     "Static",
-    "correct_gamma"
-]
\ No newline at end of file
+    "LEDClock",
+    "DEFAULT_CLOCK",
+    "LEDEngine",
+    "LEDStrip",
+    "LEDRenderWorker",
+    "LEDFrame",
+    "Pattern",
+    "HeadlessLED",
+    "LEDRecording",
+    "record_pattern",
+    "LEDBenchmarkResult",
+    "benchmark_pattern",
+    "run_benchmarks",
+    "check_golden_recordings",
+    "record_golden_recordings",
+    "get_gamma_table",
+    "apply_gamma",
+    "correct_gamma",
+    "SC_LEDSegment"
+]
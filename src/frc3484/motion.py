@@ -1,8 +1,19 @@
 from .__lib.motion.angular_pos_motor import AngularPositionMotor
 from .__lib.motion.linear_pos_motor import LinearPositionMotor
-from .__lib.motion.power_motor import PowerMotor
+from .__lib.motion.power_motor import PowerMotor, apply_configs
 from .__lib.motion.velocity_motor import VelocityMotor
 from .__lib.motion.expo_motor import ExpoMotor
+from .__lib.motion.simulation import MotorPlant, PhoenixPlantSim
+from .__lib.motion.profiles import \
+    MotionProfile, \
+    ProfileCache, \
+    PROFILE_CACHE, \
+    trapezoid_profile, \
+    scurve_profile, \
+    expo_profile, \
+    profile_from_config
+from .__lib.motion.health import HealthEvent, MotorHealthMonitor, RollingWindow
+from .__lib.motion.signal_cache import MotorSignals, SignalCache, get_signal_cache
 
 from .__lib.datatypes.motion_datatypes import \
     SC_LauncherSpeed, \
@@ -20,8 +31,24 @@ __all__ = [
     "AngularPositionMotor",
     "LinearPositionMotor",
     "PowerMotor",
+    "apply_configs",
     "VelocityMotor",
     "ExpoMotor",
+    "MotionProfile",
+    "ProfileCache",
+    "PROFILE_CACHE",
+    "trapezoid_profile",
+    "scurve_profile",
+    "expo_profile",
+    "profile_from_config",
+    "HealthEvent",
+    "MotorHealthMonitor",
+    "RollingWindow",
+    "MotorPlant",
+    "PhoenixPlantSim",
+    "MotorSignals",
+    "SignalCache",
+    "get_signal_cache",
     "SC_LauncherSpeed",
     "SC_PIDConfig",
     "SC_SolenoidConfig",